@@ -1,3 +1,236 @@
-from .kitchen.kitchen import REGISTERED_KITCHEN_ENVS
+"""
+Registry of kitchen environments. Environment classes are registered with robosuite by name and their
+modules are only imported when the environment is first created, which keeps `import robocasa` cheap.
+"""
+import importlib
 
-ALL_KITCHEN_ENVIRONMENTS = REGISTERED_KITCHEN_ENVS.keys()
+from robosuite.environments.base import REGISTERED_ENVS
+
+# maps each module (relative to robocasa.environments) to the kitchen environments it defines
+_KITCHEN_ENV_MODULES = {
+    "kitchen.kitchen": [
+        "Kitchen",
+        "KitchenDemo",
+    ],
+    "kitchen.multi_stage.baking.cupcake_cleanup": ["CupcakeCleanup"],
+    "kitchen.multi_stage.baking.organize_baking_ingredients": [
+        "OrganizeBakingIngredients"
+    ],
+    "kitchen.multi_stage.baking.pastry_display": ["PastryDisplay"],
+    "kitchen.multi_stage.boiling.fill_kettle": ["FillKettle"],
+    "kitchen.multi_stage.boiling.heat_multiple_water": ["HeatMultipleWater"],
+    "kitchen.multi_stage.boiling.veggie_boil": ["VeggieBoil"],
+    "kitchen.multi_stage.brewing.arrange_tea": ["ArrangeTea"],
+    "kitchen.multi_stage.brewing.kettle_boiling": ["KettleBoiling"],
+    "kitchen.multi_stage.brewing.prepare_coffee": ["PrepareCoffee"],
+    "kitchen.multi_stage.chopping_food.arrange_vegetables": ["ArrangeVegetables"],
+    "kitchen.multi_stage.chopping_food.bread_setup_slicing": ["BreadSetupSlicing"],
+    "kitchen.multi_stage.chopping_food.clearing_the_cutting_board": [
+        "ClearingTheCuttingBoard"
+    ],
+    "kitchen.multi_stage.chopping_food.meat_transfer": ["MeatTransfer"],
+    "kitchen.multi_stage.chopping_food.organize_vegetables": ["OrganizeVegetables"],
+    "kitchen.multi_stage.clearing_table.bowl_and_cup": ["BowlAndCup"],
+    "kitchen.multi_stage.clearing_table.candle_cleanup": ["CandleCleanup"],
+    "kitchen.multi_stage.clearing_table.clearing_cleaning_receptacles": [
+        "ClearingCleaningReceptacles"
+    ],
+    "kitchen.multi_stage.clearing_table.condiment_collection": ["CondimentCollection"],
+    "kitchen.multi_stage.clearing_table.dessert_assembly": ["DessertAssembly"],
+    "kitchen.multi_stage.clearing_table.drinkware_consolidation": [
+        "DrinkwareConsolidation"
+    ],
+    "kitchen.multi_stage.clearing_table.food_cleanup": ["FoodCleanup"],
+    "kitchen.multi_stage.defrosting_food.defrost_by_category": ["DefrostByCategory"],
+    "kitchen.multi_stage.defrosting_food.microwave_thawing": ["MicrowaveThawing"],
+    "kitchen.multi_stage.defrosting_food.quick_thaw": ["QuickThaw"],
+    "kitchen.multi_stage.defrosting_food.thaw_in_sink": ["ThawInSink"],
+    "kitchen.multi_stage.frying.assemble_cooking_array": ["AssembleCookingArray"],
+    "kitchen.multi_stage.frying.frying_pan_adjustment": ["FryingPanAdjustment"],
+    "kitchen.multi_stage.frying.meal_prep_staging": ["MealPrepStaging"],
+    "kitchen.multi_stage.frying.searing_meat": ["SearingMeat"],
+    "kitchen.multi_stage.frying.setup_frying": ["SetupFrying"],
+    "kitchen.multi_stage.making_toast.bread_selection": ["BreadSelection"],
+    "kitchen.multi_stage.making_toast.cheesy_bread": ["CheesyBread"],
+    "kitchen.multi_stage.making_toast.prepare_toast": ["PrepareToast"],
+    "kitchen.multi_stage.making_toast.sweet_savory_toast_setup": [
+        "SweetSavoryToastSetup"
+    ],
+    "kitchen.multi_stage.meat_preparation.prep_for_tenderizing": ["PrepForTenderizing"],
+    "kitchen.multi_stage.meat_preparation.prep_marinating_meat": ["PrepMarinatingMeat"],
+    "kitchen.multi_stage.mixing_and_blending.colorful_salsa": ["ColorfulSalsa"],
+    "kitchen.multi_stage.mixing_and_blending.setup_juicing": ["SetupJuicing"],
+    "kitchen.multi_stage.mixing_and_blending.spicy_marinade": ["SpicyMarinade"],
+    "kitchen.multi_stage.reheating_food.heat_mug": ["HeatMug"],
+    "kitchen.multi_stage.reheating_food.make_loaded_potato": ["MakeLoadedPotato"],
+    "kitchen.multi_stage.reheating_food.simmering_sauce": ["SimmeringSauce"],
+    "kitchen.multi_stage.reheating_food.waffle_reheat": ["WaffleReheat"],
+    "kitchen.multi_stage.reheating_food.warm_croissant": ["WarmCroissant"],
+    "kitchen.multi_stage.restocking_supplies.beverage_sorting": ["BeverageSorting"],
+    "kitchen.multi_stage.restocking_supplies.restock_bowls": ["RestockBowls"],
+    "kitchen.multi_stage.restocking_supplies.restock_pantry": ["RestockPantry"],
+    "kitchen.multi_stage.restocking_supplies.stocking_breakfast_foods": [
+        "StockingBreakfastFoods"
+    ],
+    "kitchen.multi_stage.sanitize_surface.clean_microwave": ["CleanMicrowave"],
+    "kitchen.multi_stage.sanitize_surface.countertop_cleanup": ["CountertopCleanup"],
+    "kitchen.multi_stage.sanitize_surface.prep_for_sanitizing": ["PrepForSanitizing"],
+    "kitchen.multi_stage.sanitize_surface.push_utensils_to_sink": [
+        "PushUtensilsToSink"
+    ],
+    "kitchen.multi_stage.serving_food.dessert_upgrade": ["DessertUpgrade"],
+    "kitchen.multi_stage.serving_food.pan_transfer": ["PanTransfer"],
+    "kitchen.multi_stage.serving_food.place_food_in_bowls": ["PlaceFoodInBowls"],
+    "kitchen.multi_stage.serving_food.prepare_soup_serving": ["PrepareSoupServing"],
+    "kitchen.multi_stage.serving_food.serve_steak": ["ServeSteak"],
+    "kitchen.multi_stage.serving_food.wine_serving_prep": ["WineServingPrep"],
+    "kitchen.multi_stage.setting_the_table.arrange_bread_basket": [
+        "ArrangeBreadBasket"
+    ],
+    "kitchen.multi_stage.setting_the_table.beverage_organization": [
+        "BeverageOrganization"
+    ],
+    "kitchen.multi_stage.setting_the_table.date_night": ["DateNight"],
+    "kitchen.multi_stage.setting_the_table.seasoning_spice_setup": [
+        "SeasoningSpiceSetup"
+    ],
+    "kitchen.multi_stage.setting_the_table.set_bowls_for_soup": ["SetBowlsForSoup"],
+    "kitchen.multi_stage.setting_the_table.size_sorting": ["SizeSorting"],
+    "kitchen.multi_stage.snack_preparation.bread_and_cheese": ["BreadAndCheese"],
+    "kitchen.multi_stage.snack_preparation.cereal_and_bowl": ["CerealAndBowl"],
+    "kitchen.multi_stage.snack_preparation.make_fruit_bowl": ["MakeFruitBowl"],
+    "kitchen.multi_stage.snack_preparation.veggie_dip_prep": ["VeggieDipPrep"],
+    "kitchen.multi_stage.snack_preparation.yogurt_delight_prep": ["YogurtDelightPrep"],
+    "kitchen.multi_stage.steaming_food.multistep_steaming": ["MultistepSteaming"],
+    "kitchen.multi_stage.steaming_food.steam_in_microwave": ["SteamInMicrowave"],
+    "kitchen.multi_stage.steaming_food.steam_vegetables": ["SteamVegetables"],
+    "kitchen.single_stage.kitchen_drawer": [
+        "ManipulateDrawer",
+        "OpenDrawer",
+        "CloseDrawer",
+    ],
+    "kitchen.multi_stage.tidying_cabinets_and_drawers.drawer_utensil_sort": [
+        "DrawerUtensilSort"
+    ],
+    "kitchen.multi_stage.tidying_cabinets_and_drawers.organize_cleaning_supplies": [
+        "OrganizeCleaningSupplies"
+    ],
+    "kitchen.multi_stage.tidying_cabinets_and_drawers.pantry_mishap": ["PantryMishap"],
+    "kitchen.multi_stage.tidying_cabinets_and_drawers.shaker_shuffle": [
+        "ShakerShuffle"
+    ],
+    "kitchen.multi_stage.tidying_cabinets_and_drawers.snack_sorting": ["SnackSorting"],
+    "kitchen.multi_stage.washing_dishes.dry_dishes": ["DryDishes"],
+    "kitchen.multi_stage.washing_dishes.dry_drinkware": ["DryDrinkware"],
+    "kitchen.multi_stage.washing_dishes.pre_soak_pan": ["PreSoakPan"],
+    "kitchen.multi_stage.washing_dishes.sorting_cleanup": ["SortingCleanup"],
+    "kitchen.multi_stage.washing_dishes.stack_bowls": ["StackBowlsInSink"],
+    "kitchen.multi_stage.washing_fruits_and_vegetables.afterwash_sorting": [
+        "AfterwashSorting"
+    ],
+    "kitchen.multi_stage.washing_fruits_and_vegetables.clear_clutter": ["ClearClutter"],
+    "kitchen.multi_stage.washing_fruits_and_vegetables.drain_veggies": ["DrainVeggies"],
+    "kitchen.multi_stage.washing_fruits_and_vegetables.prewash_food_assembly": [
+        "PrewashFoodAssembly"
+    ],
+    "kitchen.single_stage.kitchen_coffee": [
+        "PnPCoffee",
+        "CoffeeSetupMug",
+        "CoffeeServeMug",
+        "CoffeePressButton",
+    ],
+    "kitchen.single_stage.kitchen_doors": [
+        "ManipulateDoor",
+        "OpenDoor",
+        "OpenSingleDoor",
+        "OpenDoubleDoor",
+        "CloseDoor",
+        "CloseSingleDoor",
+        "CloseDoubleDoor",
+    ],
+    "kitchen.single_stage.kitchen_microwave": [
+        "MicrowavePressButton",
+        "TurnOnMicrowave",
+        "TurnOffMicrowave",
+    ],
+    "kitchen.single_stage.kitchen_navigate": ["NavigateKitchen"],
+    "kitchen.single_stage.kitchen_pnp": [
+        "PnP",
+        "PnPCounterToCab",
+        "PnPCabToCounter",
+        "PnPCounterToSink",
+        "PnPSinkToCounter",
+        "PnPCounterToMicrowave",
+        "PnPMicrowaveToCounter",
+        "PnPCounterToStove",
+        "PnPStoveToCounter",
+    ],
+    "kitchen.single_stage.kitchen_sink": [
+        "ManipulateSinkFaucet",
+        "TurnOnSinkFaucet",
+        "TurnOffSinkFaucet",
+        "TurnSinkSpout",
+    ],
+    "kitchen.single_stage.kitchen_stove": [
+        "ManipulateStoveKnob",
+        "TurnOnStove",
+        "TurnOffStove",
+    ],
+}
+
+# maps each kitchen environment name to the module defining it. Kitchen environments that are defined
+# elsewhere are added when their class is created (see kitchen.register_kitchen_env)
+KITCHEN_ENV_MODULES = {
+    env_name: "robocasa.environments." + module
+    for (module, env_names) in _KITCHEN_ENV_MODULES.items()
+    for env_name in env_names
+}
+
+ALL_KITCHEN_ENVIRONMENTS = KITCHEN_ENV_MODULES.keys()
+
+
+def get_kitchen_env_class(env_name):
+    """
+    Returns the class of a kitchen environment, importing its module if necessary
+
+    Args:
+        env_name (str): name of the kitchen environment
+
+    Returns:
+        type: kitchen environment class
+    """
+    module = importlib.import_module(KITCHEN_ENV_MODULES[env_name])
+    return getattr(module, env_name)
+
+
+def import_all_kitchen_envs():
+    """
+    Imports the modules of all kitchen environments
+    """
+    for module in sorted(set(KITCHEN_ENV_MODULES.values())):
+        importlib.import_module(module)
+
+
+class _LazyKitchenEnv:
+    """
+    Placeholder registered with robosuite for a kitchen environment whose module has not been imported yet.
+    Creating the environment imports the module, which registers the actual class in place of this placeholder.
+
+    Args:
+        env_name (str): name of the kitchen environment
+    """
+
+    def __init__(self, env_name):
+        self.env_name = env_name
+
+    def __call__(self, *args, **kwargs):
+        return get_kitchen_env_class(self.env_name)(*args, **kwargs)
+
+
+def register_kitchen_envs_lazily():
+    """
+    Registers all kitchen environments with robosuite without importing their modules
+    """
+    for env_name in KITCHEN_ENV_MODULES:
+        if env_name not in REGISTERED_ENVS:
+            REGISTERED_ENVS[env_name] = _LazyKitchenEnv(env_name)
@@ -1,3 +1,4 @@
+import json
 import os
 import random
 import xml.etree.ElementTree as ET
@@ -7,6 +8,7 @@ import numpy as np
 import robosuite.utils.transform_utils as T
 from robosuite.environments.manipulation.manipulation_env import ManipulationEnv
 from robosuite.models.tasks import ManipulationTask
+from robosuite.utils.binding_utils import MjSim
 from robosuite.utils.errors import RandomizationError
 from robosuite.utils.mjcf_utils import (
     array_to_string,
@@ -26,30 +28,43 @@ import robocasa.macros as macros
 import robocasa.utils.camera_utils as CamUtils
 import robocasa.utils.object_utils as OU
 import robocasa.models.scenes.scene_registry as SceneRegistry
+from robocasa.environments import KITCHEN_ENV_MODULES
 from robocasa.models.scenes import KitchenArena
 from robocasa.models.fixtures import *
+from robocasa.models.fixtures.fixture_index import FixtureIndex
+from robocasa.models.fixtures.site_toggles import SiteToggles
 from robocasa.models.objects.kitchen_object_utils import sample_kitchen_object
 from robocasa.models.objects.objects import MJCFObject
 from robocasa.utils.placement_samplers import (
+    PLACEMENT_SAMPLERS,
     SequentialCompositeSampler,
     UniformRandomSampler,
 )
 from robocasa.utils.texture_swap import (
+    TextureSwapper,
     get_random_textures,
-    replace_cab_textures,
-    replace_counter_top_texture,
-    replace_floor_texture,
-    replace_wall_texture,
+    get_texture_path,
+    set_cab_textures,
+    set_counter_top_texture,
+    set_floor_texture,
+    set_wall_texture,
 )
+from robocasa.utils.cache_utils import CompiledModelCache
+from robocasa.utils.contact_utils import ContactTable
+from robocasa.utils.object_states import ObjectStates
+from robocasa.utils.scene_bank import SceneBank, get_json_attrs
+from robocasa.utils.xml_pipeline import XMLPipeline, fix_asset_path, rename_legacy_base
 from robocasa.utils.config_utils import refactor_composite_controller_config
 from termcolor import colored
 from robocasa.models.objects.kitchen_objects import OBJ_CATEGORIES, OBJ_GROUPS
 import pdb
+
 REGISTERED_KITCHEN_ENVS = {}
 
 
 def register_kitchen_env(target_class):
     REGISTERED_KITCHEN_ENVS[target_class.__name__] = target_class
+    KITCHEN_ENV_MODULES.setdefault(target_class.__name__, target_class.__module__)
 
 
 class KitchenEnvMeta(EnvMeta):
@@ -71,6 +86,12 @@ _ROBOT_POS_OFFSETS: dict[str, list[float]] = {
     "GoogleRobot": [0, 0, 0],
 }
 
+# pose (pos + wxyz quat) of pooled objects that are hidden during soft resets
+_HIDDEN_OBJECT_QPOS = np.array([0.0, 0.0, -10.0, 1.0, 0.0, 0.0, 0.0])
+
+# damping applied to hidden objects so that they stay in place without collisions
+_HIDDEN_OBJECT_DAMPING = 1e6
+
 
 class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
     """
@@ -199,10 +220,39 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
 
         randomize_cameras (bool): if True, will add gaussian noise to the position and rotation of the
             wrist and agentview cameras
+
+        use_model_cache (bool): if True, compiled MuJoCo models are cached on disk (keyed by a hash of the
+            post-processed model xml) and reloaded instead of recompiled when the same scene is seen again
+
+        soft_reset (bool): if True, resets keep the compiled scene (layout, style, fixtures and robot) and only
+            switch which set of objects from the object pool is active and re-sample their placements. The scene
+            is only rebuilt when placement fails or when episode meta data is set
+
+        object_pool_size (int): number of object sets that are sampled and compiled into the scene when using
+            soft resets. Objects of inactive sets are hidden below the floor
+
+        scene_bank (str or SceneBank): scene bank (or path to one) generated with scripts/generate_scene_bank.py.
+            If set, resets use the pre-generated episodes of the bank in order, starting at a random entry,
+            instead of sampling scenes online. Every bank reset rebuilds and compiles the scene of its episode
+            (see use_model_cache to skip recompiling)
+
+        texture_randomization (str): if set to "episode" or "step", generative textures are re-sampled every episode
+            or every step and swapped in place in the compiled model, without recompiling it. Requires
+            generative_textures to be set
+
+        settle_qvel_threshold (float): if set, objects are settled at reset until the norms of the object and robot
+            joint velocities fall below this threshold, instead of for a fixed number of substeps
+
+        max_settle_substeps (int): maximum number of physics substeps used to settle objects at reset. If None,
+            defaults to 10 control steps. The number of substeps used at the last reset is stored in settle_substeps
     """
 
     EXCLUDE_LAYOUTS = []
 
+    # task attributes that _get_obj_cfgs samples along with the objects (e.g. number of objects). They are kept
+    # with each object set of the object pool, and stored in scene bank episodes
+    OBJECT_TASK_ATTRS = []
+
     def __init__(
         self,
         robots,
@@ -244,6 +294,13 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         use_distractors=False,
         translucent_robot=False,
         randomize_cameras=False,
+        use_model_cache=False,
+        soft_reset=False,
+        object_pool_size=4,
+        scene_bank=None,
+        texture_randomization=None,
+        settle_qvel_threshold=None,
+        max_settle_substeps=None,
         object=None,
     ):
         self.init_robot_base_pos = init_robot_base_pos
@@ -259,8 +316,12 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
             ), "layout_ids and style_ids must both be set to None if layout_and_style_ids is set"
             self.layout_and_style_ids = layout_and_style_ids
         else:
-            layout_ids = SceneRegistry.unpack_layout_ids(layout_ids) #-1 which is esseitnial [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
-            style_ids = SceneRegistry.unpack_style_ids(style_ids) #[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
+            layout_ids = SceneRegistry.unpack_layout_ids(
+                layout_ids
+            )  # -1 which is esseitnial [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+            style_ids = SceneRegistry.unpack_style_ids(
+                style_ids
+            )  # [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
             self.layout_and_style_ids = [(l, s) for l in layout_ids for s in style_ids]
 
         # remove excluded layouts
@@ -273,9 +334,54 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         assert generative_textures in [None, False, "100p"]
         self.generative_textures = generative_textures
 
+        assert texture_randomization in [None, "episode", "step"]
+        if texture_randomization is not None:
+            assert (
+                generative_textures == "100p"
+            ), "texture_randomization requires generative_textures to be set"
+        self.texture_randomization = texture_randomization
+        self._texture_swapper = None
+
+        self.settle_qvel_threshold = settle_qvel_threshold
+        self.max_settle_substeps = max_settle_substeps
+        self.settle_substeps = 0
+
+        # spatial index over the placed fixtures, built on first use (see fixture_index)
+        self._fixture_index = None
+
+        # contact lookups of the current sim (see check_contact)
+        self._contact_table = None
+
+        # batched states of the objects of the current episode, built on first use (see object_states)
+        self._object_states = None
+
+        # batched update of the burner flames, sink water, etc. of the current sim (see update_state)
+        self._site_toggles = None
+
+        # internal fixture states at the start of an episode (see _reset_internal)
+        self._init_fixture_states = dict()
+
         self.use_distractors = use_distractors
         self.translucent_robot = translucent_robot
-        self.randomize_cameras = False #randomize_cameras
+        self.randomize_cameras = False  # randomize_cameras
+
+        self.use_model_cache = use_model_cache
+        self._model_cache = CompiledModelCache() if use_model_cache else None
+
+        self.soft_reset = soft_reset
+        self.object_pool_size = object_pool_size if soft_reset else 1
+        self._object_pool = None
+        self._object_name_suffix = ""
+        self._object_pool_sim = None
+        self._observable_obj_names = None
+
+        if isinstance(scene_bank, str):
+            scene_bank = SceneBank(scene_bank)
+        self.scene_bank = scene_bank
+        self._scene_bank_idx = None
+        self._scene_bank_entry = None
+
+        self._xml_pipeline = None
 
         # intialize cameras
         self._cam_configs = deepcopy(CamUtils.CAM_CONFIGS)
@@ -388,6 +494,7 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         # setup fixtures
         self.fixture_cfgs = self.mujoco_arena.get_fixture_cfgs()
         self.fixtures = {cfg["name"]: cfg["model"] for cfg in self.fixture_cfgs}
+        self._fixture_index = None
 
         # setup scene, robots, objects
         self.model = ManipulationTask(
@@ -401,14 +508,25 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
             self.fixture_cfgs, z_offset=0.0
         )
         fxtr_placements = None
-        for i in range(10):
-            try:
-                fxtr_placements = fxtr_placement_initializer.sample()
-            except RandomizationError as e:
-                if macros.VERBOSE:
-                    print("Ranomization error in initial placement. Try #{}".format(i))
-                continue
-            break
+        if self._scene_bank_entry is not None:
+            # use the fixture placements of the scene bank episode
+            fxtr_placements = {
+                name: (np.array(pos), np.array(quat), self.fixtures[name])
+                for (name, (pos, quat)) in self._scene_bank_entry[
+                    "fixture_placements"
+                ].items()
+            }
+        else:
+            for i in range(10):
+                try:
+                    fxtr_placements = fxtr_placement_initializer.sample()
+                except RandomizationError as e:
+                    if macros.VERBOSE:
+                        print(
+                            "Ranomization error in initial placement. Try #{}".format(i)
+                        )
+                    continue
+                break
         if fxtr_placements is None:
             if macros.VERBOSE:
                 print("Could not place fixtures. Trying again with self._load_model()")
@@ -422,9 +540,17 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
 
             # hacky code to set orientation
             obj.set_euler(T.mat2euler(T.quat2mat(T.convert_quat(obj_quat, "xyzw"))))
+        # fixtures have moved, rebuild the index on next use
+        self._fixture_index = None
 
         # setup internal references related to fixtures
         self._setup_kitchen_references()
+        # fixture states at the start of an episode, restored on every reset (see _reset_internal)
+        self._init_fixture_states = {
+            name: fxtr.get_internal_state()
+            for (name, fxtr) in self.fixtures.items()
+            if isinstance(fxtr, Fixture)
+        }
 
         # set robot position
         if self.init_robot_base_pos is not None:
@@ -457,12 +583,18 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         robot_base_pos, robot_base_ori = self.compute_robot_base_placement_pose(
             ref_fixture=ref_fixture
         )
-        robot_model = self.robots[0].robot_model
-        robot_model.set_base_xpos(robot_base_pos)
-        robot_model.set_base_ori(robot_base_ori)
+        self._place_robot(robot_base_pos, robot_base_ori)
 
         # create and place objects
-        self._create_objects()
+        self._create_object_pool()
+        self._activate_object_set(0)
+
+        if self._scene_bank_entry is not None:
+            # object placements are part of the sim state of the scene bank episode
+            self.__dict__.update(self._scene_bank_entry["task_attrs"])
+            self.placement_initializer = None
+            self.object_placements = {}
+            return
 
         # setup object locations
         self.placement_initializer = self._get_placement_initializer(self.object_cfgs)
@@ -484,6 +616,61 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
             return
         self.object_placements = object_placements
 
+    def _place_robot(self, robot_base_pos, robot_base_ori):
+        """
+        Places the robot base. When resetting from a scene bank, the robot placement of the scene bank episode
+        is used instead
+
+        Args:
+            robot_base_pos (np.array): robot base position
+
+            robot_base_ori (np.array): robot base orientation (see compute_robot_base_placement_pose)
+        """
+        robot_model = self.robots[0].robot_model
+        if self._scene_bank_entry is None:
+            robot_model.set_base_xpos(robot_base_pos)
+            robot_model.set_base_ori(robot_base_ori)
+            return
+        root_body = robot_model._elements["root_body"]
+        for (attrib, value) in self._scene_bank_entry["robot_base"].items():
+            if value is not None:
+                root_body.set(attrib, value)
+
+    def _create_object_pool(self):
+        """
+        Creates the object sets of the object pool and adds all of their objects to the scene. Each set holds
+        the object configurations, the objects and the task attributes sampled along with them (see
+        OBJECT_TASK_ATTRS). Objects of the first set keep their configured names, objects of the other sets are
+        suffixed with their set index
+        """
+        pool_size = 1 if "object_cfgs" in self._ep_meta else self.object_pool_size
+        self._object_pool = []
+        for set_idx in range(pool_size):
+            self._object_name_suffix = "" if set_idx == 0 else "_set{}".format(set_idx)
+            self._create_objects()
+            # copied, since the next object set may sample them in place
+            episode_attrs = {
+                k: deepcopy(self.__dict__[k])
+                for k in self.OBJECT_TASK_ATTRS
+                if k in self.__dict__
+            }
+            self._object_pool.append((self.object_cfgs, self.objects, episode_attrs))
+        self._object_name_suffix = ""
+
+    def _activate_object_set(self, set_idx):
+        """
+        Makes an object set of the object pool the active set of objects of the environment
+
+        Args:
+            set_idx (int): index of the object set in the object pool
+        """
+        object_cfgs, objects, episode_attrs = self._object_pool[set_idx]
+        self.object_cfgs = object_cfgs
+        self.objects = objects
+        # copied, so that changes made during an episode do not carry over to later uses of the set
+        self.__dict__.update(deepcopy(episode_attrs))
+        self._episode_attrs = episode_attrs
+
     def _create_objects(self):
         """
         Creates and places objects in the kitchen environment.
@@ -498,7 +685,7 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
                     cfg["name"] = "obj_{}".format(obj_num + 1)
                 model, info = self._create_obj(cfg)
                 cfg["info"] = info
-                self.objects[model.name] = model
+                self.objects[cfg["name"]] = model
                 self.model.merge_objects([model])
         else:
             self.object_cfgs = self._get_obj_cfgs()
@@ -509,17 +696,17 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
                     cfg["name"] = "obj_{}".format(obj_num + 1)
                 # graspable='graspable' in cfg and cfg['graspable']==True
                 # if graspable:
-                    # print(colored(f'GRASPABLE, {graspable}','red'))
-                    # if cfg.get('exclude_obj_groups',None) is None:
-                    #     cfg['exclude_obj_groups'] = []
-                    # cfg['exclude_obj_groups'].append('PnPStoveToCounter_seen')
-                    # cfg['obj_groups'] = random.choice(OBJ_GROUPS['PnPStoveToCounter_unseen'])
+                # print(colored(f'GRASPABLE, {graspable}','red'))
+                # if cfg.get('exclude_obj_groups',None) is None:
+                #     cfg['exclude_obj_groups'] = []
+                # cfg['exclude_obj_groups'].append('PnPStoveToCounter_seen')
+                # cfg['obj_groups'] = random.choice(OBJ_GROUPS['PnPStoveToCounter_unseen'])
                 model, info = self._create_obj(cfg)
                 # if graspable:
-                    # cate = info['cat']
-                    # print(colored(f'CREATED NEW OBJECT {cate}. {graspable}','red'))
+                # cate = info['cat']
+                # print(colored(f'CREATED NEW OBJECT {cate}. {graspable}','red'))
                 cfg["info"] = info
-                self.objects[model.name] = model
+                self.objects[cfg["name"]] = model
                 self.model.merge_objects([model])
 
                 try_to_place_in = cfg["placement"].get("try_to_place_in", None)
@@ -544,7 +731,7 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
                     addl_obj_cfgs.append(container_cfg)
                     model, info = self._create_obj(container_cfg)
                     container_cfg["info"] = info
-                    self.objects[model.name] = model
+                    self.objects[container_cfg["name"]] = model
                     self.model.merge_objects([model])
 
                     # modify object config to lie inside of container
@@ -592,13 +779,15 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
             freezable=cfg.get("freezable", None),
             max_size=cfg.get("max_size", (None, None, None)),
             object_scale=cfg.get("object_scale", None),
-            split=cfg.get("split", None),            
+            split=cfg.get("split", None),
         )
         if cfg.get("split", None):
-            print('WHAT SPLIT ARE WE USING', cfg['split'])
+            print("WHAT SPLIT ARE WE USING", cfg["split"])
         info = object_info
 
-        object = MJCFObject(name=cfg["name"], **object_kwargs)
+        object = MJCFObject(
+            name=cfg["name"] + self._object_name_suffix, **object_kwargs
+        )
 
         return object, info
 
@@ -613,7 +802,8 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         }
 
     def _reset_observables(self):
-        if self.hard_reset:
+        # object sets of the object pool can have differently named objects
+        if self.hard_reset or set(self.objects) != self._observable_obj_names:
             self._observables = self._setup_observables()
 
     def compute_robot_base_placement_pose(self, ref_fixture, offset=None):
@@ -634,22 +824,18 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
 
         # get all base fixtures in the environment
         base_fixtures = [
-            fxtr
-            for fxtr in self.fixtures.values()
-            if isinstance(fxtr, Counter)
-            or isinstance(fxtr, Stove)
-            or isinstance(fxtr, Stovetop)
-            or isinstance(fxtr, HousingCabinet)
-            or isinstance(fxtr, Fridge)
+            self.fixtures[name]
+            for name in self.fixture_index.get_fixtures_of_class(
+                (Counter, Stove, Stovetop, HousingCabinet, Fridge)
+            )
         ]
 
-        for fxtr in base_fixtures:
-            # get bounds of fixture
-            point = ref_fixture.pos
-            if not OU.point_in_fixture(point=point, fixture=fxtr, only_2d=True):
-                continue
-            base_fixture = fxtr
-            break
+        # first base fixture that contains the reference fixture
+        contains_ref = self.fixture_index.points_in_fixture(
+            ref_fixture.pos, base_fixtures
+        )
+        if np.any(contains_ref):
+            base_fixture = base_fixtures[np.argmax(contains_ref)]
 
         # set the base fixture as the ref fixture itself if cannot find fixture containing ref
         if base_fixture is None:
@@ -867,8 +1053,10 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
                 site_tree = ET.fromstring(site_str)
                 self.model.worldbody.append(site_tree)
 
+            # "uniform" (default) or "occupancy_grid" for crowded regions
+            sampler_cls = PLACEMENT_SAMPLERS[placement.get("sampler", "uniform")]
             placement_initializer.append_sampler(
-                sampler=UniformRandomSampler(
+                sampler=sampler_cls(
                     name="{}_Sampler".format(cfg["name"]),
                     mujoco_objects=mj_obj,
                     x_range=x_range,
@@ -885,18 +1073,227 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
                     z_offset=z_offset,
                     rng=self.rng,
                     rotation_axis=placement.get("rotation_axis", "z"),
+                    **placement.get("sampler_kwargs", {}),
                 ),
-                sample_args=placement.get("sample_args", None),
+                sample_args=self._get_sample_args(placement),
             )
 
         return placement_initializer
 
+    def _get_sample_args(self, placement):
+        """
+        Returns the sample args of a placement, with references to objects resolved to the names of the object
+        models (placements are keyed by model name, which differs from the configured name for pooled objects)
+        """
+        sample_args = placement.get("sample_args", None)
+        if sample_args is None:
+            return None
+        reference = sample_args.get("reference", None)
+        if isinstance(reference, str) and reference in self.objects:
+            sample_args = dict(sample_args, reference=self.objects[reference].name)
+        return sample_args
+
+    def reset(self):
+        """
+        Resets the environment. If a scene bank is used, the next episode of the scene bank is loaded. Otherwise,
+        if soft resets are enabled, the compiled scene is kept and only a new object set from the object pool is
+        activated and placed, unless this fails or episode meta data has been set.
+
+        Returns:
+            OrderedDict: Environment observation space after reset occurs
+        """
+        if self.scene_bank is not None and not self.deterministic_reset:
+            return self._reset_from_scene_bank()
+
+        if not self._sample_soft_reset():
+            return super().reset()
+
+        # keep the current sim, the base class then only resets it
+        hard_reset = self.hard_reset
+        self.hard_reset = False
+        try:
+            return super().reset()
+        finally:
+            self.hard_reset = hard_reset
+
+    def _reset_from_scene_bank(self):
+        """
+        Resets the environment to the next episode of the scene bank. The scene of the episode is rebuilt from its
+        meta data and placements, and compiled, on every reset. With use_model_cache, the compiled model of an
+        episode is loaded from the model cache after its first use instead of being recompiled
+
+        Returns:
+            OrderedDict: Environment observation space after reset occurs
+
+        Raises:
+            ValueError: if the scene bank was generated with another environment or robot
+        """
+        self._check_scene_bank()
+        if self._scene_bank_idx is None:
+            self._scene_bank_idx = int(self.rng.integers(len(self.scene_bank)))
+        entry = self.scene_bank[self._scene_bank_idx]
+        self._scene_bank_idx = (self._scene_bank_idx + 1) % len(self.scene_bank)
+
+        # the scene is always rebuilt from the episode meta data of the entry
+        self.set_ep_meta(deepcopy(entry["ep_meta"]))
+        self._scene_bank_entry = entry
+        hard_reset = self.hard_reset
+        self.hard_reset = True
+        try:
+            super().reset()
+        finally:
+            self.hard_reset = hard_reset
+            self._scene_bank_entry = None
+
+        # restore the settled state, overriding fixture states sampled by the task. The state size depends on the
+        # scene of the episode, so it can only be checked once the scene is compiled
+        states = entry["states"]
+        if len(states) != len(self.sim.get_state().flatten()):
+            raise ValueError(
+                "Scene bank state does not match the environment. Was the scene bank generated with the same "
+                "environment and robot?"
+            )
+        self.sim.set_state_from_flattened(states)
+        self.sim.forward()
+        self._obs_cache = {}
+        self.update_state()
+        return (
+            self.viewer._get_observations(force_update=True)
+            if self.viewer_get_obs
+            else self._get_observations(force_update=True)
+        )
+
+    def _check_scene_bank(self):
+        """
+        Checks that the scene bank was generated with this environment (or one of its base classes) and the same
+        robots, before any scene of the bank is built
+
+        Raises:
+            ValueError: if the scene bank was generated with another environment or robot
+        """
+        env_names = [cls.__name__ for cls in type(self).__mro__]
+        robots = self.scene_bank.env_kwargs.get("robots", None)
+        if isinstance(robots, str):
+            robots = [robots]
+        if self.scene_bank.env_name not in env_names or (
+            robots is not None and robots != [robot.name for robot in self.robots]
+        ):
+            raise ValueError(
+                "Scene bank was generated with environment {} and robots {}, which do not match the environment".format(
+                    self.scene_bank.env_name, robots
+                )
+            )
+
+    def get_scene_bank_entry(self):
+        """
+        Returns the current episode as a scene bank entry (see SceneBank). Should be called right after a reset
+
+        Returns:
+            dict: scene bank entry
+
+        Raises:
+            ValueError: if the task attributes sampled along with the objects (see OBJECT_TASK_ATTRS) cannot be
+                stored (see get_json_attrs)
+        """
+        root_body = self.robots[0].robot_model._elements["root_body"]
+        return dict(
+            ep_meta=self.get_ep_meta(),
+            fixture_placements={
+                name: (np.array(pos).tolist(), np.array(quat).tolist())
+                for (name, (pos, quat, _)) in self.fxtr_placements.items()
+            },
+            robot_base=dict(pos=root_body.get("pos"), quat=root_body.get("quat")),
+            task_attrs=get_json_attrs(self._episode_attrs),
+            states=self.sim.get_state().flatten(),
+        )
+
+    def _sample_soft_reset(self, num_tries=10):
+        """
+        Activates a random object set of the object pool and samples placements for its objects
+
+        Args:
+            num_tries (int): number of placement attempts before giving up
+
+        Returns:
+            bool: True if a soft reset can be done, False if the scene has to be rebuilt instead
+        """
+        if (
+            not self.soft_reset
+            or self._object_pool is None
+            or self.sim is None
+            or self.deterministic_reset
+            or self._ep_meta
+        ):
+            return False
+
+        for i in range(num_tries):
+            self._activate_object_set(self.rng.integers(len(self._object_pool)))
+            self.placement_initializer = self._get_placement_initializer(
+                self.object_cfgs
+            )
+            try:
+                self.object_placements = self.placement_initializer.sample(
+                    placed_objects=self.fxtr_placements
+                )
+            except RandomizationError:
+                if macros.VERBOSE:
+                    print("Randomization error in soft reset. Try #{}".format(i))
+                continue
+            return True
+
+        if macros.VERBOSE:
+            print("Could not place objects. Rebuilding the scene instead")
+        return False
+
+    def _hide_inactive_objects(self):
+        """
+        Hides the objects of the object pool that are not part of the active object set. They are moved below
+        the floor, excluded from collisions and heavily damped so that they stay in place. The properties of
+        active objects are restored from the compiled model
+        """
+        model = self.sim.model
+        if self._object_pool_sim is not self.sim:
+            # new sim: record defaults and the geoms and dofs of every pooled object
+            self._object_pool_sim = self.sim
+            self._object_pool_defaults = (
+                model.geom_contype.copy(),
+                model.geom_conaffinity.copy(),
+                model.dof_damping.copy(),
+            )
+            self._object_pool_ids = {}
+            for (_, objects, _) in self._object_pool:
+                for obj in objects.values():
+                    root_id = model.body_name2id(obj.root_body)
+                    self._object_pool_ids[obj.name] = (
+                        np.flatnonzero(model.body_rootid[model.geom_bodyid] == root_id),
+                        np.flatnonzero(model.body_rootid[model.dof_bodyid] == root_id),
+                    )
+
+        contype, conaffinity, damping = self._object_pool_defaults
+        model.geom_contype[:] = contype
+        model.geom_conaffinity[:] = conaffinity
+        model.dof_damping[:] = damping
+
+        active_names = set([obj.name for obj in self.objects.values()])
+        for (_, objects, _) in self._object_pool:
+            for obj in objects.values():
+                if obj.name in active_names:
+                    continue
+                geom_ids, dof_ids = self._object_pool_ids[obj.name]
+                model.geom_contype[geom_ids] = 0
+                model.geom_conaffinity[geom_ids] = 0
+                model.dof_damping[dof_ids] = _HIDDEN_OBJECT_DAMPING
+                self.sim.data.set_joint_qpos(obj.joints[0], _HIDDEN_OBJECT_QPOS)
+
     def _reset_internal(self):
         """
         Resets simulation internal configurations.
         """
         super()._reset_internal()
 
+        for (name, state) in self._init_fixture_states.items():
+            self.fixtures[name].set_internal_state(state)
+
         # Reset all object positions using initializer sampler if we're not directly loading from an xml
         if not self.deterministic_reset and self.placement_initializer is not None:
             # use pre-computed object placements
@@ -909,6 +1306,24 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
                     np.concatenate([np.array(obj_pos), np.array(obj_quat)]),
                 )
 
+            if self._object_pool is not None and len(self._object_pool) > 1:
+                self._hide_inactive_objects()
+
+        if self.texture_randomization is not None and not self.deterministic_reset:
+            self.swap_generative_textures()
+
+        if self._scene_bank_entry is not None:
+            # the scene bank state has already been settled
+            self.settle_substeps = 0
+            return
+
+        self._settle_objects()
+
+    def _settle_objects(self):
+        """
+        Steps the simulation with an empty action to settle objects. If settle_qvel_threshold is set, stops after
+        the first control step at which the object and robot joint velocity norms are below the threshold.
+        """
         # step through a few timesteps to settle objects
         action = np.zeros(self.action_spec[0].shape)  # apply empty action
 
@@ -918,13 +1333,63 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         # or an actual policy update
         policy_step = True
 
+        substeps_per_control_step = int(self.control_timestep / self.model_timestep)
+        max_substeps = self.max_settle_substeps
+        if max_substeps is None:
+            max_substeps = 10 * substeps_per_control_step
+        if self.settle_qvel_threshold is not None:
+            obj_dof_ids, robot_dof_ids = self._get_settle_dof_ids()
+
         # Loop through the simulation at the model timestep rate until we're ready to take the next policy step
         # (as defined by the control frequency specified at the environment level)
-        for i in range(10 * int(self.control_timestep / self.model_timestep)):
+        self.settle_substeps = 0
+        while self.settle_substeps < max_substeps:
             self.sim.step1()
             self._pre_action(action, policy_step)
             self.sim.step2()
             policy_step = False
+            self.settle_substeps += 1
+
+            # only check for settling at control steps, objects start out at rest before falling into place
+            if (
+                self.settle_qvel_threshold is not None
+                and self.settle_substeps % substeps_per_control_step == 0
+            ):
+                qvel = self.sim.data.qvel
+                if (
+                    np.linalg.norm(qvel[obj_dof_ids]) < self.settle_qvel_threshold
+                    and np.linalg.norm(qvel[robot_dof_ids]) < self.settle_qvel_threshold
+                ):
+                    break
+
+    def _get_settle_dof_ids(self):
+        """
+        Returns the dof ids of the object joints and robot joints, which are checked when settling objects
+
+        Returns:
+            2-tuple:
+                - (np.array) object dof ids
+                - (np.array) robot dof ids
+        """
+        model = self.sim.model
+
+        def get_dof_ids(joint_names):
+            dof_ids = []
+            for name in joint_names:
+                joint_id = model.joint_name2id(name)
+                dof_adr = model.jnt_dofadr[joint_id]
+                if joint_id + 1 < model.njnt:
+                    dof_end = model.jnt_dofadr[joint_id + 1]
+                else:
+                    dof_end = model.nv
+                dof_ids.extend(range(dof_adr, dof_end))
+            return np.array(dof_ids, dtype=int)
+
+        obj_joints = [joint for obj in self.objects.values() for joint in obj.joints]
+        robot_joints = [
+            joint for robot in self.robots for joint in robot.robot_model.joints
+        ]
+        return get_dof_ids(obj_joints), get_dof_ids(robot_joints)
 
     def _get_obj_cfgs(self):
         """
@@ -989,12 +1454,12 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         """
         Adds new kitchen-relevant cameras to the environment. Will randomize cameras if specified.
         """
-        if 'cam_configs' in self._ep_meta:
-            self._cam_configs = self._ep_meta['cam_configs']
+        if "cam_configs" in self._ep_meta:
+            self._cam_configs = self._ep_meta["cam_configs"]
         else:
             self._cam_configs = deepcopy(CamUtils.CAM_CONFIGS)
         if self.randomize_cameras:
-            print('RANDOMIZING CAMERA')
+            print("RANDOMIZING CAMERA")
             self._randomize_cameras()
 
         for (cam_name, cam_cfg) in self._cam_configs.items():
@@ -1009,8 +1474,8 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
             )
 
     def _randomize_cameras(self):
-        print('SHOULD NOT BE RANDOMIZING CAMERAS')
-        assert False==True
+        print("SHOULD NOT BE RANDOMIZING CAMERAS")
+        assert False == True
         """
         Randomizes the position and rotation of the wrist and agentview cameras.
         Note: This function is called only if randomize_cameras is set to True.
@@ -1037,10 +1502,31 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
             new_quat = Rotation.from_euler("xyz", new_euler, degrees=True).as_quat()
             self._cam_configs[camera]["quat"] = list(new_quat)
 
+    def _initialize_sim(self, xml_string=None):
+        """
+        Creates a MjSim object and stores it in self.sim. If the model cache is enabled,
+        the compiled model is loaded from the cache when available instead of being recompiled.
+
+        Args:
+            xml_string (str): If specified, creates MjSim object from this filepath
+        """
+        if not self.use_model_cache:
+            super()._initialize_sim(xml_string=xml_string)
+            return
+
+        xml = xml_string if xml_string else self.model.get_xml()
+        for processor in self._xml_processors:
+            xml = processor(xml)
+
+        self.sim = MjSim(self._model_cache.load_or_compile(xml))
+        self.sim.forward()
+        self.initialize_time(self.control_freq)
+
     def edit_model_xml(self, xml_str):
         """
         This function postprocesses the model.xml collected from a MuJoCo demonstration
-        for retrospective model changes.
+        for retrospective model changes. All changes are applied in a single pass over the parsed xml
+        (see _get_xml_pipeline), and results are memoized.
 
         Args:
             xml_str (str): Mujoco sim demonstration XML file as string
@@ -1048,69 +1534,78 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         Returns:
             str: Post-processed xml file as string
         """
-        xml_str = super().edit_model_xml(xml_str)
-
-        tree = ET.fromstring(xml_str)
-        root = tree
-        worldbody = root.find("worldbody")
-        actuator = root.find("actuator")
-        asset = root.find("asset")
-        meshes = asset.findall("mesh")
-        textures = asset.findall("texture")
-        all_elements = meshes + textures
-
-        robocasa_path_split = os.path.split(robocasa.__file__)[0].split("/")
-
-        # replace robocasa-specific asset paths
-        for elem in all_elements:
-            old_path = elem.get("file")
-            if old_path is None:
-                continue
-
-            old_path_split = old_path.split("/")
-            # maybe replace all paths to robosuite assets
-            if (
-                ("models/assets/fixtures" in old_path)
-                or ("models/assets/textures" in old_path)
-                or ("models/assets/objects/objaverse" in old_path)
-            ):
-                if "/robosuite/" in old_path:
-                    check_lst = [
-                        loc
-                        for loc, val in enumerate(old_path_split)
-                        if val == "robosuite"
-                    ]
-                elif "/robocasa/" in old_path:
-                    check_lst = [
-                        loc
-                        for loc, val in enumerate(old_path_split)
-                        if val == "robocasa"
-                    ]
-                else:
-                    raise ValueError
+        if (self.generative_textures is not None) and (
+            self.generative_textures is not False
+        ):
+            # sample textures
+            assert self.generative_textures == "100p"
+            if self._curr_gen_fixtures is None or self._curr_gen_fixtures == {}:
+                self._curr_gen_fixtures = get_random_textures(self.rng)
+            gen_textures = self._curr_gen_fixtures
+        else:
+            gen_textures = None
 
-                ind = max(check_lst)  # last occurrence index
-                new_path_split = robocasa_path_split + old_path_split[ind + 1 :]
+        key = json.dumps([self._cam_configs, gen_textures], sort_keys=True, default=str)
+        return self._get_xml_pipeline().run(xml_str, key=key)
 
-                new_path = "/".join(new_path_split)
-                elem.set("file", new_path)
+    def _get_xml_pipeline(self):
+        """
+        Returns the pipeline of xml rewrites applied by edit_model_xml: asset paths are pointed to the local
+        robosuite / robocasa installations, cameras are set from the camera configs, legacy base names are
+        renamed, and generative textures are applied if enabled
 
-        # set cameras
+        Returns:
+            XMLPipeline: xml pipeline
+        """
+        if self._xml_pipeline is None:
+            pipeline = XMLPipeline(cache_size=macros.EDIT_MODEL_XML_CACHE_SIZE)
+            pipeline.add_element_pass(
+                fix_asset_path, section="asset", tags=["mesh", "texture"]
+            )
+            # record bodies and cameras before they are renamed
+            pipeline.add_element_pass(
+                self._record_xml_element, section="worldbody", tags=["body", "camera"]
+            )
+            pipeline.add_element_pass(
+                rename_legacy_base,
+                section="worldbody",
+                tags=["geom", "site", "body", "joint"],
+            )
+            pipeline.add_element_pass(
+                rename_legacy_base,
+                section="actuator",
+                tags=["velocity", "position", "motor", "general"],
+            )
+            pipeline.add_tree_pass(self._set_xml_cameras)
+            pipeline.add_tree_pass(self._set_xml_textures)
+            self._xml_pipeline = pipeline
+        return self._xml_pipeline
+
+    @staticmethod
+    def _record_xml_element(elem, ctx):
+        name = elem.get("name")
+        if name is not None:
+            ctx.setdefault(elem.tag, dict()).setdefault(name, elem)
+
+    def _set_xml_cameras(self, root, ctx):
+        """
+        Sets the cameras of a parsed model xml from the camera configs, adding missing cameras
+        """
+        worldbody = root.find("worldbody")
         for cam_name, cam_config in self._cam_configs.items():
             parent_body = cam_config.get("parent_body", None)
 
-            cam_root = worldbody
             if parent_body is not None:
-                cam_root = find_elements(
-                    root=worldbody, tags="body", attribs={"name": parent_body}
-                )
+                cam_root = ctx.get("body", {}).get(parent_body, None)
                 if cam_root is None:
                     # camera config refers to body that doesnt exist on the robot
                     continue
-
-            cam = find_elements(
-                root=cam_root, tags="camera", attribs={"name": cam_name}
-            )
+                cam = find_elements(
+                    root=cam_root, tags="camera", attribs={"name": cam_name}
+                )
+            else:
+                cam_root = worldbody
+                cam = ctx.get("camera", {}).get(cam_name, None)
 
             if cam is None:
                 cam = ET.Element("camera")
@@ -1123,71 +1618,50 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
             for (k, v) in cam_config.get("camera_attribs", {}).items():
                 cam.set(k, v)
 
-        # replace base -> mobilebase (this is needed for old PandaOmron demos)
-        for elem in find_elements(
-            root=worldbody, tags=["geom", "site", "body", "joint"], return_first=False
-        ):
-            if elem.get("name") is None:
-                continue
-            if elem.get("name").startswith("base0_"):
-                old_name = elem.get("name")
-                new_name = "mobilebase0_" + old_name[6:]
-                elem.set("name", new_name)
-        for elem in find_elements(
-            root=actuator,
-            tags=["velocity", "position", "motor", "general"],
-            return_first=False,
-        ):
-            if elem.get("name") is None:
-                continue
-            if elem.get("name").startswith("base0_"):
-                old_name = elem.get("name")
-                new_name = "mobilebase0_" + old_name[6:]
-                elem.set("name", new_name)
-        for elem in find_elements(
-            root=actuator,
-            tags=["velocity", "position", "motor", "general"],
-            return_first=False,
-        ):
-            if elem.get("joint") is None:
-                continue
-            if elem.get("joint").startswith("base0_"):
-                old_joint = elem.get("joint")
-                new_joint = "mobilebase0_" + old_joint[6:]
-                elem.set("joint", new_joint)
-
-        # result = ET.tostring(root, encoding="utf8").decode("utf8")
-        result = ET.tostring(root).decode("utf8")
-        # find the textures and replace with them
-        # replace with generative textures
-        # self.generative_textures=False
-        if (self.generative_textures is not None) and (
-            self.generative_textures is not False
-        ):
-            # sample textures
-            assert self.generative_textures == "100p"
-            if self._curr_gen_fixtures is None or self._curr_gen_fixtures == {}:
-                self._curr_gen_fixtures = get_random_textures(self.rng)
+    def _set_xml_textures(self, root, ctx):
+        """
+        Applies the sampled generative textures to a parsed model xml
+        """
+        if self.generative_textures in [None, False]:
+            return
+        asset = root.find("asset")
+        gen_textures = self._curr_gen_fixtures
+        set_cab_textures(asset, get_texture_path(gen_textures["cab_tex"]))
+        set_counter_top_texture(asset, get_texture_path(gen_textures["counter_tex"]))
+        set_wall_texture(asset, get_texture_path(gen_textures["wall_tex"]))
+        set_floor_texture(asset, get_texture_path(gen_textures["floor_tex"]))
 
-            cab_tex = self._curr_gen_fixtures["cab_tex"]
-            counter_tex = self._curr_gen_fixtures["counter_tex"]
-            wall_tex = self._curr_gen_fixtures["wall_tex"]
-            floor_tex = self._curr_gen_fixtures["floor_tex"]
+    def swap_generative_textures(self, textures=None):
+        """
+        Swaps the generative textures of the current scene in place, without recompiling the model.
+        Textures are re-uploaded to the offscreen renderer and the mjviewer renderer, if they exist.
 
-            result = replace_cab_textures(
-                self.rng, result, new_cab_texture_file=cab_tex
-            )
-            result = replace_counter_top_texture(
-                self.rng, result, new_counter_top_texture_file=counter_tex
-            )
-            result = replace_wall_texture(
-                self.rng, result, new_wall_texture_file=wall_tex
-            )
-            result = replace_floor_texture(
-                self.rng, result, new_floor_texture_file=floor_tex
+        Args:
+            textures (dict): cab_tex, counter_tex, floor_tex and wall_tex texture paths, relative to the
+                generative textures directory (see get_random_textures). If None, will sample random textures
+        """
+        assert (
+            self.generative_textures == "100p"
+        ), "generative textures must be enabled to swap them"
+        if textures is None:
+            textures = get_random_textures(self.rng)
+
+        model = self.sim.model._model
+        if self._texture_swapper is None or self._texture_swapper.model is not model:
+            self._texture_swapper = TextureSwapper(
+                model, textures=self._curr_gen_fixtures
             )
+        tex_ids = self._texture_swapper.swap(textures)
+        self._curr_gen_fixtures = dict(self._texture_swapper.textures)
+        if len(tex_ids) == 0:
+            return
 
-        return result
+        if self.sim._render_context_offscreen is not None:
+            self._texture_swapper.upload(tex_ids, [self.sim._render_context_offscreen])
+        viewer_handle = getattr(self.viewer, "viewer", None)
+        if hasattr(viewer_handle, "update_texture"):
+            for tex_id in tex_ids:
+                viewer_handle.update_texture(tex_id)
 
     def _setup_references(self):
         """
@@ -1197,9 +1671,56 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         """
         super()._setup_references()
 
+        self._setup_object_references()
+
+        if self._contact_table is None or self._contact_table.sim is not self.sim:
+            # map the geoms of all models of the scene, including the objects of inactive object sets
+            models = [
+                obj for (_, objects, _) in self._object_pool for obj in objects.values()
+            ]
+            models += list(self.fixtures.values())
+            for robot in self.robots:
+                models.append(robot.robot_model)
+                models += list(robot.gripper.values())
+            self._contact_table = ContactTable(self.sim, models=models)
+
+        self._object_states = None
+
+        for fxtr in self.fixtures.values():
+            if isinstance(fxtr, Fixture):
+                fxtr.setup_references(self.sim)
+        self._site_toggles = SiteToggles(self.sim, self.fixtures)
+
+    def _setup_object_references(self):
+        """
+        Maps the objects of the active object set to their body ids. Objects are registered under their configured
+        names as well as their model names, which differ for the object sets of the object pool (e.g. obj_set1)
+        """
         self.obj_body_id = {}
         for (name, model) in self.objects.items():
-            self.obj_body_id[name] = self.sim.model.body_name2id(model.root_body)
+            body_id = self.sim.model.body_name2id(model.root_body)
+            self.obj_body_id[name] = body_id
+            self.obj_body_id[model.name] = body_id
+
+    def check_contact(self, geoms_1, geoms_2=None):
+        """
+        Finds contact between two geom groups. Same as MujocoEnv.check_contact, but looks contacts up in a table
+        that is only rebuilt when the contacts of the sim change (see ContactTable)
+
+        Args:
+            geoms_1 (str or list of str or MujocoModel): an individual geom name or list of geom names or a model. If
+                a MujocoModel is specified, the geoms checked will be its contact_geoms
+
+            geoms_2 (str or list of str or MujocoModel or None): another individual geom name or list of geom names.
+                If a MujocoModel is specified, the geoms checked will be its contact_geoms. If None, will check
+                any collision with @geoms_1 to any other geom in the environment
+
+        Returns:
+            bool: True if any geom in @geoms_1 is in contact with any geom in @geoms_2.
+        """
+        if self._contact_table is None or self._contact_table.sim is not self.sim:
+            return super().check_contact(geoms_1, geoms_2=geoms_2)
+        return self._contact_table.check_contact(geoms_1, geoms_2=geoms_2)
 
     def _setup_observables(self):
         """
@@ -1232,7 +1753,8 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         actives = [False]
 
         # add ground-truth poses (absolute and relative to eef) for all objects
-        for obj_name in self.obj_body_id:
+        self._observable_obj_names = set(self.objects)
+        for obj_name in self.objects:
             obj_sensors, obj_sensor_names = self._create_obj_sensors(
                 obj_name=obj_name, modality=modality
             )
@@ -1337,6 +1859,9 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         """
         reward, done, info = super()._post_action(action)
 
+        if self.texture_randomization == "step":
+            self.swap_generative_textures()
+
         # Check if stove is turned on or not
         self.update_state()
         return reward, done, info
@@ -1365,11 +1890,26 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
     def update_state(self):
         """
         Updates the state of the environment.
-        This involves updating the state of all fixtures in the environment.
+        This involves updating the state of all fixtures in the environment. Sites that are toggled by joint
+        positions (burner flames, sink water) are updated for all fixtures at once, and are not updated at all
+        without a renderer if macros.SKIP_UNRENDERED_FIXTURE_VISUALS is set.
         """
         super().update_state()
 
-        for fixtr in self.fixtures.values():
+        site_toggles = self._site_toggles
+        if site_toggles is not None and site_toggles.sim is not self.sim:
+            site_toggles = None
+        if site_toggles is not None and (
+            self.has_renderer
+            or self.has_offscreen_renderer
+            or not macros.SKIP_UNRENDERED_FIXTURE_VISUALS
+        ):
+            site_toggles.update()
+
+        for (name, fixtr) in self.fixtures.items():
+            # fixtures that only toggle sites are covered by the batched update
+            if site_toggles is not None and name in site_toggles.fixture_names:
+                continue
             fixtr.update_state(self)
 
     def visualize(self, vis_settings):
@@ -1428,7 +1968,7 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         Returns:
             bool: True if the task is successfully completed, False otherwise
         """
-        assert True==False
+        assert True == False
         return False
 
     def sample_object(
@@ -1512,6 +2052,24 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
                 return True
         return False
 
+    @property
+    def fixture_index(self):
+        """
+        Spatial index over the fixtures of the current scene, used for fixture queries (see FixtureIndex)
+        """
+        if self._fixture_index is None:
+            self._fixture_index = FixtureIndex(self.fixtures)
+        return self._fixture_index
+
+    @property
+    def object_states(self):
+        """
+        Batched states of the objects of the current episode, used for success checks (see ObjectStates)
+        """
+        if self._object_states is None:
+            self._object_states = ObjectStates(self)
+        return self._object_states
+
     def get_fixture(self, id, ref=None, size=(0.2, 0.2)):
         """
         search fixture by id (name, object, or type)
@@ -1536,11 +2094,7 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
         if ref is None:
             # find all fixtures with names containing given name
             if isinstance(id, FixtureType) or isinstance(id, int):
-                matches = [
-                    name
-                    for (name, fxtr) in self.fixtures.items()
-                    if fixture_is_type(fxtr, id)
-                ]
+                matches = list(self.fixture_index.get_fixtures_of_type(id))
             else:
                 matches = [name for name in self.fixtures.keys() if id in name]
             if id == FixtureType.COUNTER or id == FixtureType.COUNTER_NON_CORNER:
@@ -1558,9 +2112,8 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
 
             assert isinstance(id, FixtureType)
             cand_fixtures = []
-            for fxtr in self.fixtures.values():
-                if not fixture_is_type(fxtr, id):
-                    continue
+            for name in self.fixture_index.get_fixtures_of_type(id):
+                fxtr = self.fixtures[name]
                 if fxtr is ref_fixture:
                     continue
                 if id == FixtureType.COUNTER:
@@ -1570,13 +2123,13 @@ class Kitchen(ManipulationEnv, metaclass=KitchenEnvMeta):
                 cand_fixtures.append(fxtr)
 
             # first, try to find fixture "containing" the reference fixture
-            for fxtr in cand_fixtures:
-                if OU.point_in_fixture(ref_fixture.pos, fxtr, only_2d=True):
-                    return fxtr
+            contains_ref = self.fixture_index.points_in_fixture(
+                ref_fixture.pos, cand_fixtures
+            )
+            if np.any(contains_ref):
+                return cand_fixtures[np.argmax(contains_ref)]
             # if no fixture contains reference fixture, sample all close fixtures
-            dists = [
-                OU.fixture_pairwise_dist(ref_fixture, fxtr) for fxtr in cand_fixtures
-            ]
+            dists = self.fixture_index.get_dists(ref_fixture, cand_fixtures)
             min_dist = np.min(dists)
             close_fixtures = [
                 fxtr for (fxtr, d) in zip(cand_fixtures, dists) if d - min_dist < 0.10
@@ -11,6 +11,8 @@ class BreadSetupSlicing(Kitchen):
         Place all breads on the cutting board.
     """
 
+    OBJECT_TASK_ATTRS = ["num_bread"]
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -13,6 +13,8 @@ class DrinkwareConsolidation(Kitchen):
 
     EXCLUDE_LAYOUTS = [0, 2, 4, 5, 7, 8, 9]
 
+    OBJECT_TASK_ATTRS = ["num_drinkware"]
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -17,6 +17,8 @@ class FoodCleanup(Kitchen):
             food items are picked.
     """
 
+    OBJECT_TASK_ATTRS = ["num_food"]
+
     def __init__(self, cab_id=FixtureType.CABINET_TOP, *args, **kwargs):
         self.cab_id = cab_id
         super().__init__(*args, **kwargs)
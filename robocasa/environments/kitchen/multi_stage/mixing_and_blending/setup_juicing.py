@@ -16,6 +16,8 @@ class SetupJuicing(Kitchen):
             cabinet types. Used to specify the cabinet to pick the fruits from.
     """
 
+    OBJECT_TASK_ATTRS = ["num_fruits"]
+
     def __init__(self, cab_id=FixtureType.DOOR_TOP_HINGE_DOUBLE, *args, **kwargs):
         self.cab_id = cab_id
         super().__init__(*args, **kwargs)
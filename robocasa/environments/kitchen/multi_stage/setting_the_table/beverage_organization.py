@@ -16,6 +16,8 @@ class BeverageOrganization(Kitchen):
 
     EXCLUDE_LAYOUTS = [0, 2, 4, 5]
 
+    OBJECT_TASK_ATTRS = ["num_bev"]
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
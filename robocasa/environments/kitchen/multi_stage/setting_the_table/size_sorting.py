@@ -12,6 +12,8 @@ class SizeSorting(Kitchen):
         Stack the objects from largest to smallest.
     """
 
+    OBJECT_TASK_ATTRS = ["objs"]
+
     def __init__(self, *args, **kwargs):
 
         super().__init__(*args, **kwargs)
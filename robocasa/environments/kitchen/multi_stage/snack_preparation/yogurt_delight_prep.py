@@ -11,6 +11,8 @@ class YogurtDelightPrep(Kitchen):
         Place the yogurt and fruit onto the counter.
     """
 
+    OBJECT_TASK_ATTRS = ["num_fruits"]
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
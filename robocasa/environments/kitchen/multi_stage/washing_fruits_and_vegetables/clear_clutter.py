@@ -12,6 +12,8 @@ class ClearClutter(Kitchen):
         sink to wash them. Then, turn the sink off, put them in the tray.
     """
 
+    OBJECT_TASK_ATTRS = ["num_food", "num_unwashable"]
+
     def __init__(self, *args, **kwargs):
         # internal state variables to keep track of task progress
         self.food_washed = False
@@ -26,7 +26,6 @@ class ManipulateDrawer(Kitchen):
 
     def _load_model(self):
         super()._load_model()
-        robot_model = self.robots[0].robot_model
         x_ofs = (self.drawer.width / 2) + 0.3
         inits = []
 
@@ -70,8 +69,7 @@ class ManipulateDrawer(Kitchen):
         random_index = self.rng.integers(len(inits))
         robot_base_pos, robot_base_ori, side = inits[random_index]
         self.drawer_side = side
-        robot_model.set_base_xpos(robot_base_pos)
-        robot_model.set_base_ori(robot_base_ori)
+        self._place_robot(robot_base_pos, robot_base_ori)
 
     def _reset_internal(self):
         """
@@ -113,21 +111,12 @@ class ManipulateDrawer(Kitchen):
             bool: True if the point is in contact with any fixture, False otherwise
         """
         fxtrs = [
-            fxtr
-            for fxtr in self.fixtures.values()
-            if isinstance(fxtr, Counter)
-            or isinstance(fxtr, Stove)
-            or isinstance(fxtr, Stovetop)
-            or isinstance(fxtr, HousingCabinet)
-            or isinstance(fxtr, SingleCabinet)
-            or isinstance(fxtr, HingeCabinet)
+            self.fixtures[name]
+            for name in self.fixture_index.get_fixtures_of_class(
+                (Counter, Stove, Stovetop, HousingCabinet, SingleCabinet, HingeCabinet)
+            )
         ]
-
-        for fxtr in fxtrs:
-            # get bounds of fixture
-            if OU.point_in_fixture(point=pos, fixture=fxtr, only_2d=True):
-                return True
-        return False
+        return bool(np.any(self.fixture_index.points_in_fixture(pos, fxtrs)))
 
     def check_sidewall_contact(self, pos):
         """
@@ -78,10 +78,10 @@ class NavigateKitchen(Kitchen):
                 if fxtr_class == "Accessory":
                     continue
                 # don't sample closeby fixtures
-                if (
-                    OU.fixture_pairwise_dist(self.src_fixture, self.target_fixture)
-                    <= 1.0
-                ):
+                dist = self.fixture_index.get_dists(
+                    self.src_fixture, [self.target_fixture]
+                )[0]
+                if dist <= 1.0:
                     continue
                 break
 
@@ -18,6 +18,41 @@ SPACEMOUSE_PRODUCT_ID = 50741
 
 DATASET_BASE_PATH = None
 
+# base directory for on-disk caches (e.g. compiled models). If None, defaults to ~/.cache/robocasa
+CACHE_BASE_PATH = None
+
+# maximum total size of the compiled model cache, in megabytes
+MODEL_CACHE_MAX_SIZE_MB = 4096
+
+# number of compiled models that the model cache additionally keeps in memory, per process
+MODEL_CACHE_NUM_MEMORY_MODELS = 2
+
+# whether to reuse parsed scene configs and procedurally generated fixtures across scene loads in the same process
+USE_FIXTURE_TEMPLATE_CACHE = True
+
+# maximum number of parsed yaml files and of fixture templates that the fixture template cache keeps, per process
+YAML_CACHE_SIZE = 256
+FIXTURE_TEMPLATE_CACHE_SIZE = 1024
+
+# whether to reuse parsed object models across object spawns in the same process
+USE_OBJECT_TEMPLATE_CACHE = True
+
+# maximum number of parsed object models that the object template cache keeps, per process
+OBJECT_TEMPLATE_CACHE_SIZE = 256
+
+# number of post-processed model xmls memoized by Kitchen.edit_model_xml (per environment)
+EDIT_MODEL_XML_CACHE_SIZE = 4
+
+# number of decoded generative textures kept in memory for runtime texture swaps
+GEN_TEXTURE_CACHE_SIZE = 64
+
+# number of candidate object placements that UniformRandomSampler draws and checks at once
+PLACEMENT_BATCH_SIZE = 256
+
+# whether to skip visual-only fixture state updates (e.g. burner flames, sink water) when the environment has
+# neither an onscreen nor an offscreen renderer
+SKIP_UNRENDERED_FIXTURE_VISUALS = False
+
 try:
     from robocasa.macros_private import *
 except ImportError:
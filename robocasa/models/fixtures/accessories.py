@@ -71,6 +71,12 @@ class CoffeeMachine(Accessory):
         )
         return state
 
+    def get_internal_state(self):
+        return self.get_state()
+
+    def set_internal_state(self, state):
+        self._turned_on = state["turned_on"]
+
     def update_state(self, env):
         """
         Checks if the gripper is pressing the start button. If this is the first time the gripper pressed the button,
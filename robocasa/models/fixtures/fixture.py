@@ -96,6 +96,12 @@ class Fixture(MujocoXMLObject):
         if not xml.endswith(".xml"):
             xml = os.path.join(xml, "model.xml")
 
+        # numeric geometry parsed from the xml, cleared whenever the fixture is moved, rotated or scaled
+        self._geometry_cache = dict()
+
+        # sim that the joint and site ids of the fixture were resolved in (see setup_references)
+        self._ref_sim = None
+
         super().__init__(
             xml_path_completion(xml, root=robocasa.models.assets_root),
             name=name,
@@ -184,6 +190,34 @@ class Fixture(MujocoXMLObject):
         pos = origin + np.dot(fixture_mat, -self.origin_offset)
         self.set_pos(pos)
 
+    def set_pos(self, pos):
+        super().set_pos(pos)
+        self._clear_geometry_cache()
+
+    def set_euler(self, euler):
+        super().set_euler(euler)
+        self._clear_geometry_cache()
+
+    def set_scale(self, scale, obj=None):
+        super().set_scale(scale, obj=obj)
+        self._clear_geometry_cache()
+
+    def _clear_geometry_cache(self):
+        """
+        Invalidates the cached numeric geometry of the fixture. Needs to be called after editing the position,
+        rotation or bounding box sites of the fixture xml directly
+        """
+        self._geometry_cache = dict()
+
+    def _get_cached_attr(self, attr, default):
+        """
+        Returns the numeric value of an attribute of the fixture's root body, parsed once
+        """
+        key = ("attr", attr)
+        if key not in self._geometry_cache:
+            self._geometry_cache[key] = string_to_array(self._obj.get(attr, default))
+        return self._geometry_cache[key]
+
     def set_scale_from_size(self, size):
         """
         Set the scale of the fixture based on the desired size. If any of the dimensions are None,
@@ -248,40 +282,95 @@ class Fixture(MujocoXMLObject):
         """
         return
 
+    def get_internal_state(self):
+        """
+        get the state that update_state keeps in the fixture rather than in the sim (eg. whether an appliance
+        is turned on). The environment restores it on every reset, since resets do not always rebuild fixtures
+        """
+        return dict()
+
+    def set_internal_state(self, state):
+        """
+        restore a state returned by get_internal_state
+        """
+        return
+
+    def setup_references(self, sim):
+        """
+        Resolves the ids of the joints and sites of the fixture that are used every step. Called by the
+        environment whenever its sim is (re)created
+
+        Args:
+            sim (MjSim): simulation the fixture is part of
+        """
+        self._ref_sim = sim
+
+    def _check_references(self, env):
+        """
+        Resolves the ids of the fixture if they have not been resolved in the sim of the environment yet
+        """
+        if self._ref_sim is not env.sim:
+            self.setup_references(env.sim)
+
+    def get_site_toggles(self):
+        """
+        Gets the sites whose alpha only depends on the position of a joint, so that they can be updated for all
+        fixtures at once (see SiteToggles). Requires setup_references to have been called.
+
+        Returns:
+            None or list: None if update_state does more than toggling sites. Otherwise a list of
+            (qpos address or None, site id, min angle, max angle, alpha) tuples: the site is set to alpha if the
+            joint angle (wrapped to [0, 2pi)) is within [min angle, max angle], and to 0 otherwise. Sites without
+            a joint (qpos address None) are always set to 0
+        """
+        return None
+
     @property
     def pos(self):
-        return string_to_array(self._obj.get("pos"))
+        return self._get_cached_attr("pos", None).copy()
 
     @property
     def quat(self):
-        quat = self._obj.get("quat")
-        if quat is None:
-            # no rotation applied
-            quat = "0 0 0 0"
-        return string_to_array(quat)
+        # "0 0 0 0" if no rotation applied
+        return self._get_cached_attr("quat", "0 0 0 0").copy()
 
     @property
     def euler(self):
-        euler = self._obj.get("euler")
-        if euler is None:
-            # no rotation applied
-            euler = "0 0 0"
-        return np.array(string_to_array(euler))
+        # "0 0 0" if no rotation applied
+        return self._get_cached_attr("euler", "0 0 0").copy()
+
+    @property
+    def rot(self):
+        return self._get_cached_attr("euler", "0 0 0")[2]
 
     @property
     def horizontal_radius(self):
         """
         override the default behavior of only looking at first dimension for radius
         """
-        horizontal_radius_site = self.worldbody.find(
-            "./body/site[@name='{}horizontal_radius_site']".format(self.naming_prefix)
-        )
-        site_values = string_to_array(horizontal_radius_site.get("pos"))
-        return np.linalg.norm(site_values[0:2])
+        if "horizontal_radius" not in self._geometry_cache:
+            horizontal_radius_site = self.worldbody.find(
+                "./body/site[@name='{}horizontal_radius_site']".format(
+                    self.naming_prefix
+                )
+            )
+            site_values = string_to_array(horizontal_radius_site.get("pos"))
+            self._geometry_cache["horizontal_radius"] = np.linalg.norm(site_values[0:2])
+        return self._geometry_cache["horizontal_radius"]
+
+    def _get_bounds_site_pos(self, postfix):
+        """
+        Returns the (cached) position of one of the exterior or interior bounding box sites, relative to the fixture
+        """
+        if "bounds_sites" not in self._geometry_cache:
+            self._geometry_cache["bounds_sites"] = {
+                name: site_pos(site) for (name, site) in self._bounds_sites.items()
+            }
+        return self._geometry_cache["bounds_sites"][postfix]
 
     @property
     def bottom_offset(self):
-        return site_pos(self._bounds_sites["ext_p0"])
+        return self._get_bounds_site_pos("ext_p0").copy()
 
     @property
     def width(self):
@@ -290,8 +379,8 @@ class Fixture(MujocoXMLObject):
         takes scaling into account
         """
         if "ext_px" in self._bounds_sites:
-            ext_p0 = site_pos(self._bounds_sites["ext_p0"])
-            ext_px = site_pos(self._bounds_sites["ext_px"])
+            ext_p0 = self._get_bounds_site_pos("ext_p0")
+            ext_px = self._get_bounds_site_pos("ext_px")
             w = ext_px[0] - ext_p0[0]
             return w
         else:
@@ -304,8 +393,8 @@ class Fixture(MujocoXMLObject):
         takes scaling into account
         """
         if "ext_py" in self._bounds_sites:
-            ext_p0 = site_pos(self._bounds_sites["ext_p0"])
-            ext_py = site_pos(self._bounds_sites["ext_py"])
+            ext_p0 = self._get_bounds_site_pos("ext_p0")
+            ext_py = self._get_bounds_site_pos("ext_py")
             d = ext_py[1] - ext_p0[1]
             return d
         else:
@@ -318,8 +407,8 @@ class Fixture(MujocoXMLObject):
         takes scaling into account
         """
         if "ext_pz" in self._bounds_sites:
-            ext_p0 = site_pos(self._bounds_sites["ext_p0"])
-            ext_pz = site_pos(self._bounds_sites["ext_pz"])
+            ext_p0 = self._get_bounds_site_pos("ext_p0")
+            ext_pz = self._get_bounds_site_pos("ext_pz")
             h = ext_pz[2] - ext_p0[2]
             return h
         else:
@@ -334,6 +423,33 @@ class Fixture(MujocoXMLObject):
         """
         for (name, pos) in pos_dict.items():
             self._bounds_sites[name].set("pos", array_to_string(pos))
+        self._clear_geometry_cache()
+
+    def _get_box_points(self, prefix, relative):
+        """
+        Returns the (cached) 8 points of the exterior or interior bounding box as an (8, 3) array, ordered as in
+        get_ext_sites and get_int_sites
+        """
+        key = ("box_points", prefix, relative)
+        if key not in self._geometry_cache:
+            p0, px, py, pz = [
+                self._get_bounds_site_pos(prefix + postfix)
+                for postfix in ["_p0", "_px", "_py", "_pz"]
+            ]
+            points = [
+                p0,
+                px,
+                py,
+                pz,
+                np.array([p0[0], py[1], pz[2]]),
+                np.array([px[0], py[1], pz[2]]),
+                np.array([px[0], py[1], p0[2]]),
+                np.array([px[0], p0[1], pz[2]]),
+            ]
+            if relative is False:
+                points = [get_pos_after_rel_offset(self, offset) for offset in points]
+            self._geometry_cache[key] = np.array(points)
+        return self._geometry_cache[key]
 
     def get_ext_sites(self, all_points=False, relative=True):
         """
@@ -347,26 +463,10 @@ class Fixture(MujocoXMLObject):
         Returns:
             list: 4 or 8 points
         """
-        sites = [
-            site_pos(self._bounds_sites["ext_p0"]),
-            site_pos(self._bounds_sites["ext_px"]),
-            site_pos(self._bounds_sites["ext_py"]),
-            site_pos(self._bounds_sites["ext_pz"]),
-        ]
-
-        if all_points:
-            p0, px, py, pz = sites
-            sites += [
-                np.array([p0[0], py[1], pz[2]]),
-                np.array([px[0], py[1], pz[2]]),
-                np.array([px[0], py[1], p0[2]]),
-                np.array([px[0], p0[1], pz[2]]),
-            ]
-
-        if relative is False:
-            sites = [get_pos_after_rel_offset(self, offset) for offset in sites]
-
-        return sites
+        sites = self._get_box_points("ext", relative=relative)
+        if not all_points:
+            sites = sites[:4]
+        return list(sites.copy())
 
     def get_int_sites(self, all_points=False, relative=True):
         """
@@ -380,33 +480,24 @@ class Fixture(MujocoXMLObject):
         Returns:
             list: 4 or 8 points
         """
-        sites = [
-            site_pos(self._bounds_sites["int_p0"]),
-            site_pos(self._bounds_sites["int_px"]),
-            site_pos(self._bounds_sites["int_py"]),
-            site_pos(self._bounds_sites["int_pz"]),
-        ]
-
-        if all_points:
-            p0, px, py, pz = sites
-            sites += [
-                np.array([p0[0], py[1], pz[2]]),
-                np.array([px[0], py[1], pz[2]]),
-                np.array([px[0], py[1], p0[2]]),
-                np.array([px[0], p0[1], pz[2]]),
-            ]
-
-        if relative is False:
-            sites = [get_pos_after_rel_offset(self, offset) for offset in sites]
-
-        return sites
+        sites = self._get_box_points("int", relative=relative)
+        if not all_points:
+            sites = sites[:4]
+        return list(sites.copy())
 
     def get_bbox_points(self, trans=None, rot=None):
         """
         Get the full set of bounding box points of the object
         rot: a rotation matrix
         """
-        bbox_offsets = self.get_ext_sites(all_points=True, relative=True)
+        if trans is None and rot is None:
+            if "bbox_points" not in self._geometry_cache:
+                self._geometry_cache["bbox_points"] = self._transform_box_points()
+            return list(self._geometry_cache["bbox_points"].copy())
+        return list(self._transform_box_points(trans=trans, rot=rot))
+
+    def _transform_box_points(self, trans=None, rot=None):
+        bbox_offsets = self._get_box_points("ext", relative=True)
 
         if trans is None:
             trans = self.pos
@@ -416,8 +507,8 @@ class Fixture(MujocoXMLObject):
             rot = np.array([0, 0, self.rot])
             rot = T.euler2mat(rot)
 
-        points = [(np.matmul(rot, p) + trans) for p in bbox_offsets]
-        return points
+        # same as transforming the points one by one
+        return np.einsum("ij,nj->ni", rot, bbox_offsets) + trans
 
     def _remove_element(self, elem):
         # # This method not currently working
@@ -0,0 +1,157 @@
+import numpy as np
+
+import robocasa.utils.object_utils as OU
+from robocasa.models.fixtures.fixture import Fixture
+from robocasa.models.fixtures.fixture_utils import fixture_is_type
+
+
+class FixtureIndex:
+    """
+    Spatial index over the placed fixtures of a kitchen scene. Holds the exterior bounding boxes of all fixtures
+    in one array, the pairwise distances between them (see fixture_pairwise_dist), a 2D containment lookup
+    (see point_in_fixture) and the fixtures of each type (see fixture_is_type), so that fixture queries do not
+    need to loop over the scene. Needs to be rebuilt whenever fixtures are moved.
+
+    Args:
+        fixtures (dict): fixture name -> fixture, for all fixtures of the scene
+    """
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+
+        # names of the matching fixtures, for each fixture type / tuple of classes queried so far
+        self._type_to_names = dict()
+        self._class_to_names = dict()
+
+        # fixtures that have an exterior bounding box
+        boxed_fixtures = [
+            fxtr
+            for fxtr in fixtures.values()
+            if isinstance(fxtr, Fixture)
+            and all(
+                "ext_{}".format(s) in fxtr._bounds_sites
+                for s in ["p0", "px", "py", "pz"]
+            )
+        ]
+        self._box_ids = {fxtr.name: i for (i, fxtr) in enumerate(boxed_fixtures)}
+        self._box_fixtures = boxed_fixtures
+        self.bbox_points = OU.get_fixtures_bbox_points(boxed_fixtures)
+
+        # 2D containment bounds along the x and y axes of each box
+        p0, px, py = [self.bbox_points[:, i] for i in range(3)]
+        self._u = px - p0
+        self._v = py - p0
+        self._u_bounds = np.stack(
+            [np.einsum("ij,ij->i", self._u, p0), np.einsum("ij,ij->i", self._u, px)],
+            axis=1,
+        )
+        self._v_bounds = np.stack(
+            [np.einsum("ij,ij->i", self._v, p0), np.einsum("ij,ij->i", self._v, py)],
+            axis=1,
+        )
+
+        # minimum distance between the bounding box points of every pair of fixtures, filled in one row per
+        # reference fixture as they are queried
+        n = len(boxed_fixtures)
+        self.dists = np.full((n, n), np.nan)
+
+    def _get_box_id(self, fxtr):
+        box_id = self._box_ids.get(getattr(fxtr, "name", None), None)
+        if box_id is None or self._box_fixtures[box_id] is not fxtr:
+            return None
+        return box_id
+
+    def get_fixtures_of_type(self, fixture_type):
+        """
+        Gets all fixtures of a type, in the order of the scene's fixtures
+
+        Args:
+            fixture_type (FixtureType): type to search for
+
+        Returns:
+            list: names of the matching fixtures
+        """
+        if fixture_type not in self._type_to_names:
+            self._type_to_names[fixture_type] = [
+                name
+                for (name, fxtr) in self.fixtures.items()
+                if fixture_is_type(fxtr, fixture_type)
+            ]
+        return self._type_to_names[fixture_type]
+
+    def get_fixtures_of_class(self, classes):
+        """
+        Gets all fixtures that are instances of any of the given classes, in the order of the scene's fixtures
+
+        Args:
+            classes (tuple): fixture classes to search for
+
+        Returns:
+            list: names of the matching fixtures
+        """
+        if classes not in self._class_to_names:
+            self._class_to_names[classes] = [
+                name
+                for (name, fxtr) in self.fixtures.items()
+                if isinstance(fxtr, classes)
+            ]
+        return self._class_to_names[classes]
+
+    def points_in_fixture(self, point, fixtures):
+        """
+        Checks whether a point is inside of the exterior bounding boxes of fixtures, in 2D
+        (same as point_in_fixture with only_2d=True)
+
+        Args:
+            point (np.array): point to check
+
+            fixtures (list of Fixture): fixtures to check against
+
+        Returns:
+            np.array: boolean array, True for each fixture that contains the point
+        """
+        box_ids = [self._get_box_id(fxtr) for fxtr in fixtures]
+        if any(box_id is None for box_id in box_ids):
+            # not indexed, fall back to checking fixtures one by one
+            return np.array(
+                [OU.point_in_fixture(point, fxtr, only_2d=True) for fxtr in fixtures],
+                dtype=bool,
+            )
+        box_ids = np.array(box_ids, dtype=int)
+        point = np.asarray(point, dtype=float)
+        u_proj = np.matmul(self._u[box_ids], point)
+        v_proj = np.matmul(self._v[box_ids], point)
+        u_bounds = self._u_bounds[box_ids]
+        v_bounds = self._v_bounds[box_ids]
+        return (
+            (u_bounds[:, 0] <= u_proj)
+            & (u_proj <= u_bounds[:, 1])
+            & (v_bounds[:, 0] <= v_proj)
+            & (v_proj <= v_bounds[:, 1])
+        )
+
+    def get_dists(self, ref_fixture, fixtures):
+        """
+        Gets the distances between a reference fixture and other fixtures (same as fixture_pairwise_dist)
+
+        Args:
+            ref_fixture (Fixture): reference fixture
+
+            fixtures (list of Fixture): fixtures to get the distances to
+
+        Returns:
+            np.array: distance to each fixture
+        """
+        ref_id = self._get_box_id(ref_fixture)
+        box_ids = [self._get_box_id(fxtr) for fxtr in fixtures]
+        if ref_id is None or any(box_id is None for box_id in box_ids):
+            # not indexed, fall back to computing distances one by one
+            return np.array(
+                [OU.fixture_pairwise_dist(ref_fixture, fxtr) for fxtr in fixtures]
+            )
+        if np.isnan(self.dists[ref_id, 0]):
+            diff = self.bbox_points[:, None, :, :] - self.bbox_points[ref_id][:, None]
+            self.dists[ref_id] = (
+                np.linalg.norm(diff, axis=-1).reshape(len(diff), -1).min(axis=-1)
+            )
+        return self.dists[ref_id, np.array(box_ids, dtype=int)]
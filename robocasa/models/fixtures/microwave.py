@@ -85,6 +85,12 @@ class Microwave(Fixture):
         )
         return state
 
+    def get_internal_state(self):
+        return self.get_state()
+
+    def set_internal_state(self, state):
+        self._turned_on = state["turned_on"]
+
     @property
     def handle_name(self):
         return "{}_door_handle".format(self.name)
@@ -1,5 +1,3 @@
-from copy import deepcopy
-
 import numpy as np
 
 from robocasa.models.fixtures import Fixture
@@ -19,10 +17,50 @@ class Sink(Fixture):
         self._handle_joint = None
         self._water_site = None
 
+        # qpos addresses of the handle and spout joints / id of the water site in the sim (see setup_references)
+        self._handle_qpos_addr = None
+        self._spout_qpos_addr = None
+        self._water_site_id = None
+
         super().__init__(
             xml=xml, name=name, duplicate_collision_geoms=False, *args, **kwargs
         )
 
+    def setup_references(self, sim):
+        """
+        Resolves the qpos addresses of the handle and spout joints and the id of the water site
+
+        Args:
+            sim (MjSim): simulation the sink is part of
+        """
+        super().setup_references(sim)
+        self._water_site_id = sim.model.site_name2id(
+            "{}water".format(self.naming_prefix)
+        )
+        if self.handle_joint is None:
+            return
+        self._handle_qpos_addr = sim.model.jnt_qposadr[
+            sim.model.joint_name2id("{}handle_joint".format(self.naming_prefix))
+        ]
+        self._spout_qpos_addr = sim.model.jnt_qposadr[
+            sim.model.joint_name2id("{}spout_joint".format(self.naming_prefix))
+        ]
+
+    def get_site_toggles(self):
+        """
+        Water is shown if the handle is turned on (see get_handle_state)
+        """
+        # water_on uses strict inequalities
+        return [
+            (
+                self._handle_qpos_addr,
+                self._water_site_id,
+                np.nextafter(0.40, np.inf),
+                np.nextafter(np.pi, -np.inf),
+                0.5,
+            )
+        ]
+
     def update_state(self, env):
         """
         Updates the water flowing of the sink based on the handle_joint position
@@ -30,15 +68,14 @@ class Sink(Fixture):
         Args:
             env (MujocoEnv): environment
         """
+        self._check_references(env)
         state = self.get_handle_state(env)
         water_on = state["water_on"]
 
-        site_id = env.sim.model.site_name2id("{}water".format(self.naming_prefix))
-
         if water_on:
-            env.sim.model.site_rgba[site_id][3] = 0.5
+            env.sim.model.site_rgba[self._water_site_id][3] = 0.5
         else:
-            env.sim.model.site_rgba[site_id][3] = 0.0
+            env.sim.model.site_rgba[self._water_site_id][3] = 0.0
 
     def set_handle_state(self, env, rng, mode="on"):
         """
@@ -79,21 +116,14 @@ class Sink(Fixture):
         if self.handle_joint is None:
             return handle_state
 
-        handle_joint_id = env.sim.model.joint_name2id(
-            "{}handle_joint".format(self.naming_prefix)
-        )
-        handle_joint_qpos = deepcopy(env.sim.data.qpos[handle_joint_id])
-        handle_joint_qpos = handle_joint_qpos % (2 * np.pi)
+        self._check_references(env)
+        handle_joint_qpos = env.sim.data.qpos[self._handle_qpos_addr] % (2 * np.pi)
         if handle_joint_qpos < 0:
             handle_joint_qpos += 2 * np.pi
         handle_state["handle_joint"] = handle_joint_qpos
         handle_state["water_on"] = 0.40 < handle_joint_qpos < np.pi
 
-        spout_joint_id = env.sim.model.joint_name2id(
-            "{}spout_joint".format(self.naming_prefix)
-        )
-        spout_joint_qpos = deepcopy(env.sim.data.qpos[spout_joint_id])
-        spout_joint_qpos = spout_joint_qpos % (2 * np.pi)
+        spout_joint_qpos = env.sim.data.qpos[self._spout_qpos_addr] % (2 * np.pi)
         if spout_joint_qpos < 0:
             spout_joint_qpos += 2 * np.pi
         handle_state["spout_joint"] = spout_joint_qpos
@@ -0,0 +1,54 @@
+import numpy as np
+
+
+class SiteToggles:
+    """
+    Batched update of the sites of fixtures whose visibility only depends on a joint position, such as burner
+    flames and sink water (see Fixture.get_site_toggles). The joint positions of all toggled sites are gathered
+    from the sim at once, and the alphas of all sites are written at once. Needs to be rebuilt whenever the sim
+    is recreated.
+
+    Args:
+        sim (MjSim): simulation the fixtures are part of
+
+        fixtures (dict): fixture name -> fixture, for all fixtures of the scene. The ids of the fixtures need to
+            be resolved in @sim (see Fixture.setup_references)
+    """
+
+    def __init__(self, sim, fixtures):
+        self.sim = sim
+
+        # names of the fixtures whose update_state is covered by the toggles
+        self.fixture_names = set()
+        toggles = []
+        for name, fxtr in fixtures.items():
+            if not hasattr(fxtr, "get_site_toggles"):
+                continue
+            fxtr_toggles = fxtr.get_site_toggles()
+            if fxtr_toggles is None:
+                continue
+            self.fixture_names.add(name)
+            toggles += fxtr_toggles
+
+        self._has_joint = np.array([t[0] is not None for t in toggles], dtype=bool)
+        self._qpos_addrs = np.array(
+            [0 if t[0] is None else t[0] for t in toggles], dtype=int
+        )
+        self._site_ids = np.array([t[1] for t in toggles], dtype=int)
+        self._min_angles = np.array([t[2] for t in toggles], dtype=float)
+        self._max_angles = np.array([t[3] for t in toggles], dtype=float)
+        self._alphas = np.array([t[4] for t in toggles], dtype=float)
+
+    def update(self):
+        """
+        Sets the alphas of all toggled sites based on the current joint positions
+        """
+        if len(self._site_ids) == 0:
+            return
+        joint_qpos = self.sim.data.qpos[self._qpos_addrs] % (2 * np.pi)
+        on = (
+            self._has_joint
+            & (self._min_angles <= joint_qpos)
+            & (joint_qpos <= self._max_angles)
+        )
+        self.sim.model.site_rgba[self._site_ids, 3] = np.where(on, self._alphas, 0.0)
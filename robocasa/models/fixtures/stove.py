@@ -1,5 +1,3 @@
-from copy import deepcopy
-
 import numpy as np
 
 from robocasa.models.fixtures import Fixture
@@ -30,6 +28,10 @@ class Stove(Fixture):
         self._knob_joints = None
         self._burner_sites = None
 
+        # knob location -> qpos address / burner site id in the sim (see setup_references)
+        self._knob_qpos_addrs = {}
+        self._burner_site_ids = {}
+
         super().__init__(
             xml=xml, name=name, duplicate_collision_geoms=False, *args, **kwargs
         )
@@ -73,31 +75,59 @@ class Stove(Fixture):
 
         return regions
 
-    def update_state(self, env):
+    def setup_references(self, sim):
         """
-        Updates the burner flames of the stove based on the knob joint positions
+        Resolves the qpos addresses of the knob joints and the ids of the burner sites
 
         Args:
-            env (MujocoEnv): environment
+            sim (MjSim): simulation the stove is part of
         """
+        super().setup_references(sim)
+        self._knob_qpos_addrs = {}
+        self._burner_site_ids = {}
         for location in STOVE_LOCATIONS:
-            site = self.burner_sites[location]
-            if site is None:
+            if self.burner_sites[location] is None:
                 continue
-            site_id = env.sim.model.site_name2id(
+            self._burner_site_ids[location] = sim.model.site_name2id(
                 "{}burner_on_{}".format(self.naming_prefix, location)
             )
-
-            joint = self.knob_joints[location]
-            if joint is None:
-                env.sim.model.site_rgba[site_id][3] = 0.0
+            if self.knob_joints[location] is None:
                 continue
-            joint_id = env.sim.model.joint_name2id(
+            joint_id = sim.model.joint_name2id(
                 "{}knob_{}_joint".format(self.naming_prefix, location)
             )
+            self._knob_qpos_addrs[location] = sim.model.jnt_qposadr[joint_id]
 
-            joint_qpos = deepcopy(env.sim.data.qpos[joint_id])
-            joint_qpos = joint_qpos % (2 * np.pi)
+    def get_site_toggles(self):
+        """
+        Burner flames are shown if the knob of the burner is turned away from the off position (see update_state)
+        """
+        return [
+            (
+                self._knob_qpos_addrs.get(location, None),
+                site_id,
+                0.35,
+                2 * np.pi - 0.35,
+                0.5,
+            )
+            for (location, site_id) in self._burner_site_ids.items()
+        ]
+
+    def update_state(self, env):
+        """
+        Updates the burner flames of the stove based on the knob joint positions
+
+        Args:
+            env (MujocoEnv): environment
+        """
+        self._check_references(env)
+        for location, site_id in self._burner_site_ids.items():
+            qpos_addr = self._knob_qpos_addrs.get(location, None)
+            if qpos_addr is None:
+                env.sim.model.site_rgba[site_id][3] = 0.0
+                continue
+
+            joint_qpos = env.sim.data.qpos[qpos_addr] % (2 * np.pi)
             if joint_qpos < 0:
                 joint_qpos += 2 * np.pi
 
@@ -142,21 +172,14 @@ class Stove(Fixture):
         Returns:
             dict: maps location of knob to the angle of the knob joint
         """
+        self._check_references(env)
         knobs_state = {}
         for location in STOVE_LOCATIONS:
-            joint = self.knob_joints[location]
-            if joint is None:
-                continue
-            site = self.burner_sites[location]
-            if site is None:
+            qpos_addr = self._knob_qpos_addrs.get(location, None)
+            if qpos_addr is None:
                 continue
 
-            joint_id = env.sim.model.joint_name2id(
-                "{}knob_{}_joint".format(self.naming_prefix, location)
-            )
-
-            joint_qpos = deepcopy(env.sim.data.qpos[joint_id])
-            joint_qpos = joint_qpos % (2 * np.pi)
+            joint_qpos = env.sim.data.qpos[qpos_addr] % (2 * np.pi)
             if joint_qpos < 0:
                 joint_qpos += 2 * np.pi
 
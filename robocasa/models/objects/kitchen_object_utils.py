@@ -1,13 +1,15 @@
 import math
 import os
-import xml.etree.ElementTree as ET
 from copy import deepcopy
 
 import numpy as np
-from robosuite.utils.mjcf_utils import find_elements, string_to_array
 
 import robocasa
 from robocasa.models.objects.kitchen_objects import OBJ_CATEGORIES, OBJ_GROUPS
+from robocasa.models.objects.object_index import (
+    ObjectAssetIndex,
+    ObjectFolderManifest,
+)
 
 BASE_ASSET_ZOO_PATH = os.path.join(robocasa.models.assets_root, "objects")
 
@@ -94,16 +96,28 @@ class ObjCat:
         if model_folders is None:
             subf = "aigen_objs" if self.aigen_cat else "objaverse"
             model_folders = ["{}/{}".format(subf, name)]
-        cat_mjcf_paths = []
-        for folder in model_folders:
-            cat_path = os.path.join(BASE_ASSET_ZOO_PATH, folder)
-            for root, _, files in os.walk(cat_path):
-                if "model.xml" in files:
-                    model_name = os.path.basename(root)
+        self.model_folders = model_folders
+
+        # model paths are looked up lazily from the object folder manifest (see mjcf_paths)
+        self._mjcf_paths = None
+
+    @property
+    def mjcf_paths(self):
+        """
+        Returns:
+            list: sorted paths of the MJCF models of the object category
+        """
+        if self._mjcf_paths is None:
+            manifest = get_object_folder_manifest()
+            cat_mjcf_paths = []
+            for folder in self.model_folders:
+                for mjcf_path in manifest.get_models(folder):
+                    model_name = os.path.basename(os.path.dirname(mjcf_path))
                     if model_name in self.exclude:
                         continue
-                    cat_mjcf_paths.append(os.path.join(root, "model.xml"))
-        self.mjcf_paths = sorted(cat_mjcf_paths)
+                    cat_mjcf_paths.append(mjcf_path)
+            self._mjcf_paths = sorted(cat_mjcf_paths)
+        return self._mjcf_paths
 
     def get_mjcf_kwargs(self):
         """
@@ -121,6 +135,48 @@ class ObjCat:
         )
 
 
+# listing of the object models in each asset folder, loaded on first use (see get_object_folder_manifest)
+_OBJECT_FOLDER_MANIFEST = None
+
+# index of object asset metadata, loaded on first use (see get_object_index)
+_OBJECT_INDEX = None
+
+
+def get_object_folder_manifest():
+    """
+    Returns the object folder manifest, loading it on first use. The folders of all object categories
+    are checked for changes at once, so that the manifest is written at most once per process
+
+    Returns:
+        ObjectFolderManifest: object folder manifest
+    """
+    global _OBJECT_FOLDER_MANIFEST
+    if _OBJECT_FOLDER_MANIFEST is None:
+        _OBJECT_FOLDER_MANIFEST = ObjectFolderManifest(BASE_ASSET_ZOO_PATH)
+        _OBJECT_FOLDER_MANIFEST.update(
+            [
+                folder
+                for cat_regs in OBJ_CATEGORIES.values()
+                for cat_meta in cat_regs.values()
+                for folder in cat_meta.model_folders
+            ]
+        )
+    return _OBJECT_FOLDER_MANIFEST
+
+
+def get_object_index():
+    """
+    Returns the object asset metadata index, loading (and if needed rebuilding) it on first use
+
+    Returns:
+        ObjectAssetIndex: object asset index
+    """
+    global _OBJECT_INDEX
+    if _OBJECT_INDEX is None:
+        _OBJECT_INDEX = ObjectAssetIndex(OBJ_CATEGORIES, BASE_ASSET_ZOO_PATH)
+    return _OBJECT_INDEX
+
+
 # update OBJ_CATEGORIES with ObjCat instances. Maps name to the different registries it can belong to
 # and then maps the registry to the ObjCat instance
 for (name, kwargs) in OBJ_CATEGORIES.items():
@@ -193,7 +249,7 @@ def sample_kitchen_object(
         split (str): split to sample from. Split "A" specifies all but the last 3 object instances
                     (or the first half - whichever is larger), "B" specifies the  rest, and None specifies all.
 
-        max_size (tuple): max size of the object. If the sampled object is not within bounds of max size, function will resample
+        max_size (tuple): max size of the object. Only objects within bounds of max size are sampled
 
         object_scale (float): scale of the object. If set will multiply the scale of the sampled object by this value
 
@@ -204,54 +260,20 @@ def sample_kitchen_object(
         dict: info about the sampled object - the path of the mjcf, groups which the object's category belongs to, the category of the object
               the sampling split the object came from, and the groups the object was sampled from
     """
-    valid_object_sampled = False
-    while valid_object_sampled is False:
-        mjcf_kwargs, info = sample_kitchen_object_helper(
-            groups=groups,
-            exclude_groups=exclude_groups,
-            graspable=graspable,
-            washable=washable,
-            microwavable=microwavable,
-            cookable=cookable,
-            freezable=freezable,
-            rng=rng,
-            obj_registries=obj_registries,
-            split=split,
-            object_scale=object_scale,
-        )
-
-        # check if object size is within bounds
-        mjcf_path = info["mjcf_path"]
-        tree = ET.parse(mjcf_path)
-        root = tree.getroot()
-        bottom = string_to_array(
-            find_elements(root=root, tags="site", attribs={"name": "bottom_site"}).get(
-                "pos"
-            )
-        )
-        top = string_to_array(
-            find_elements(root=root, tags="site", attribs={"name": "top_site"}).get(
-                "pos"
-            )
-        )
-        horizontal_radius = string_to_array(
-            find_elements(
-                root=root, tags="site", attribs={"name": "horizontal_radius_site"}
-            ).get("pos")
-        )
-        scale = mjcf_kwargs["scale"]
-        obj_size = (
-            np.array(
-                [horizontal_radius[0] * 2, horizontal_radius[1] * 2, top[2] - bottom[2]]
-            )
-            * scale
-        )
-        valid_object_sampled = True
-        for i in range(3):
-            if max_size[i] is not None and obj_size[i] > max_size[i]:
-                valid_object_sampled = False
-
-    return mjcf_kwargs, info
+    return sample_kitchen_object_helper(
+        groups=groups,
+        exclude_groups=exclude_groups,
+        graspable=graspable,
+        washable=washable,
+        microwavable=microwavable,
+        cookable=cookable,
+        freezable=freezable,
+        rng=rng,
+        obj_registries=obj_registries,
+        split=split,
+        max_size=max_size,
+        object_scale=object_scale,
+    )
 
 
 def sample_kitchen_object_helper(
@@ -265,6 +287,7 @@ def sample_kitchen_object_helper(
     rng=None,
     obj_registries=("objaverse",),
     split=None,
+    max_size=(None, None, None),
     object_scale=None,
 ):
     """
@@ -292,6 +315,8 @@ def sample_kitchen_object_helper(
         split (str): split to sample from. Split "A" specifies all but the last 3 object instances
                     (or the first half - whichever is larger), "B" specifies the  rest, and None specifies all.
 
+        max_size (tuple): max size of the object. Only objects within bounds of max size are sampled
+
         object_scale (float): scale of the object. If set will multiply the scale of the sampled object by this value
 
 
@@ -379,26 +404,46 @@ def sample_kitchen_object_helper(
 
                 valid_categories.append(cat)
 
-        cat = rng.choice(valid_categories)
-
-        choices = {reg: [] for reg in obj_registries}
-
-        for reg in obj_registries:
-            if reg not in OBJ_CATEGORIES[cat]:
-                choices[reg] = []
-                continue
-            reg_choices = deepcopy(OBJ_CATEGORIES[cat][reg].mjcf_paths)
-
-            # exclude out objects based on split
-            if split is not None:
-                split_th = max(len(choices) - 3, int(math.ceil(len(reg_choices) / 2)))
-                if split == "A":
-                    reg_choices = reg_choices[:split_th]
-                elif split == "B":
-                    reg_choices = reg_choices[split_th:]
-                else:
-                    raise ValueError
-            choices[reg] = reg_choices
+        if all([size is None for size in max_size]):
+            cat = rng.choice(valid_categories)
+            choices = _get_registry_choices(cat, obj_registries, split)
+        else:
+            # only keep objects within max_size. Categories are weighted by the fraction of their objects
+            # within bounds, which gives the same distribution as resampling until a valid object is found
+            obj_index = get_object_index()
+            cat_choices = []
+            cat_weights = []
+            for cand_cat in valid_categories:
+                cand_choices = _get_registry_choices(cand_cat, obj_registries, split)
+                num_total = sum([len(c) for c in cand_choices.values()])
+                for reg in obj_registries:
+                    if len(cand_choices[reg]) == 0:
+                        continue
+                    scale = OBJ_CATEGORIES[cand_cat][reg].scale
+                    if object_scale is not None:
+                        scale = scale * object_scale
+                    mask = obj_index.get_size_mask(
+                        cand_choices[reg], max_size=max_size, scale=scale
+                    )
+                    cand_choices[reg] = [
+                        path for (path, valid) in zip(cand_choices[reg], mask) if valid
+                    ]
+                num_valid = sum([len(c) for c in cand_choices.values()])
+                cat_choices.append(cand_choices)
+                cat_weights.append(num_valid / num_total if num_total > 0 else 0.0)
+
+            cat_weights = np.array(cat_weights)
+            if np.sum(cat_weights) == 0:
+                raise ValueError(
+                    "No objects in groups {} fit within max size {}".format(
+                        groups, max_size
+                    )
+                )
+            cat_ind = rng.choice(
+                len(valid_categories), p=cat_weights / np.sum(cat_weights)
+            )
+            cat = valid_categories[cat_ind]
+            choices = cat_choices[cat_ind]
 
         chosen_reg = rng.choice(
             obj_registries,
@@ -427,3 +472,39 @@ def sample_kitchen_object_helper(
     }
 
     return mjcf_kwargs, info
+
+
+def _get_registry_choices(cat, obj_registries, split=None):
+    """
+    Returns the object models of a category that can be sampled from each registry
+
+    Args:
+        cat (str): object category
+
+        obj_registries (tuple): registries to sample from
+
+        split (str): split to sample from (see sample_kitchen_object_helper)
+
+    Returns:
+        dict: maps each registry to a list of model xml paths
+    """
+    choices = {reg: [] for reg in obj_registries}
+
+    for reg in obj_registries:
+        if reg not in OBJ_CATEGORIES[cat]:
+            choices[reg] = []
+            continue
+        reg_choices = deepcopy(OBJ_CATEGORIES[cat][reg].mjcf_paths)
+
+        # exclude out objects based on split
+        if split is not None:
+            split_th = max(len(choices) - 3, int(math.ceil(len(reg_choices) / 2)))
+            if split == "A":
+                reg_choices = reg_choices[:split_th]
+            elif split == "B":
+                reg_choices = reg_choices[split_th:]
+            else:
+                raise ValueError
+        choices[reg] = reg_choices
+
+    return choices
@@ -0,0 +1,334 @@
+"""
+Persisted listings and metadata of object assets, so that object categories do not need to walk the asset
+folders on every import and object sampling does not need to parse the model xml of every candidate object.
+"""
+import hashlib
+import json
+import math
+import os
+import xml.etree.ElementTree as ET
+
+import numpy as np
+from robosuite.utils.mjcf_utils import find_elements, string_to_array
+
+from robocasa.utils.cache_utils import atomic_write, get_cache_dir
+
+# sites of the object model xml stored in the index
+INDEX_SITES = ["bottom_site", "top_site", "horizontal_radius_site"]
+
+
+def _get_path_hash(path):
+    return hashlib.sha1(path.encode("utf8")).hexdigest()[:16]
+
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ObjectFolderManifest:
+    """
+    Persisted listing of the object models in each object asset folder. Folders are only re-scanned when their
+    modification time changed (i.e. when models were added or removed), which is checked once per process.
+    This replaces walking every asset folder, which is slow on network file systems.
+
+    Args:
+        base_path (str): root folder of the object assets
+
+        manifest_path (str): path of the persisted manifest. Defaults to a file in the "object_index" robocasa
+            cache directory that is specific to @base_path
+    """
+
+    VERSION = 1
+
+    def __init__(self, base_path, manifest_path=None):
+        self.base_path = os.path.abspath(base_path)
+        if manifest_path is None:
+            manifest_path = os.path.join(
+                get_cache_dir("object_index"),
+                "{}_folders.json".format(_get_path_hash(self.base_path)),
+            )
+        self.manifest_path = manifest_path
+
+        self.folders = dict()
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r") as f:
+                    manifest = json.load(f)
+                if manifest.get("version") == self.VERSION:
+                    self.folders = manifest["folders"]
+            except (OSError, ValueError):
+                pass
+
+        # folders that have been checked for staleness in this process
+        self._checked = set()
+
+    def update(self, folders):
+        """
+        Re-scans the given folders if they changed since they were last scanned, and persists the manifest
+        if any of them did. Each folder is only checked once per process
+
+        Args:
+            folders (list): asset folders, relative to the object asset root
+        """
+        changed = False
+        for folder in folders:
+            if folder in self._checked:
+                continue
+            self._checked.add(folder)
+
+            folder_path = os.path.join(self.base_path, folder)
+            mtime = _mtime_ns(folder_path)
+            if folder in self.folders and self.folders[folder]["mtime"] == mtime:
+                continue
+
+            models = []
+            for root, _, files in os.walk(folder_path):
+                if "model.xml" in files:
+                    models.append(
+                        os.path.relpath(os.path.join(root, "model.xml"), self.base_path)
+                    )
+            self.folders[folder] = dict(mtime=mtime, models=sorted(models))
+            changed = True
+
+        if changed:
+            self.save()
+
+    def get_models(self, folder):
+        """
+        Returns the paths of all object models in an asset folder
+
+        Args:
+            folder (str): asset folder, relative to the object asset root
+
+        Returns:
+            list: absolute paths of the model xmls, sorted
+        """
+        self.update([folder])
+        return [
+            os.path.join(self.base_path, rel_path)
+            for rel_path in self.folders[folder]["models"]
+        ]
+
+    def save(self):
+        """
+        Persists the manifest to disk
+        """
+        manifest = dict(version=self.VERSION, folders=self.folders)
+        atomic_write(self.manifest_path, json.dumps(manifest))
+
+
+def parse_object_metadata(mjcf_path):
+    """
+    Parses the site offsets and (unscaled) bounding size of an object model xml
+
+    Args:
+        mjcf_path (str): path to the object model xml
+
+    Returns:
+        dict: site offsets for each of INDEX_SITES (None if missing) and the size of the object.
+            The size is None if any of the sites are missing
+    """
+    root = ET.parse(mjcf_path).getroot()
+    meta = dict()
+    for site_name in INDEX_SITES:
+        site = find_elements(root=root, tags="site", attribs={"name": site_name})
+        if site is None or site.get("pos") is None:
+            meta[site_name] = None
+        else:
+            meta[site_name] = string_to_array(site.get("pos")).tolist()
+
+    if any(meta[site_name] is None for site_name in INDEX_SITES):
+        meta["size"] = None
+    else:
+        bottom = meta["bottom_site"]
+        top = meta["top_site"]
+        horizontal_radius = meta["horizontal_radius_site"]
+        meta["size"] = [
+            horizontal_radius[0] * 2,
+            horizontal_radius[1] * 2,
+            top[2] - bottom[2],
+        ]
+    return meta
+
+
+class ObjectAssetIndex:
+    """
+    Index of metadata for every object model of the object categories. The index is persisted in the robocasa
+    cache and validated against the category models and the modification times of the model files on load.
+    Only models that changed are re-parsed when the index is rebuilt.
+
+    Args:
+        obj_categories (dict): maps category name -> registry name -> ObjCat
+
+        base_path (str): root folder of the object assets
+
+        index_path (str): path of the persisted index. Defaults to a file in the "object_index" robocasa cache
+            directory that is specific to @base_path
+    """
+
+    VERSION = 1
+
+    def __init__(self, obj_categories, base_path, index_path=None):
+        self.base_path = os.path.abspath(base_path)
+        if index_path is None:
+            index_path = os.path.join(
+                get_cache_dir("object_index"),
+                "{}.json".format(_get_path_hash(self.base_path)),
+            )
+        self.index_path = index_path
+
+        # (category, registry, model paths) for every object category
+        self._cat_specs = []
+        for cat in sorted(obj_categories.keys()):
+            for reg in sorted(obj_categories[cat].keys()):
+                cat_meta = obj_categories[cat][reg]
+                self._cat_specs.append(
+                    (
+                        cat,
+                        reg,
+                        [self._get_rel_path(path) for path in cat_meta.mjcf_paths],
+                    )
+                )
+
+        self.objects = dict()
+        self._size_cache = dict()
+        self.load_or_build()
+
+    def _get_specs_hash(self):
+        return hashlib.sha1(json.dumps(self._cat_specs).encode("utf8")).hexdigest()
+
+    def load_or_build(self):
+        """
+        Loads the persisted index, rebuilding out-of-date parts of it if the assets have changed
+        """
+        index = None
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r") as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = None
+        if index is not None and index.get("version") != self.VERSION:
+            index = None
+
+        if index is not None:
+            self.objects = index["objects"]
+            if self._is_valid(index):
+                return
+
+        self.build()
+        self.save()
+
+    def _is_valid(self, index):
+        """
+        Checks whether a loaded index is consistent with the object categories and the assets on disk
+        """
+        if index.get("specs_hash") != self._get_specs_hash():
+            return False
+        for rel_path, obj_meta in self.objects.items():
+            if _mtime_ns(os.path.join(self.base_path, rel_path)) != obj_meta["mtime"]:
+                return False
+        return True
+
+    def build(self):
+        """
+        (Re)builds the index. Model files whose modification time did not change are not re-parsed
+        """
+        old_objects = self.objects
+        self.objects = dict()
+        self._size_cache = dict()
+
+        for (cat, reg, cat_mjcf_paths) in self._cat_specs:
+            # same split threshold as used for sampling (see sample_kitchen_object_helper)
+            split_th = int(math.ceil(len(cat_mjcf_paths) / 2))
+            for i, rel_path in enumerate(cat_mjcf_paths):
+                if rel_path in self.objects:
+                    continue
+                mtime = _mtime_ns(os.path.join(self.base_path, rel_path))
+                old_meta = old_objects.get(rel_path, None)
+                if old_meta is not None and old_meta["mtime"] == mtime:
+                    meta = {k: old_meta[k] for k in ["size"] + INDEX_SITES}
+                else:
+                    meta = parse_object_metadata(os.path.join(self.base_path, rel_path))
+                meta["mtime"] = mtime
+                meta["cat"] = cat
+                meta["reg"] = reg
+                meta["split"] = "A" if i < split_th else "B"
+                self.objects[rel_path] = meta
+
+    def save(self):
+        """
+        Persists the index to disk
+        """
+        index = dict(
+            version=self.VERSION,
+            base_path=self.base_path,
+            specs_hash=self._get_specs_hash(),
+            objects=self.objects,
+        )
+        atomic_write(self.index_path, json.dumps(index))
+
+    def _get_rel_path(self, mjcf_path):
+        return os.path.relpath(os.path.abspath(mjcf_path), self.base_path)
+
+    def get(self, mjcf_path):
+        """
+        Returns the metadata of an object model, parsing it if it is not part of the index
+
+        Args:
+            mjcf_path (str): path to the object model xml
+
+        Returns:
+            dict: metadata of the object (size, site offsets, category, registry, split, mtime)
+        """
+        rel_path = self._get_rel_path(mjcf_path)
+        if rel_path not in self.objects:
+            meta = parse_object_metadata(mjcf_path)
+            meta.update(mtime=_mtime_ns(mjcf_path), cat=None, reg=None, split=None)
+            self.objects[rel_path] = meta
+        return self.objects[rel_path]
+
+    def get_sizes(self, mjcf_paths):
+        """
+        Returns the (unscaled) sizes of multiple object models
+
+        Args:
+            mjcf_paths (list): paths to the object model xmls
+
+        Returns:
+            np.array: (N, 3) array of (width, depth, height) sizes. Sizes of models with missing sites are nan
+        """
+        sizes = np.empty((len(mjcf_paths), 3))
+        for i, mjcf_path in enumerate(mjcf_paths):
+            size = self._size_cache.get(mjcf_path, None)
+            if size is None:
+                size = self.get(mjcf_path)["size"]
+                size = np.full(3, np.nan) if size is None else np.array(size)
+                self._size_cache[mjcf_path] = size
+            sizes[i] = size
+        return sizes
+
+    def get_size_mask(self, mjcf_paths, max_size, scale=1.0):
+        """
+        Returns which object models fit within a maximum size
+
+        Args:
+            mjcf_paths (list): paths to the object model xmls
+
+            max_size (tuple): max (width, depth, height) of the objects. None entries are not constrained
+
+            scale (float or 3-tuple): scale applied to the object models
+
+        Returns:
+            np.array: (N,) boolean mask of the objects that fit
+        """
+        sizes = self.get_sizes(mjcf_paths) * np.array(scale)
+        mask = np.ones(len(mjcf_paths), dtype=bool)
+        for i in range(3):
+            if max_size[i] is not None:
+                # nan sizes (missing sites) never fit
+                mask &= sizes[:, i] <= max_size[i]
+        return mask
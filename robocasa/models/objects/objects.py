@@ -1,6 +1,6 @@
 import os
-import time
 import xml.etree.ElementTree as ET
+from copy import deepcopy
 
 import numpy as np
 import robosuite
@@ -8,6 +8,12 @@ import robosuite.utils.transform_utils as T
 from robosuite.models.objects import MujocoXMLObject
 from robosuite.utils.mjcf_utils import array_to_string, string_to_array
 
+import robocasa.macros as macros
+from robocasa.utils.cache_utils import LRUCache, freeze
+
+# process-wide cache of parsed (unnamed) objects, maps object parameters -> object attributes
+_OBJECT_TEMPLATE_CACHE = LRUCache(macros.OBJECT_TEMPLATE_CACHE_SIZE)
+
 
 class MJCFObject(MujocoXMLObject):
     """
@@ -47,48 +53,71 @@ class MJCFObject(MujocoXMLObject):
 
         self.rgba = rgba
 
-        # read default xml
-        xml_path = mjcf_path
-        folder = os.path.dirname(xml_path)
-        tree = ET.parse(xml_path)
-        root = tree.getroot()
-
-        # write modified xml (and make sure to postprocess any paths just in case)
-        xml_str = ET.tostring(root, encoding="utf8").decode("utf8")
-        xml_str = self.postprocess_model_xml(xml_str)
-        time_str = str(time.time()).replace(".", "_")
-        new_xml_path = os.path.join(folder, "{}_{}.xml".format(time_str, os.getpid()))
-        f = open(new_xml_path, "w")
-        f.write(xml_str)
-        f.close()
-
-        # initialize object with new xml we wrote
-        super().__init__(
-            fname=new_xml_path,
-            name=name,
-            joints=[dict(type="free", damping="0.0005")],
-            obj_type="all",
-            duplicate_collision_geoms=False,
-            scale=scale,
+        # parsed objects are name-independent up to the naming step, so they are built once and copied
+        template_key = (
+            mjcf_path,
+            tuple(scale),
+            freeze(solimp),
+            freeze(solref),
+            density,
+            freeze(friction),
+            margin,
+            freeze(rgba),
+            priority,
         )
+        template = None
+        if macros.USE_OBJECT_TEMPLATE_CACHE:
+            template = _OBJECT_TEMPLATE_CACHE.get(template_key, None)
+        if template is None:
+            # initialize object directly from the asset xml, deferring naming (see _get_object_properties)
+            super().__init__(
+                fname=mjcf_path,
+                name=None,
+                joints=[dict(type="free", damping="0.0005")],
+                obj_type="all",
+                duplicate_collision_geoms=False,
+                scale=scale,
+            )
+            if macros.USE_OBJECT_TEMPLATE_CACHE:
+                _OBJECT_TEMPLATE_CACHE[template_key] = deepcopy(self.__dict__)
+        else:
+            self.__dict__.update(deepcopy(template))
 
-        # clean up xml - we don't need it anymore
-        if os.path.exists(new_xml_path):
-            os.remove(new_xml_path)
+        self._name = name
+        self._get_object_properties()
 
-    def postprocess_model_xml(self, xml_str):
+        # numeric geometry parsed from the (named) xml, cleared whenever the object is scaled
+        self._geometry_cache = dict()
+
+    def resolve_asset_dependency(self):
         """
-        New version of postprocess model xml that only replaces robosuite file paths if necessary (otherwise
-        there is an error with the "max" operation)
+        Replaces robosuite asset paths in the raw xml before converting file dependencies into absolute paths
+        """
+        self._replace_robosuite_asset_paths(self.root)
+        super().resolve_asset_dependency()
+
+    def _get_object_properties(self):
         """
+        Extracts object properties and applies naming. Skipped while the (unnamed) object template is being built
+        """
+        if self._name is None:
+            return
+        super()._get_object_properties()
+
+    def _replace_robosuite_asset_paths(self, root):
+        """
+        Replaces mesh and texture file paths that point to robosuite assets with paths
+        to the installed robosuite package
 
+        Args:
+            root (ET.Element): root of the model xml
+        """
         path = os.path.split(robosuite.__file__)[0]
         path_split = path.split("/")
 
-        # replace mesh and texture file paths
-        tree = ET.fromstring(xml_str)
-        root = tree
         asset = root.find("asset")
+        if asset is None:
+            return
         meshes = asset.findall("mesh")
         textures = asset.findall("texture")
         all_elements = meshes + textures
@@ -109,6 +138,14 @@ class MJCFObject(MujocoXMLObject):
                 new_path = "/".join(new_path_split)
                 elem.set("file", new_path)
 
+    def postprocess_model_xml(self, xml_str):
+        """
+        New version of postprocess model xml that only replaces robosuite file paths if necessary (otherwise
+        there is an error with the "max" operation)
+        """
+
+        root = ET.fromstring(xml_str)
+        self._replace_robosuite_asset_paths(root)
         return ET.tostring(root, encoding="utf8").decode("utf8")
 
     def _get_geoms(self, root, _parent=None):
@@ -145,41 +182,66 @@ class MJCFObject(MujocoXMLObject):
 
         return geom_pairs
 
+    def set_scale(self, scale, obj=None):
+        super().set_scale(scale, obj=obj)
+        self._geometry_cache = dict()
+
+    def _get_site_pos(self, site_name):
+        """
+        Returns the (cached) position of one of the object's sites
+        """
+        key = ("site", site_name)
+        if key not in self._geometry_cache:
+            site = self.worldbody.find(
+                "./body/site[@name='{}{}']".format(self.naming_prefix, site_name)
+            )
+            self._geometry_cache[key] = string_to_array(site.get("pos"))
+        return self._geometry_cache[key]
+
+    @property
+    def bottom_offset(self):
+        return self._get_site_pos("bottom_site").copy()
+
+    @property
+    def top_offset(self):
+        return self._get_site_pos("top_site").copy()
+
     @property
     def horizontal_radius(self):
-        horizontal_radius_site = self.worldbody.find(
-            "./body/site[@name='{}horizontal_radius_site']".format(self.naming_prefix)
-        )
-        site_values = string_to_array(horizontal_radius_site.get("pos"))
+        site_values = self._get_site_pos("horizontal_radius_site")
         return np.linalg.norm(site_values[0:2])
 
+    def _get_bbox_offsets(self):
+        """
+        Returns the (cached) 8 bounding box points of the object relative to its center, as an (8, 3) array
+        """
+        if "bbox_offsets" not in self._geometry_cache:
+            bottom_offset = self.bottom_offset
+            top_offset = self.top_offset
+            horiz_radius = self._get_site_pos("horizontal_radius_site")[:2]
+
+            center = np.mean([bottom_offset, top_offset], axis=0)
+            half_size = [horiz_radius[0], horiz_radius[1], top_offset[2] - center[2]]
+
+            bbox_offsets = [
+                center + half_size * np.array([-1, -1, -1]),  # p0
+                center + half_size * np.array([1, -1, -1]),  # px
+                center + half_size * np.array([-1, 1, -1]),  # py
+                center + half_size * np.array([-1, -1, 1]),  # pz
+                center + half_size * np.array([1, 1, 1]),
+                center + half_size * np.array([-1, 1, 1]),
+                center + half_size * np.array([1, -1, 1]),
+                center + half_size * np.array([1, 1, -1]),
+            ]
+            self._geometry_cache["bbox_offsets"] = np.array(bbox_offsets)
+        return self._geometry_cache["bbox_offsets"]
+
     def get_bbox_points(self, trans=None, rot=None):
         """
         Get the full 8 bounding box points of the object
         rot: a rotation matrix
         """
-        bbox_offsets = []
-
-        bottom_offset = self.bottom_offset
-        top_offset = self.top_offset
-        horizontal_radius_site = self.worldbody.find(
-            "./body/site[@name='{}horizontal_radius_site']".format(self.naming_prefix)
-        )
-        horiz_radius = string_to_array(horizontal_radius_site.get("pos"))[:2]
-
-        center = np.mean([bottom_offset, top_offset], axis=0)
-        half_size = [horiz_radius[0], horiz_radius[1], top_offset[2] - center[2]]
-
-        bbox_offsets = [
-            center + half_size * np.array([-1, -1, -1]),  # p0
-            center + half_size * np.array([1, -1, -1]),  # px
-            center + half_size * np.array([-1, 1, -1]),  # py
-            center + half_size * np.array([-1, -1, 1]),  # pz
-            center + half_size * np.array([1, 1, 1]),
-            center + half_size * np.array([-1, 1, 1]),
-            center + half_size * np.array([1, -1, 1]),
-            center + half_size * np.array([1, 1, -1]),
-        ]
+        bbox_offsets = self._get_bbox_offsets()
 
         if trans is None:
             trans = np.array([0, 0, 0])
@@ -188,5 +250,6 @@ class MJCFObject(MujocoXMLObject):
         else:
             rot = np.eye(3)
 
-        points = [(np.matmul(rot, p) + trans) for p in bbox_offsets]
-        return points
+        # same as transforming the points one by one
+        points = np.einsum("ij,nj->ni", rot, bbox_offsets) + trans
+        return list(points)
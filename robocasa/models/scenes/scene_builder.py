@@ -113,12 +113,10 @@ def create_fixtures(layout_id, style_id, rng=None):
     style_path = get_style_path(style_id=style_id)
 
     # load style
-    with open(style_path, "r") as f:
-        style = yaml.safe_load(f)
+    style = load_yaml(style_path)
 
     # load arena
-    with open(layout_path, "r") as f:
-        arena_config = yaml.safe_load(f)
+    arena_config = load_yaml(layout_path)
 
     # contains all fixtures with updated configs
     arena = list()
@@ -289,5 +287,7 @@ def create_fixtures(layout_id, style_id, rng=None):
 
             fixture._obj.set("pos", a2s(pos_new))
             fixture._obj.set("euler", a2s(rot_new))
+            if isinstance(fixture, Fixture):
+                fixture._clear_geometry_cache()
 
     return fixtures
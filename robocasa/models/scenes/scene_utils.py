@@ -1,9 +1,12 @@
 from collections import OrderedDict
 from copy import deepcopy
+import numpy as np
 import yaml
 from robosuite.utils.mjcf_utils import xml_path_completion
 
 import robocasa
+import robocasa.macros as macros
+from robocasa.utils.cache_utils import LRUCache, freeze
 
 
 # second keyword corresponds to positive end of axis
@@ -28,6 +31,77 @@ IGNORE_ARGS = [
 # arguments used to point to other fixtures
 ATTACH_ARGS = ["interior_obj", "stack_on", "attach_to"]
 
+# process-wide cache of parsed yaml files (layouts, styles, fixture registries), maps path -> parsed contents
+_YAML_CACHE = LRUCache(macros.YAML_CACHE_SIZE)
+
+# process-wide cache of constructed fixtures, maps fixture key ->
+# (template fixture, template rng, fixtures the template is attached to, positions of those fixtures after construction)
+_FIXTURE_TEMPLATE_CACHE = LRUCache(macros.FIXTURE_TEMPLATE_CACHE_SIZE)
+
+
+def load_yaml(path):
+    """
+    Loads a yaml file, parsing it only the first time it is requested in this process
+
+    Args:
+        path (str): path to the yaml file
+
+    Returns:
+        dict: parsed contents of the yaml file. This is a copy that the caller can freely modify
+    """
+    return deepcopy(_load_yaml_shared(path))
+
+
+def _load_yaml_shared(path):
+    """
+    Same as load_yaml, but returns the cached contents themselves. These must not be modified
+    """
+    if not macros.USE_FIXTURE_TEMPLATE_CACHE:
+        with open(path, "r") as f:
+            return yaml.safe_load(f)
+    contents = _YAML_CACHE.get(path, None)
+    if contents is None:
+        with open(path, "r") as f:
+            contents = yaml.safe_load(f)
+        _YAML_CACHE[path] = contents
+    return contents
+
+
+def clear_fixture_template_cache():
+    """
+    Clears the cached fixture templates and parsed yaml files
+    """
+    _YAML_CACHE.clear()
+    _FIXTURE_TEMPLATE_CACHE.clear()
+
+
+def _get_fixture_template_key(name, class_type, config, cur_fixtures):
+    """
+    Computes the key used to look up a fixture in the template cache. Fixtures attached to other
+    fixtures are keyed by the state of the fixtures they are attached to as well.
+
+    Returns:
+        tuple or None: key of the fixture, or None if the fixture cannot be cached
+    """
+    attached = []
+    for k in ATTACH_ARGS:
+        if k not in config:
+            continue
+        attached_fxtr = cur_fixtures[config[k]]
+        attached_key = getattr(attached_fxtr, "_template_key", None)
+        if attached_key is None:
+            return None
+        attached.append((k, attached_key, attached_fxtr._obj.get("pos")))
+
+    config = {k: v for (k, v) in config.items() if k != "rng"}
+    try:
+        key = (name, class_type, freeze(config), tuple(attached))
+        hash(key)
+    except TypeError:
+        # config contains unhashable values
+        return None
+    return key
+
 
 def initialize_fixture(config, cur_fixtures, rng=None):
     """
@@ -62,14 +136,74 @@ def initialize_fixture(config, cur_fixtures, rng=None):
         # need position to initialize fixture, adjusted later fo relative positioning
         config["pos"] = [0.0, 0.0, 0.0]
 
+    template_key = None
+    if macros.USE_FIXTURE_TEMPLATE_CACHE:
+        template_key = _get_fixture_template_key(name, class_type, config, cur_fixtures)
+
     # update fixture pointers
+    attached_fixtures = []
     for k in ATTACH_ARGS:
         if k in config:
             config[k] = cur_fixtures[config[k]]
+            attached_fixtures.append(config[k])
+
+    if template_key is not None and template_key in _FIXTURE_TEMPLATE_CACHE:
+        return _instantiate_fixture_template(template_key, attached_fixtures, rng)
 
     config["rng"] = rng
     fixture = class_type(name=name, **config)
     # print(class_type, name, type(fixture))
+
+    if template_key is not None:
+        # store a copy that still points to the (uncopied) attached fixtures, these are swapped out when instantiating
+        memo = {id(fxtr): fxtr for fxtr in attached_fixtures}
+        memo[id(fixture.rng)] = fixture.rng
+        template = deepcopy(fixture, memo)
+        attached_pos = [fxtr._obj.get("pos") for fxtr in attached_fixtures]
+        _FIXTURE_TEMPLATE_CACHE[template_key] = (
+            template,
+            fixture.rng,
+            attached_fixtures,
+            attached_pos,
+        )
+        fixture._template_key = template_key
+
+    return fixture
+
+
+def _instantiate_fixture_template(template_key, attached_fixtures, rng=None):
+    """
+    Creates a new fixture by copying a cached template, re-pointing it to the given attached fixtures
+    and replaying the changes its construction made to them
+
+    Args:
+        template_key (tuple): key of the template in the template cache
+
+        attached_fixtures (list of Fixture): fixtures the new fixture is attached to, in ATTACH_ARGS order
+
+        rng (np.random.Generator): random number generator for the new fixture
+
+    Returns:
+        Fixture: new fixture
+    """
+    # looked up with get, so that the template counts as recently used
+    cached = _FIXTURE_TEMPLATE_CACHE.get(template_key)
+    template, template_rng, template_attached, attached_pos = cached
+
+    memo = {
+        id(old_fxtr): new_fxtr
+        for (old_fxtr, new_fxtr) in zip(template_attached, attached_fixtures)
+    }
+    if rng is None:
+        rng = np.random.default_rng()
+    memo[id(template_rng)] = rng
+    fixture = deepcopy(template, memo)
+    fixture._template_key = template_key
+
+    for fxtr, pos in zip(attached_fixtures, attached_pos):
+        fxtr._obj.set("pos", pos)
+        if hasattr(fxtr, "_clear_geometry_cache"):
+            fxtr._clear_geometry_cache()
     return fixture
 
 
@@ -99,8 +233,7 @@ def load_style_config(style, fixture_config):
         f"fixtures/fixture_registry/{fixture_type}.yaml",
         root=robocasa.models.assets_root,
     )
-    with open(yaml_path, "r") as f:
-        default_configs = yaml.safe_load(f)
+    default_configs = _load_yaml_shared(yaml_path)
 
     # find which configuration to use
     if type(fixture_style) == dict and "config_name" not in fixture_config:
@@ -121,7 +254,7 @@ def load_style_config(style, fixture_config):
         config_ids = fixture_style
 
     # search for config by name
-    config = default_configs["default"]
+    config = deepcopy(default_configs["default"])
     if not isinstance(config_ids, list):
         config_ids = [config_ids]
     for cfg_id in config_ids:
@@ -129,7 +262,7 @@ def load_style_config(style, fixture_config):
             # add additional arguments based on default config
             additional_config = default_configs[cfg_id]
             for k, v in additional_config.items():
-                config[k] = v
+                config[k] = deepcopy(v)
         else:
             raise ValueError(
                 'Did not find style that matches "{}" for '
@@ -0,0 +1,85 @@
+"""
+A script to benchmark scene construction (create_fixtures) across kitchen layouts and styles.
+Reports the per-reset create_fixtures time with and without the fixture template cache.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import robocasa.macros as macros
+import robocasa.models.scenes.scene_registry as SceneRegistry
+from robocasa.models.scenes.scene_builder import create_fixtures
+from robocasa.models.scenes.scene_utils import clear_fixture_template_cache
+
+
+def run_benchmark(layout_and_style_ids, num_resets, use_cache, seed=0):
+    """
+    Simulates @num_resets environment resets, each of which builds the fixtures for a random
+    (layout, style) pair
+
+    Args:
+        layout_and_style_ids (list of tuple): (layout id, style id) pairs to sample from
+
+        num_resets (int): number of resets to simulate
+
+        use_cache (bool): whether to use the fixture template cache
+
+        seed (int): seed for sampling scenes
+
+    Returns:
+        np.array: create_fixtures time for each reset
+    """
+    macros.USE_FIXTURE_TEMPLATE_CACHE = use_cache
+    clear_fixture_template_cache()
+
+    rng = np.random.default_rng(seed)
+    times = []
+    for _ in range(num_resets):
+        layout_id, style_id = layout_and_style_ids[
+            rng.integers(len(layout_and_style_ids))
+        ]
+        t_start = time.time()
+        create_fixtures(layout_id=layout_id, style_id=style_id, rng=rng)
+        times.append(time.time() - t_start)
+    return np.array(times)
+
+
+def report(name, times):
+    print(name)
+    print("   first reset: {:.3f}s".format(times[0]))
+    print("   mean reset:  {:.3f}s".format(np.mean(times)))
+    print("   p50 / p90:   {:.3f}s / {:.3f}s".format(*np.percentile(times, [50, 90])))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--layouts", type=int, nargs="+", default=-1, help="layout ids to sample from"
+    )
+    parser.add_argument(
+        "--styles", type=int, nargs="+", default=-1, help="style ids to sample from"
+    )
+    parser.add_argument(
+        "--num_resets", type=int, default=100, help="number of resets to simulate"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    layout_ids = SceneRegistry.unpack_layout_ids(args.layouts)
+    style_ids = SceneRegistry.unpack_style_ids(args.styles)
+    layout_and_style_ids = [(int(l), int(s)) for l in layout_ids for s in style_ids]
+
+    print(
+        "{} resets over {} (layout, style) pairs\n".format(
+            args.num_resets, len(layout_and_style_ids)
+        )
+    )
+
+    before = run_benchmark(layout_and_style_ids, args.num_resets, False, args.seed)
+    report("without fixture template cache", before)
+    after = run_benchmark(layout_and_style_ids, args.num_resets, True, args.seed)
+    report("with fixture template cache", after)
+
+    print("\nspeedup: {:.2f}x".format(np.mean(before) / np.mean(after)))
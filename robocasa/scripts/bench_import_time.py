@@ -0,0 +1,62 @@
+"""
+A script to benchmark the time it takes to import robocasa. Each measurement runs in a fresh interpreter.
+Reports the import time with lazy environment registration, and with all kitchen environment modules
+imported up front (the previous behavior of `import robocasa`).
+"""
+
+import argparse
+import subprocess
+import sys
+
+import numpy as np
+
+IMPORT_STMTS = {
+    "lazy": "import robocasa",
+    "eager": "import robocasa; robocasa.environments.import_all_kitchen_envs()",
+}
+
+
+def time_import(stmt):
+    """
+    Times @stmt in a fresh python interpreter
+
+    Args:
+        stmt (str): import statement to time
+
+    Returns:
+        float: time taken by @stmt, in seconds
+    """
+    code = "import time; t = time.perf_counter(); {}; print(time.perf_counter() - t)".format(
+        stmt
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        universal_newlines=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--num_trials", type=int, default=5, help="number of imports to time"
+    )
+    args = parser.parse_args()
+
+    times = dict()
+    for name, stmt in IMPORT_STMTS.items():
+        times[name] = np.array([time_import(stmt) for _ in range(args.num_trials)])
+        print(
+            "{:<6} mean {:.3f}s, min {:.3f}s".format(
+                name, np.mean(times[name]), np.min(times[name])
+            )
+        )
+
+    print(
+        "\nlazy registration saves {:.3f}s per import".format(
+            np.mean(times["eager"]) - np.mean(times["lazy"])
+        )
+    )
@@ -9,11 +9,11 @@ import time
 
 import numpy as np
 from termcolor import colored
-from tianshou.env import SubprocVectorEnv
 
 import robosuite as suite
 from robosuite.controllers import load_composite_controller_config
 from robocasa import ALL_KITCHEN_ENVIRONMENTS
+from robocasa.utils.vec_env import ShmemVectorEnv
 import robocasa
 
 
@@ -40,7 +40,7 @@ def run_rollout(env, arm, env_configuration, num_steps=200, render=False):
 
     # Loop until we get a reset from the input or the task completes
 
-    if isinstance(env, SubprocVectorEnv):
+    if hasattr(env, "get_env_attr"):
         ac_dim = env.get_env_attr(key="action_spec", id=0)[0][0].shape
         ac_dim = list([len(env)]) + list(ac_dim)
     else:
@@ -82,6 +82,18 @@ if __name__ == "__main__":
     parser.add_argument("--mjcf_path", type=str, help="path to object MJCF")
     parser.add_argument("--env", type=str, default="Lift")
     parser.add_argument("--num_envs", type=int, default=1)
+    parser.add_argument(
+        "--vec_env",
+        type=str,
+        default="shmem",
+        choices=["shmem", "subproc"],
+        help="vectorized env to use with --num_envs > 1: robocasa's shared memory env or tianshou's SubprocVectorEnv",
+    )
+    parser.add_argument(
+        "--standby",
+        action="store_true",
+        help="keep a standby env per worker that is reset in the background (shmem vectorized env only, requires --no_render)",
+    )
     parser.add_argument("--n_objs", type=int, default=None)
     parser.add_argument(
         "--robots",
@@ -122,7 +134,20 @@ if __name__ == "__main__":
     )
 
     parser.add_argument("--no_render", action="store_true")
+    parser.add_argument(
+        "--soft_reset",
+        action="store_true",
+        help="keep the compiled scene across resets, only re-sampling objects (kitchen envs)",
+    )
+    parser.add_argument(
+        "--settle_threshold",
+        type=float,
+        default=None,
+        help="settle objects at reset until joint velocities fall below this threshold (kitchen envs)",
+    )
     args = parser.parse_args()
+    if args.standby and not args.no_render:
+        parser.error("--standby requires --no_render")
 
     def create_env():
         # Get controller config
@@ -156,6 +181,8 @@ if __name__ == "__main__":
             config["layout_ids"] = 0
             config["style_ids"] = 0
             config["seed"] = args.seed
+            config["soft_reset"] = args.soft_reset
+            config["settle_qvel_threshold"] = args.settle_threshold
 
             if args.env == "KitchenDemo" and args.n_objs is not None:
                 config["num_objs"] = args.n_objs
@@ -169,7 +196,12 @@ if __name__ == "__main__":
 
     if args.num_envs > 1:
         env_fns = [lambda env_i=i: create_env() for i in range(args.num_envs)]
-        env = SubprocVectorEnv(env_fns)
+        if args.vec_env == "shmem":
+            env = ShmemVectorEnv(env_fns, standby=args.standby)
+        else:
+            from tianshou.env import SubprocVectorEnv
+
+            env = SubprocVectorEnv(env_fns)
     else:
         env = create_env()
 
@@ -182,7 +214,13 @@ if __name__ == "__main__":
         )
         print("ep #{}".format(ep + 1))
         print("   {:.2f}s reset time".format(reset_time))
+        if hasattr(env, "settle_substeps"):
+            print("   {} settle substeps".format(env.settle_substeps))
         print("   {:.2f} fps".format(steps_per_sec))
+        if hasattr(env, "step_times"):
+            print(
+                "   {:.2f}ms max worker step time".format(1000 * np.max(env.step_times))
+            )
         print()
         reset_time_list.append(reset_time)
         steps_per_sec_list.append(steps_per_sec)
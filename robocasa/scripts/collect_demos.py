@@ -27,6 +27,7 @@ from termcolor import colored
 
 import robocasa
 import robocasa.macros as macros
+import robocasa.models
 from robocasa.models.fixtures import FixtureType
 from robocasa.utils.robomimic.robomimic_dataset_utils import convert_to_robomimic_format
 
@@ -3,11 +3,13 @@ Script to extract observations from low-dimensional simulation states in a roboc
 Adapted from robomimic's dataset_states_to_obs.py script.
 """
 import os
+import sys
 import json
+import hashlib
+import shutil
 import h5py
 import argparse
 import numpy as np
-from copy import deepcopy
 import multiprocessing
 import queue
 import time
@@ -44,8 +46,8 @@ def extract_trajectory(
     """
     assert states.shape[0] == actions.shape[0]
 
-    # load the initial state
-    env.reset()
+    # load the initial state. reset_to rebuilds the scene itself, and only loads the state if the scene of the
+    # demo is already loaded, so the environment is not reset beforehand
     obs = env.reset_to(initial_state)
 
     # get updated ep meta in case it's been modified
@@ -53,7 +55,7 @@ def extract_trajectory(
     initial_state["ep_meta"] = json.dumps(ep_meta, indent=4)
 
     traj = dict(
-        obs=[],
+        obs=None,
         next_obs=[],
         rewards=[],
         dones=[],
@@ -66,7 +68,17 @@ def extract_trajectory(
     traj_len = states.shape[0]
     # iteration variable @t is over "next obs" indices
     for t in range(traj_len):
-        obs = deepcopy(env.reset_to({"states": states[t]}))
+        obs = env.reset_to({"states": states[t]})
+
+        # observations are written straight into arrays preallocated for the whole trajectory. The arrays of
+        # @obs may be reused by the environment, so they are copied into their slot
+        if traj["obs"] is None:
+            traj["obs"] = {
+                k: np.empty((traj_len,) + np.shape(v), dtype=np.asarray(v).dtype)
+                for (k, v) in obs.items()
+            }
+        for k in traj["obs"]:
+            traj["obs"][k][t] = obs[k]
 
         # extract datagen info
         if add_datagen_info:
@@ -93,14 +105,15 @@ def extract_trajectory(
         # action_abs = env.base_env.convert_rel_to_abs_action(actions[t])
 
         # collect transition
-        traj["obs"].append(obs)
         traj["rewards"].append(r)
         traj["dones"].append(done)
         traj["datagen_info"].append(datagen_info)
         # traj["actions_abs"].append(action_abs)
 
-    # convert list of dict to dict of list for obs dictionaries (for convenient writes to hdf5 dataset)
-    traj["obs"] = TensorUtils.list_of_flat_dict_to_dict_of_list(traj["obs"])
+    if traj["obs"] is None:
+        traj["obs"] = dict()
+
+    # convert list of dict to dict of list for datagen info (for convenient writes to hdf5 dataset)
     traj["datagen_info"] = TensorUtils.list_of_flat_dict_to_dict_of_list(
         traj["datagen_info"]
     )
@@ -111,130 +124,116 @@ def extract_trajectory(
             continue
         if isinstance(traj[k], dict):
             for kp in traj[k]:
-                traj[k][kp] = np.array(traj[k][kp])
+                traj[k][kp] = np.asarray(traj[k][kp])
         else:
             traj[k] = np.array(traj[k])
 
     return traj
 
 
-""" The process that writes over the generated files to memory """
+def write_traj_to_group(args, f, data_grp, ep, traj):
+    """
+    Writes an extracted trajectory to a new episode group
 
+    Args:
+        args (argparse.Namespace): script arguments
+        f (h5py.File): source dataset, to copy the action dict of the episode from
+        data_grp (h5py.Group): group to create the episode group in
+        ep (str): name of the episode group
+        traj (dict): trajectory returned by extract_trajectory
+
+    Returns:
+        int: number of transitions in the episode
+    """
+    ep_data_grp = data_grp.create_group(ep)
+    ep_data_grp.create_dataset("actions", data=np.array(traj["actions"]))
+    ep_data_grp.create_dataset("states", data=np.array(traj["states"]))
+    ep_data_grp.create_dataset("rewards", data=np.array(traj["rewards"]))
+    ep_data_grp.create_dataset("dones", data=np.array(traj["dones"]))
+    # ep_data_grp.create_dataset(
+    #     "actions_abs", data=np.array(traj["actions_abs"])
+    # )
+    for k in traj["obs"]:
+        if args.no_compress:
+            ep_data_grp.create_dataset(
+                "obs/{}".format(k), data=np.asarray(traj["obs"][k])
+            )
+        else:
+            ep_data_grp.create_dataset(
+                "obs/{}".format(k),
+                data=np.asarray(traj["obs"][k]),
+                compression="gzip",
+            )
+        if args.include_next_obs:
+            if args.no_compress:
+                ep_data_grp.create_dataset(
+                    "next_obs/{}".format(k),
+                    data=np.array(traj["next_obs"][k]),
+                )
+            else:
+                ep_data_grp.create_dataset(
+                    "next_obs/{}".format(k),
+                    data=np.array(traj["next_obs"][k]),
+                    compression="gzip",
+                )
 
-def write_traj_to_file(
-    args, output_path, total_samples, total_run, processes, mul_queue
-):
-    f = h5py.File(args.dataset, "r")
-    f_out = h5py.File(output_path, "w")
-    data_grp = f_out.create_group("data")
-    start_time = time.time()
-    num_processed = 0
+    if "datagen_info" in traj:
+        for k in traj["datagen_info"]:
+            ep_data_grp.create_dataset(
+                "datagen_info/{}".format(k),
+                data=np.array(traj["datagen_info"][k]),
+            )
 
-    try:
-        while (total_run.value < (processes)) or not mul_queue.empty():
-            if not mul_queue.empty():
-                num_processed = num_processed + 1
-                item = mul_queue.get()
-                ep = item[0]
-                traj = item[1]
-                process_num = item[2]
-                try:
-                    ep_data_grp = data_grp.create_group(ep)
-                    ep_data_grp.create_dataset(
-                        "actions", data=np.array(traj["actions"])
-                    )
-                    ep_data_grp.create_dataset("states", data=np.array(traj["states"]))
-                    ep_data_grp.create_dataset(
-                        "rewards", data=np.array(traj["rewards"])
-                    )
-                    ep_data_grp.create_dataset("dones", data=np.array(traj["dones"]))
-                    # ep_data_grp.create_dataset(
-                    #     "actions_abs", data=np.array(traj["actions_abs"])
-                    # )
-                    for k in traj["obs"]:
-                        if args.no_compress:
-                            ep_data_grp.create_dataset(
-                                "obs/{}".format(k), data=np.array(traj["obs"][k])
-                            )
-                        else:
-                            ep_data_grp.create_dataset(
-                                "obs/{}".format(k),
-                                data=np.array(traj["obs"][k]),
-                                compression="gzip",
-                            )
-                        if args.include_next_obs:
-                            if args.no_compress:
-                                ep_data_grp.create_dataset(
-                                    "next_obs/{}".format(k),
-                                    data=np.array(traj["next_obs"][k]),
-                                )
-                            else:
-                                ep_data_grp.create_dataset(
-                                    "next_obs/{}".format(k),
-                                    data=np.array(traj["next_obs"][k]),
-                                    compression="gzip",
-                                )
-
-                    if "datagen_info" in traj:
-                        for k in traj["datagen_info"]:
-                            ep_data_grp.create_dataset(
-                                "datagen_info/{}".format(k),
-                                data=np.array(traj["datagen_info"][k]),
-                            )
-
-                    # copy action dict (if applicable)
-                    if "data/{}/action_dict".format(ep) in f:
-                        action_dict = f["data/{}/action_dict".format(ep)]
-                        for k in action_dict:
-                            ep_data_grp.create_dataset(
-                                "action_dict/{}".format(k),
-                                data=np.array(action_dict[k][()]),
-                            )
-
-                    # episode metadata
-                    ep_data_grp.attrs["model_file"] = traj["initial_state_dict"][
-                        "model"
-                    ]  # model xml for this episode
-                    ep_data_grp.attrs["ep_meta"] = traj["initial_state_dict"][
-                        "ep_meta"
-                    ]  # ep meta data for this episode
-                    # if "ep_meta" in f["data/{}".format(ep)].attrs:
-                    #     ep_data_grp.attrs["ep_meta"] = f["data/{}".format(ep)].attrs["ep_meta"]
-                    ep_data_grp.attrs["num_samples"] = traj["actions"].shape[
-                        0
-                    ]  # number of transitions in this episode
-
-                    total_samples.value += traj["actions"].shape[0]
-                except Exception as e:
-                    print("++" * 50)
-                    print(
-                        f"Error at Process {process_num} on episode {ep} with \n\n {e}"
-                    )
-                    print("++" * 50)
-                    raise Exception("Write out to file has failed")
-                print(
-                    "ep {}: wrote {} transitions to group {} at process {} with {} finished. Datagen rate: {:.2f} sec/demo".format(
-                        num_processed,
-                        ep_data_grp.attrs["num_samples"],
-                        ep,
-                        process_num,
-                        total_run.value,
-                        (time.time() - start_time) / num_processed,
-                    )
-                )
-    except KeyboardInterrupt:
-        print("Control C pressed. Closing File and ending \n\n\n\n\n\n\n")
+    # copy action dict (if applicable)
+    if "data/{}/action_dict".format(ep) in f:
+        action_dict = f["data/{}/action_dict".format(ep)]
+        for k in action_dict:
+            ep_data_grp.create_dataset(
+                "action_dict/{}".format(k),
+                data=np.array(action_dict[k][()]),
+            )
+
+    # episode metadata
+    ep_data_grp.attrs["model_file"] = traj["initial_state_dict"][
+        "model"
+    ]  # model xml for this episode
+    ep_data_grp.attrs["ep_meta"] = traj["initial_state_dict"][
+        "ep_meta"
+    ]  # ep meta data for this episode
+    # if "ep_meta" in f["data/{}".format(ep)].attrs:
+    #     ep_data_grp.attrs["ep_meta"] = f["data/{}".format(ep)].attrs["ep_meta"]
+    ep_data_grp.attrs["num_samples"] = traj["actions"].shape[
+        0
+    ]  # number of transitions in this episode
+    return ep_data_grp.attrs["num_samples"]
+
+
+def finalize_output(args, output_path, total_samples):
+    """
+    Writes the global metadata of the output dataset, copies the filter keys of the source dataset and
+    post-processes the output (action dicts, contiguous demo ids, dataset size filter keys)
+
+    Args:
+        args (argparse.Namespace): script arguments
+        output_path (str): path to the output dataset, with all episodes written
+        total_samples (int): total number of transitions in the output dataset
+    """
+    f = h5py.File(args.dataset, "r")
+    f_out = h5py.File(output_path, "a")
+    data_grp = f_out["data"]
 
     if "mask" in f:
         f.copy("mask", f_out)
 
     # global metadata
-    data_grp.attrs["total"] = total_samples.value
+    data_grp.attrs["total"] = total_samples
     env_meta = DatasetUtils.get_env_metadata_from_dataset(dataset_path=args.dataset)
     if args.generative_textures:
         env_meta["env_kwargs"]["generative_textures"] = "100p"
     if args.randomize_cameras:
         env_meta["env_kwargs"]["randomize_cameras"] = True
+    if args.model_cache:
+        env_meta["env_kwargs"]["use_model_cache"] = True
     env = EnvUtils.create_env_for_data_processing(
         env_meta=env_meta,
         camera_names=args.camera_names,
@@ -242,11 +241,10 @@ def write_traj_to_file(
         camera_width=args.camera_width,
         reward_shaping=args.shaped,
     )
-    print("total processes end {}".format(total_run.value))
     data_grp.attrs["env_args"] = json.dumps(
         env.serialize(), indent=4
     )  # environment info
-    print("Wrote {} total samples to {}".format(total_samples.value, output_path))
+    print("Wrote {} total samples to {}".format(total_samples, output_path))
 
     f_out.close()
     f.close()
@@ -290,6 +288,320 @@ def write_traj_to_file(
             num_demos=num_demos,
         )
 
+
+def get_shard_dir(output_path):
+    """
+    Gets the directory that holds the shards and progress manifests of a run writing to @output_path
+    """
+    return output_path[:-5] + "_shards"
+
+
+def get_shard_paths(output_path, num_shards):
+    """
+    Gets the paths of the shard files that the workers write their episodes to
+
+    Args:
+        output_path (str): path to the output dataset
+        num_shards (int): number of shards (one per worker)
+
+    Returns:
+        list: path of each shard
+    """
+    shard_dir = get_shard_dir(output_path)
+    return [
+        os.path.join(shard_dir, "shard_{}.hdf5".format(i)) for i in range(num_shards)
+    ]
+
+
+def get_demo_checksum(f, ep):
+    """
+    Gets a checksum of the source data of a demo, used to detect demos that changed since they were extracted
+
+    Args:
+        f (h5py.File): source dataset
+        ep (str): name of the demo
+
+    Returns:
+        str: checksum of the states, actions and model of the demo
+    """
+    ep_grp = f["data/{}".format(ep)]
+    checksum = hashlib.sha1()
+    checksum.update(np.ascontiguousarray(ep_grp["states"][()]).tobytes())
+    checksum.update(np.ascontiguousarray(ep_grp["actions"][()]).tobytes())
+    checksum.update(str(ep_grp.attrs["model_file"]).encode("utf-8"))
+    return checksum.hexdigest()
+
+
+def append_to_manifest(shard_path, entry):
+    """
+    Records a demo that was completely written to a shard in the progress manifest of the shard.
+    Needs to be called after the shard has been flushed
+
+    Args:
+        shard_path (str): path to the shard file
+        entry (dict): demo name, number of samples and checksum of the demo
+    """
+    with open(shard_path[:-5] + ".jsonl", "a") as manifest:
+        manifest.write(json.dumps(entry) + "\n")
+        manifest.flush()
+        os.fsync(manifest.fileno())
+
+
+def load_manifest(shard_dir, f):
+    """
+    Gets the demos that were completely written to the shards of a previous run. Entries whose demo is missing
+    from its shard or whose checksum does not match the source dataset are ignored, and shards that cannot be
+    read (e.g. because their worker was killed while writing) are removed
+
+    Args:
+        shard_dir (str): directory holding the shards and their manifests
+        f (h5py.File): source dataset
+
+    Returns:
+        dict: maps each completed demo to the path of its shard
+    """
+    completed = dict()
+    if not os.path.isdir(shard_dir):
+        return completed
+    for name in sorted(os.listdir(shard_dir)):
+        if not name.endswith(".jsonl"):
+            continue
+        manifest_path = os.path.join(shard_dir, name)
+        shard_path = manifest_path[:-6] + ".hdf5"
+        with open(manifest_path, "r") as manifest:
+            # the last line may be incomplete if the worker was killed while writing it
+            entries = []
+            for line in manifest:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass
+        try:
+            with h5py.File(shard_path, "r") as f_shard:
+                for entry in entries:
+                    ep = entry["demo"]
+                    ep_path = "data/{}".format(ep)
+                    if (
+                        ep in completed
+                        or ep_path not in f_shard
+                        or "num_samples" not in f_shard[ep_path].attrs
+                        or "data/{}".format(ep) not in f
+                        or get_demo_checksum(f, ep) != entry["checksum"]
+                    ):
+                        continue
+                    completed[ep] = shard_path
+        except OSError:
+            print("Discarding unreadable shard {}".format(shard_path))
+            for path in [manifest_path, shard_path]:
+                if os.path.exists(path):
+                    os.remove(path)
+    return completed
+
+
+def write_traj_to_shard(args, f, f_shard, ep, traj):
+    """
+    Writes an extracted trajectory to the shard file of a worker. Partially written episodes are removed,
+    so that the episode can be written again
+
+    Args:
+        args (argparse.Namespace): script arguments
+        f (h5py.File): source dataset
+        f_shard (h5py.File): shard file of the worker
+        ep (str): name of the episode group
+        traj (dict): trajectory returned by extract_trajectory
+
+    Returns:
+        int: number of transitions in the episode
+    """
+    data_grp = f_shard.require_group("data")
+    if ep in data_grp:
+        del data_grp[ep]
+    try:
+        num_samples = write_traj_to_group(args, f, data_grp, ep, traj)
+    except BaseException:
+        if ep in data_grp:
+            del data_grp[ep]
+        raise
+    f_shard.flush()
+    append_to_manifest(
+        f_shard.filename,
+        dict(demo=ep, num_samples=int(num_samples), checksum=get_demo_checksum(f, ep)),
+    )
+    return num_samples
+
+
+def merge_shards(args, shard_dir, output_path, demos):
+    """
+    Copies the episodes of @demos from the shards (see load_manifest) into the output dataset and finalizes it
+    (see finalize_output). Episode groups are copied as a whole, without decompressing and recompressing their
+    datasets. The output is assembled in a temporary file that replaces @output_path once it is finalized, so
+    that @output_path is only ever a complete dataset. Nothing is written if any of @demos has not been completed
+
+    Args:
+        args (argparse.Namespace): script arguments
+        shard_dir (str): directory holding the shards and their manifests
+        output_path (str): path to the output dataset
+        demos (list): demos that make up the output dataset
+
+    Returns:
+        bool: True if the output dataset was written, False if some demos have not been completed
+    """
+    f = h5py.File(args.dataset, "r")
+    completed = load_manifest(shard_dir, f)
+    f.close()
+
+    missing = [ep for ep in demos if ep not in completed]
+    if len(missing) > 0:
+        print(
+            "{} of {} demos were not completed: {}".format(
+                len(missing), len(demos), ", ".join(missing)
+            )
+        )
+        return False
+    completed = {ep: completed[ep] for ep in demos}
+
+    tmp_path = os.path.join(shard_dir, "merged.hdf5")
+    f_out = h5py.File(tmp_path, "w")
+    data_grp = f_out.create_group("data")
+    total_samples = 0
+    for shard_path in sorted(set(completed.values())):
+        with h5py.File(shard_path, "r") as f_shard:
+            for (ep, ep_shard_path) in completed.items():
+                if ep_shard_path != shard_path:
+                    continue
+                f_shard.copy(f_shard["data/{}".format(ep)], data_grp, name=ep)
+                total_samples += int(data_grp[ep].attrs["num_samples"])
+    print("Merged {} episodes from {}".format(len(data_grp), shard_dir))
+    f_out.close()
+
+    finalize_output(args, tmp_path, total_samples)
+    os.replace(tmp_path, output_path)
+    return True
+
+
+""" The process that writes over the generated files to memory """
+
+
+def get_traj_nbytes(traj):
+    """
+    Returns the number of bytes of the arrays of a trajectory returned by extract_trajectory
+    """
+    nbytes = 0
+    for v in traj.values():
+        if isinstance(v, dict):
+            nbytes += get_traj_nbytes(v)
+        elif isinstance(v, np.ndarray):
+            nbytes += v.nbytes
+    return nbytes
+
+
+def get_queue_depth(q):
+    """
+    Returns the approximate number of items in a multiprocessing queue, or None if the platform does
+    not support it (e.g. macOS)
+    """
+    try:
+        return q.qsize()
+    except NotImplementedError:
+        return None
+
+
+def write_traj_to_file(
+    args, output_path, total_samples, workers, mul_queue, writer_done, timeout=10.0
+):
+    """
+    Writes the trajectories that the @workers send through @mul_queue to the output file. The writer
+    blocks until a trajectory arrives and stops once it has received a None sentinel from each worker.
+    Since @mul_queue is bounded, workers wait while the writer falls behind instead of piling up
+    trajectories in memory. Runs in the process that started the @workers, so that it can tell when
+    a worker was killed before sending its sentinel
+
+    Args:
+        args (argparse.Namespace): script arguments
+        output_path (str): path of the output file
+        total_samples (multiprocessing.Value): total number of transitions written
+        workers (list): started worker processes
+        mul_queue (multiprocessing.Queue): queue of [ep, traj, process_num] items and None sentinels
+        writer_done (multiprocessing.Event): set once the writer has stopped, so that workers stop
+            waiting for room in @mul_queue
+        timeout (float): seconds to wait for a trajectory before checking on the workers
+
+    Returns:
+        bool: whether every worker has finished and the output has been finalized
+    """
+    f = h5py.File(args.dataset, "r")
+    f_out = h5py.File(output_path, "w")
+    data_grp = f_out.create_group("data")
+    start_time = time.time()
+    num_processed = 0
+    num_bytes = 0
+    num_finished = 0
+    processes = len(workers)
+
+    try:
+        while num_finished < processes:
+            try:
+                item = mul_queue.get(timeout=timeout)
+            except queue.Empty:
+                # sentinels are flushed to the queue before a worker exits, so workers that have all
+                # exited without them being received were killed
+                if all(worker.exitcode is not None for worker in workers):
+                    break
+                print(
+                    "writer: waiting for trajectories ({} of {} processes finished)".format(
+                        num_finished, processes
+                    )
+                )
+                continue
+            if item is None:
+                num_finished += 1
+                continue
+
+            num_processed = num_processed + 1
+            ep = item[0]
+            traj = item[1]
+            process_num = item[2]
+            try:
+                num_samples = write_traj_to_group(args, f, data_grp, ep, traj)
+                total_samples.value += num_samples
+            except Exception as e:
+                print("++" * 50)
+                print(f"Error at Process {process_num} on episode {ep} with \n\n {e}")
+                print("++" * 50)
+                raise Exception("Write out to file has failed")
+            num_bytes += get_traj_nbytes(traj)
+            elapsed_time = time.time() - start_time
+            print(
+                "ep {}: wrote {} transitions to group {} at process {} with {} finished. "
+                "{:.2f} demos/s, {:.2f} MB/s, queue depth {}".format(
+                    num_processed,
+                    num_samples,
+                    ep,
+                    process_num,
+                    num_finished,
+                    num_processed / elapsed_time,
+                    num_bytes / (1024 * 1024) / elapsed_time,
+                    get_queue_depth(mul_queue),
+                )
+            )
+    except KeyboardInterrupt:
+        print("Control C pressed. Closing File and ending \n\n\n\n\n\n\n")
+    finally:
+        writer_done.set()
+        f_out.close()
+        f.close()
+
+    print("total processes end {}".format(num_finished))
+    if num_finished < processes:
+        print(
+            "{} of {} processes exited without finishing. '{}' was not finalized".format(
+                processes - num_finished, processes, output_path
+            )
+        )
+        return False
+
+    finalize_output(args, output_path, total_samples.value)
+
     print("Writing has finished")
 
     end_time = time.time()
@@ -298,16 +610,58 @@ def write_traj_to_file(
     elapsed_time = end_time - start_time
 
     print(f"Time elapsed: {elapsed_time:.2f} seconds")
-    return
+    return True
+
+
+def put_to_writer(mul_queue, item, writer_done, timeout=10.0):
+    """
+    Puts @item into the bounded @mul_queue, waiting for room as long as the writer is running
+
+    Args:
+        mul_queue (multiprocessing.Queue): queue read by the writer
+        item (list or None): [ep, traj, process_num] item, or None sentinel
+        writer_done (multiprocessing.Event): set once the writer has stopped
+        timeout (float): seconds to wait for room before checking on the writer
+
+    Returns:
+        bool: whether @item was put into @mul_queue
+    """
+    while not writer_done.is_set():
+        parent = multiprocessing.parent_process()
+        if parent is not None and not parent.is_alive():
+            # the writer runs in the parent process
+            break
+        try:
+            mul_queue.put(item, timeout=timeout)
+            return True
+        except queue.Full:
+            continue
+    # trajectories that were put but not yet sent must not keep the worker from exiting
+    mul_queue.cancel_join_thread()
+    return False
 
 
 # runs multiple trajectory. If there has been an unrecoverable error, the system puts the current work back into the queue and exits
 def extract_multiple_trajectories(
-    process_num, current_work_array, work_queue, lock, args2, num_finished, mul_queue
+    process_num,
+    current_work_array,
+    work_queue,
+    lock,
+    args2,
+    mul_queue,
+    shard_path=None,
+    writer_done=None,
 ):
     try:
         extract_multiple_trajectories_with_error(
-            process_num, current_work_array, work_queue, lock, args2, mul_queue
+            process_num,
+            current_work_array,
+            work_queue,
+            lock,
+            args2,
+            mul_queue,
+            shard_path=shard_path,
+            writer_done=writer_done,
         )
     except Exception as e:
         work_queue.put(current_work_array[process_num])
@@ -318,7 +672,9 @@ def extract_multiple_trajectories(
         print("*>*" * 50)
         print()
 
-    num_finished.value = num_finished.value + 1
+    if shard_path is None:
+        # tell the writer that this process has finished
+        put_to_writer(mul_queue, None, writer_done)
 
 
 def retrieve_new_index(process_num, current_work_array, work_queue, lock):
@@ -334,8 +690,19 @@ def retrieve_new_index(process_num, current_work_array, work_queue, lock):
 
 
 def extract_multiple_trajectories_with_error(
-    process_num, current_work_array, work_queue, lock, args, mul_queue
+    process_num,
+    current_work_array,
+    work_queue,
+    lock,
+    args,
+    mul_queue,
+    shard_path=None,
+    writer_done=None,
 ):
+    """
+    Extracts the trajectories of the demos in @work_queue. Trajectories are written to the shard file at
+    @shard_path if given, and are sent to the writer through @mul_queue otherwise, until @writer_done is set
+    """
     # create environment to use for data processing
 
     if args.add_datagen_info:
@@ -348,6 +715,8 @@ def extract_multiple_trajectories_with_error(
         env_meta["env_kwargs"]["generative_textures"] = "100p"
     if args.randomize_cameras:
         env_meta["env_kwargs"]["randomize_cameras"] = True
+    if args.model_cache:
+        env_meta["env_kwargs"]["use_model_cache"] = True
     env = EnvUtils.create_env_for_data_processing(
         env_meta=env_meta,
         camera_names=args.camera_names,
@@ -379,8 +748,13 @@ def extract_multiple_trajectories_with_error(
     if args.n is not None:
         demos = demos[: args.n]
 
+    f_shard = None
+    if shard_path is not None:
+        f_shard = h5py.File(shard_path, "a")
+
+    # the last index is taken from the queue while it is processed, so the loop stops once no index was retrieved
     ind = retrieve_new_index(process_num, current_work_array, work_queue, lock)
-    while (not work_queue.empty()) and (ind != -1):
+    while ind != -1:
         try:
             # print("Running {} index".format(ind))
             ep = demos[ind]
@@ -422,8 +796,21 @@ def extract_multiple_trajectories_with_error(
 
             # IMPORTANT: keep name of group the same as source file, to make sure that filter keys are
             #            consistent as well
-            # print("(process {}): ADD TO QUEUE index {}".format(process_num, ind))
-            mul_queue.put([ep, traj, process_num])
+            if f_shard is not None:
+                num_samples = write_traj_to_shard(args, f, f_shard, ep, traj)
+                print(
+                    "wrote {} transitions to group {} at process {}. Datagen rate: {:.2f} sec/demo".format(
+                        num_samples,
+                        ep,
+                        process_num,
+                        (time.time() - start_time) / len(f_shard["data"]),
+                    )
+                )
+            else:
+                # print("(process {}): ADD TO QUEUE index {}".format(process_num, ind))
+                if not put_to_writer(mul_queue, [ep, traj, process_num], writer_done):
+                    print("Process {}: writer has stopped".format(process_num))
+                    break
 
             ind = retrieve_new_index(process_num, current_work_array, work_queue, lock)
         except Exception as e:
@@ -440,8 +827,13 @@ def extract_multiple_trajectories_with_error(
                 camera_width=args.camera_width,
                 reward_shaping=args.shaped,
             )
+            # the demo is left out, so that a demo that always fails does not stall the worker. Sharded runs
+            # report it as not completed, and it is retried with --resume
+            ind = retrieve_new_index(process_num, current_work_array, work_queue, lock)
 
     f.close()
+    if f_shard is not None:
+        f_shard.close()
     print("Process {} finished".format(process_num))
 
 
@@ -468,15 +860,27 @@ def dataset_states_to_obs_multiprocessing(args):
                 )
 
     output_path = os.path.join(os.path.dirname(args.dataset), output_name)
-    # Check if the file exists
-    if os.path.exists(output_path):
-        # Ask the user if they want to overwrite
-        user_input = input(f"The file '{output_path}' already exists. Overwrite? (y/n): ").strip().lower()
-        if user_input != "y":
-            print("Operation aborted. No changes were made.")
-            sys.exit(0)  # Exit the program without saving
-    else:
-        print("The file does not exist. Proceeding to save.")
+    shard_dir = get_shard_dir(output_path)
+    if args.resume and args.single_writer:
+        print("--resume is not supported with --single_writer")
+        sys.exit(1)
+    if args.overwrite:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        if os.path.isdir(shard_dir):
+            shutil.rmtree(shard_dir)
+    elif args.resume:
+        if os.path.exists(output_path) and not os.path.isdir(shard_dir):
+            print("The file '{}' is already complete.".format(output_path))
+            return
+    elif os.path.exists(output_path) or os.path.isdir(shard_dir):
+        print(
+            "The file '{}' or the progress of a previous run already exists. "
+            "Use --resume to continue the previous run or --overwrite to start over.".format(
+                output_path
+            )
+        )
+        sys.exit(1)
 
     print("input file: {}".format(args.dataset))
     print("output file: {}".format(output_path))
@@ -497,6 +901,16 @@ def dataset_states_to_obs_multiprocessing(args):
         demos = demos[: args.n]
 
     num_demos = len(demos)
+
+    # demos that were completed by a previous run
+    completed = dict()
+    if args.resume:
+        completed = load_manifest(shard_dir, f)
+        print(
+            "Resuming: {} of {} demos already completed".format(
+                len(set(completed) & set(demos)), num_demos
+            )
+        )
     f.close()
 
     env_meta = DatasetUtils.get_env_metadata_from_dataset(dataset_path=args.dataset)
@@ -505,12 +919,26 @@ def dataset_states_to_obs_multiprocessing(args):
     index = multiprocessing.Value("i", 0)
     lock = multiprocessing.Lock()
     total_samples_shared = multiprocessing.Value("i", 0)
-    num_finished = multiprocessing.Value("i", 0)
-    mul_queue = multiprocessing.Queue()
+    # bounded, so that workers wait for the writer instead of filling up memory with trajectories
+    queue_size = args.queue_size
+    if queue_size is None:
+        queue_size = 2 * num_processes
+    mul_queue = multiprocessing.Queue(maxsize=queue_size)
     work_queue = multiprocessing.Queue()
     for index in range(num_demos):
-        work_queue.put(index)
+        if demos[index] not in completed:
+            work_queue.put(index)
     current_work_array = multiprocessing.Array("i", num_processes)
+
+    # each worker writes its episodes to its own shard, unless a single writer process is used
+    shard_paths = [None] * num_processes
+    if not args.single_writer:
+        shard_paths = get_shard_paths(output_path, num_processes)
+        os.makedirs(shard_dir, exist_ok=True)
+
+    # set once the writer has stopped, so that workers do not wait for room in mul_queue forever
+    writer_done = multiprocessing.Event()
+
     processes = []
     for i in range(num_processes):
         process = multiprocessing.Process(
@@ -521,30 +949,45 @@ def dataset_states_to_obs_multiprocessing(args):
                 work_queue,
                 lock,
                 args,
-                num_finished,
                 mul_queue,
+                shard_paths[i],
+                writer_done,
             ),
         )
         processes.append(process)
 
-    process1 = multiprocessing.Process(
-        target=write_traj_to_file,
-        args=(
-            args,
-            output_path,
-            total_samples_shared,
-            num_finished,
-            num_processes,
-            mul_queue,
-        ),
-    )
-    processes.append(process1)
-
     for process in processes:
         process.start()
 
-    for process in processes:
-        process.join()
+    if args.single_writer:
+        # the writer runs in this process, so that it can check whether the workers are still running
+        try:
+            finished = write_traj_to_file(
+                args,
+                output_path,
+                total_samples_shared,
+                processes,
+                mul_queue,
+                writer_done,
+            )
+        finally:
+            for process in processes:
+                process.join()
+        if not finished:
+            sys.exit(1)
+    else:
+        for process in processes:
+            process.join()
+
+    if not args.single_writer:
+        if not merge_shards(args, shard_dir, output_path, demos):
+            print(
+                "Keeping the progress in '{}'. Use --resume to retry the missing demos.".format(
+                    shard_dir
+                )
+            )
+            sys.exit(1)
+        shutil.rmtree(shard_dir)
 
     print("Finished Multiprocessing")
     return
@@ -661,6 +1104,31 @@ if __name__ == "__main__":
         help="number of parallel processes for extracting image obs",
     )
 
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="(optional) continue a previous run that was interrupted, skipping the demos it completed",
+    )
+
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="(optional) overwrite an existing output file and discard the progress of previous runs",
+    )
+
+    parser.add_argument(
+        "--single_writer",
+        action="store_true",
+        help="(optional) send all trajectories to a single writer process instead of having each process write its own shard",
+    )
+
+    parser.add_argument(
+        "--queue_size",
+        type=int,
+        default=None,
+        help="(optional) maximum number of trajectories waiting for the writer with --single_writer. Defaults to twice the number of processes",
+    )
+
     parser.add_argument(
         "--add_datagen_info",
         action="store_true",
@@ -671,5 +1139,11 @@ if __name__ == "__main__":
 
     parser.add_argument("--randomize_cameras", action="store_true")
 
+    parser.add_argument(
+        "--model_cache",
+        action="store_true",
+        help="(optional) cache compiled scene models on disk, so that repeated scenes are not recompiled",
+    )
+
     args = parser.parse_args()
     dataset_states_to_obs_multiprocessing(args)
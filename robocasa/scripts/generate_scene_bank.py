@@ -0,0 +1,111 @@
+"""
+A script to pre-generate a scene bank of valid episodes for a kitchen environment.
+Episodes are generated in parallel worker processes, each with its own seed. Kitchen environments
+can then be created with scene_bank=<path> to draw their episodes from the bank instead of sampling them online.
+
+Example:
+    $ python generate_scene_bank.py --env PnPCounterToCab --num_episodes 1000 --num_workers 8 \
+        --out /tmp/PnPCounterToCab_bank.hdf5
+"""
+
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+import robosuite
+from robosuite.controllers import load_composite_controller_config
+
+import robocasa
+from robocasa.utils.scene_bank import SceneBank
+
+
+def generate_entries(env_kwargs, num_episodes, seed):
+    """
+    Generates scene bank entries in a single process
+
+    Args:
+        env_kwargs (dict): kwargs to create the environment with
+
+        num_episodes (int): number of episodes to generate
+
+        seed (int): environment seed
+
+    Returns:
+        list: scene bank entries
+    """
+    env_kwargs = dict(env_kwargs)
+    env_kwargs["controller_configs"] = load_composite_controller_config(
+        controller=None,
+        robot=env_kwargs["robots"],
+    )
+    env = robosuite.make(**env_kwargs, seed=seed)
+
+    entries = []
+    for _ in range(num_episodes):
+        env.reset()
+        entries.append(env.get_scene_bank_entry())
+    env.close()
+    return entries
+
+
+def _generate_entries(args):
+    return generate_entries(*args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--env", type=str, required=True, help="kitchen environment")
+    parser.add_argument("--robots", type=str, default="PandaOmron")
+    parser.add_argument(
+        "--layout", type=int, nargs="+", default=None, help="layout ids to use"
+    )
+    parser.add_argument(
+        "--style", type=int, nargs="+", default=None, help="style ids to use"
+    )
+    parser.add_argument(
+        "--num_episodes", type=int, default=100, help="number of episodes to generate"
+    )
+    parser.add_argument(
+        "--num_workers", type=int, default=1, help="number of worker processes"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--out", type=str, required=True, help="path of the scene bank hdf5 file"
+    )
+    args = parser.parse_args()
+
+    env_kwargs = dict(
+        env_name=args.env,
+        robots=args.robots,
+        layout_ids=args.layout,
+        style_ids=args.style,
+        has_renderer=False,
+        has_offscreen_renderer=False,
+        use_camera_obs=False,
+        ignore_done=True,
+    )
+
+    # split episodes evenly across workers
+    num_workers = min(args.num_workers, args.num_episodes)
+    worker_episodes = np.diff(
+        np.linspace(0, args.num_episodes, num_workers + 1).astype(int)
+    )
+    worker_args = [
+        (env_kwargs, int(n), args.seed + i) for (i, n) in enumerate(worker_episodes)
+    ]
+
+    t_start = time.time()
+    if num_workers > 1:
+        with multiprocessing.get_context("spawn").Pool(num_workers) as pool:
+            worker_entries = pool.map(_generate_entries, worker_args)
+    else:
+        worker_entries = [_generate_entries(worker_args[0])]
+    entries = [entry for entries in worker_entries for entry in entries]
+
+    SceneBank.write(args.out, entries, env_name=args.env, env_kwargs=env_kwargs)
+    print(
+        "Generated {} episodes in {:.1f}s. Saved scene bank to {}".format(
+            len(entries), time.time() - t_start, args.out
+        )
+    )
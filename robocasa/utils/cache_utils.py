@@ -0,0 +1,282 @@
+"""
+Utilities for caching expensive-to-build artifacts (e.g. compiled MuJoCo models) on disk and in memory.
+Cache files are written atomically so that many worker processes can safely share a single cache directory.
+"""
+
+import copy
+import hashlib
+import os
+import re
+import tempfile
+from collections import OrderedDict
+
+import mujoco
+import numpy as np
+
+import robocasa.macros as macros
+
+# matches the file="..." attribute of mesh / texture / hfield / skin assets in a model xml
+_XML_FILE_ATTR_RE = re.compile(r'\sfile="([^"]+)"')
+
+
+def get_cache_dir(*subdirs):
+    """
+    Returns (and creates if necessary) a directory inside the robocasa cache
+
+    Args:
+        subdirs (str): subdirectories inside the base cache directory
+
+    Returns:
+        str: path to the cache directory
+    """
+    if macros.CACHE_BASE_PATH is None:
+        base_path = os.path.join(os.path.expanduser("~"), ".cache", "robocasa")
+    else:
+        base_path = macros.CACHE_BASE_PATH
+    cache_dir = os.path.join(base_path, *subdirs)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def atomic_write(path, data):
+    """
+    Writes @data to @path by writing to a temporary file in the same directory and renaming it.
+    Readers in other processes will either see the old file, the new file, or no file, but never a partial one.
+
+    Args:
+        path (str): destination path
+
+        data (bytes or str): contents to write
+    """
+    folder = os.path.dirname(path)
+    mode = "wb" if isinstance(data, bytes) else "w"
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def freeze(value):
+    """
+    Converts a (nested) config value into a hashable representation, to be used in cache keys
+
+    Args:
+        value: value to convert. Dicts, lists, tuples and arrays are converted recursively
+
+    Returns:
+        hashable representation of @value
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for (k, v) in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return freeze(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class LRUCache(OrderedDict):
+    """
+    In-memory cache that keeps at most @max_size entries. Once it is full, adding an entry evicts the least
+    recently added or looked up (with get) entry
+
+    Args:
+        max_size (int): maximum number of entries
+    """
+
+    def __init__(self, max_size):
+        super().__init__()
+        self.max_size = max_size
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+
+def file_fingerprint(path):
+    """
+    Returns a cheap fingerprint (path, size, mtime) of a file. Missing files are fingerprinted as such.
+
+    Args:
+        path (str): path to the file
+
+    Returns:
+        str: fingerprint of the file
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "{}:missing".format(path)
+    return "{}:{}:{}".format(path, stat.st_size, stat.st_mtime_ns)
+
+
+def get_model_xml_hash(xml_str):
+    """
+    Computes a content hash for a model xml, including fingerprints of all asset files it references
+    and the MuJoCo version used for compilation
+
+    Args:
+        xml_str (str): model xml
+
+    Returns:
+        str: hex digest identifying the compiled model
+    """
+    h = hashlib.sha1()
+    h.update(mujoco.__version__.encode("utf8"))
+    h.update(xml_str.encode("utf8"))
+    for asset_path in sorted(set(_XML_FILE_ATTR_RE.findall(xml_str))):
+        h.update(file_fingerprint(asset_path).encode("utf8"))
+    return h.hexdigest()
+
+
+class CompiledModelCache:
+    """
+    Content-addressed on-disk cache of compiled MuJoCo models, stored as binary MJB files.
+    The total size of the cache is bounded, with least-recently-used models evicted first.
+    The most recently loaded models are additionally kept in memory, so that scenes that are loaded again
+    by the same process are neither recompiled nor read from disk.
+
+    Args:
+        cache_dir (str): directory to store MJB files in. Defaults to the "compiled_models" robocasa cache directory
+
+        max_size_mb (float): maximum total size of the cache in megabytes. Defaults to macros.MODEL_CACHE_MAX_SIZE_MB
+
+        max_memory_models (int): maximum number of models kept in memory. Defaults to
+            macros.MODEL_CACHE_NUM_MEMORY_MODELS
+    """
+
+    def __init__(self, cache_dir=None, max_size_mb=None, max_memory_models=None):
+        if cache_dir is None:
+            cache_dir = get_cache_dir("compiled_models")
+        else:
+            os.makedirs(cache_dir, exist_ok=True)
+        if max_size_mb is None:
+            max_size_mb = macros.MODEL_CACHE_MAX_SIZE_MB
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        if max_memory_models is None:
+            max_memory_models = macros.MODEL_CACHE_NUM_MEMORY_MODELS
+        self.max_memory_models = max_memory_models
+        self._memory_models = OrderedDict()
+
+        self.num_hits = 0
+        self.num_misses = 0
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, "{}.mjb".format(key))
+
+    def get(self, key):
+        """
+        Loads the compiled model for @key if it exists in the cache
+
+        Args:
+            key (str): model key (see get_model_xml_hash)
+
+        Returns:
+            mujoco.MjModel or None: cached model, or None if not found
+        """
+        path = self._get_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            model = mujoco.MjModel.from_binary_path(path)
+        except (OSError, ValueError):
+            # missing, evicted by another process, or corrupted
+            return None
+        # mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return model
+
+    def put(self, key, model):
+        """
+        Saves a compiled model to the cache and evicts old entries if the cache is over its size limit
+
+        Args:
+            key (str): model key (see get_model_xml_hash)
+
+            model (mujoco.MjModel): compiled model
+        """
+        buffer = np.zeros(mujoco.mj_sizeModel(model), dtype=np.uint8)
+        mujoco.mj_saveModel(model, None, buffer)
+        atomic_write(self._get_path(key), buffer.tobytes())
+        self.evict()
+
+    def evict(self):
+        """
+        Removes least-recently-used models until the cache fits within its size limit
+        """
+        entries = []
+        for fname in os.listdir(self.cache_dir):
+            if not fname.endswith(".mjb"):
+                continue
+            path = os.path.join(self.cache_dir, fname)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum([size for (_, size, _) in entries])
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # already removed by another process
+                pass
+            total_size -= size
+
+    def _remember(self, key, model):
+        """
+        Keeps @model in memory, dropping the least recently used models beyond max_memory_models.
+        A copy is returned, since the caller may modify the model (e.g. site colors)
+        """
+        if self.max_memory_models <= 0:
+            return model
+        self._memory_models[key] = model
+        self._memory_models.move_to_end(key)
+        while len(self._memory_models) > self.max_memory_models:
+            self._memory_models.popitem(last=False)
+        return copy.copy(model)
+
+    def load_or_compile(self, xml_str):
+        """
+        Returns the compiled model for @xml_str, compiling and caching it on a cache miss
+
+        Args:
+            xml_str (str): model xml
+
+        Returns:
+            mujoco.MjModel: compiled model
+        """
+        key = get_model_xml_hash(xml_str)
+        model = self._memory_models.get(key, None)
+        if model is None:
+            model = self.get(key)
+        if model is not None:
+            self.num_hits += 1
+            return self._remember(key, model)
+
+        self.num_misses += 1
+        model = mujoco.MjModel.from_xml_string(xml_str)
+        self.put(key, model)
+        return self._remember(key, model)
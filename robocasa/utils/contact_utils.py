@@ -0,0 +1,155 @@
+"""
+Cached contact queries. Success checks query contacts between the same models many times per step, while
+robosuite's check_contact scans all contacts and resolves geom names on every call. A ContactTable resolves the
+geoms of each model once, and evaluates the current contacts at most once per set of contacts.
+"""
+
+import numpy as np
+from robosuite.models.base import MujocoModel
+
+
+class ContactTable:
+    """
+    Lookup table of the contacts between models, with the same semantics as robosuite's sim_utils.check_contact.
+
+    The contact geoms of the given models are mapped to model ids up front. The first query after the contacts
+    of the sim have changed rebuilds the set of model pairs in contact in one vectorized pass over the contacts,
+    after which contact checks between these models are set lookups. Other geom groups (geom names, lists of geom
+    names and models that share geoms with an earlier model) are resolved to a geom mask once, and their results
+    are memoized until the contacts change.
+
+    Args:
+        sim (MjSim): simulation to check the contacts of
+
+        models (list of MujocoModel): models to map the contact geoms of
+    """
+
+    def __init__(self, sim, models=()):
+        self.sim = sim
+
+        ngeom = sim.model.ngeom
+        self._geom_name2id = dict()
+        for geom_id in range(ngeom):
+            name = sim.model.geom_id2name(geom_id)
+            if name is not None:
+                self._geom_name2id[name] = geom_id
+
+        # geom id -> id of the model it belongs to (-1 if not mapped)
+        self._geom_model_ids = np.full(ngeom, -1, dtype=int)
+        self._model_ids = dict()
+        for model in models:
+            geom_ids = self._get_geom_ids(model.contact_geoms)
+            if model.name in self._model_ids or np.any(
+                self._geom_model_ids[geom_ids] != -1
+            ):
+                continue
+            self._geom_model_ids[geom_ids] = len(self._model_ids)
+            self._model_ids[model.name] = len(self._model_ids)
+
+        # geom masks of unmapped geom groups
+        self._masks = dict()
+
+        # state of the table, rebuilt whenever the contacts change
+        self._contact_geoms = None
+        self._model_pairs = set()
+        self._models_in_contact = set()
+        self._flags = dict()
+
+    def _get_geom_ids(self, geom_names):
+        return np.array(
+            [
+                self._geom_name2id[name]
+                for name in geom_names
+                if name in self._geom_name2id
+            ],
+            dtype=int,
+        )
+
+    def _update(self):
+        """
+        Rebuilds the table if the contacts of the sim have changed since the last query
+        """
+        contact_geoms = self.sim.data.contact.geom
+        if self._contact_geoms is not None and np.array_equal(
+            contact_geoms, self._contact_geoms
+        ):
+            return
+        # copied, since the contact buffer of the sim is updated in place
+        self._contact_geoms = np.array(contact_geoms)
+        self._flags = dict()
+
+        model_ids = self._geom_model_ids[contact_geoms]
+        self._models_in_contact = set(model_ids[model_ids != -1].tolist())
+        model_ids = model_ids[np.all(model_ids != -1, axis=1)]
+        num_models = len(self._model_ids)
+        self._model_pairs = set(
+            (model_ids[:, 0] * num_models + model_ids[:, 1]).tolist()
+            + (model_ids[:, 1] * num_models + model_ids[:, 0]).tolist()
+        )
+
+    def _get_model_id(self, geoms):
+        if isinstance(geoms, MujocoModel):
+            return self._model_ids.get(geoms.name, None)
+        return None
+
+    def _get_mask(self, geoms):
+        """
+        Returns the key and (cached) geom mask of a geom group
+        """
+        if type(geoms) is str:
+            key = (geoms,)
+        elif isinstance(geoms, MujocoModel):
+            key = ("model", geoms.name)
+        else:
+            key = tuple(geoms)
+        if key not in self._masks:
+            if isinstance(geoms, MujocoModel):
+                geom_names = geoms.contact_geoms
+            elif type(geoms) is str:
+                geom_names = [geoms]
+            else:
+                geom_names = geoms
+            mask = np.zeros(len(self._geom_model_ids), dtype=bool)
+            mask[self._get_geom_ids(geom_names)] = True
+            self._masks[key] = mask
+        return key, self._masks[key]
+
+    def check_contact(self, geoms_1, geoms_2=None):
+        """
+        Finds contact between two geom groups.
+
+        Args:
+            geoms_1 (str or list of str or MujocoModel): an individual geom name or list of geom names or a model.
+                If a MujocoModel is specified, the geoms checked will be its contact_geoms
+
+            geoms_2 (str or list of str or MujocoModel or None): another individual geom name or list of geom names.
+                If a MujocoModel is specified, the geoms checked will be its contact_geoms. If None, will check
+                any collision with @geoms_1 to any other geom in the environment
+
+        Returns:
+            bool: True if any geom in @geoms_1 is in contact with any geom in @geoms_2.
+        """
+        self._update()
+
+        model_id_1 = self._get_model_id(geoms_1)
+        if model_id_1 is not None:
+            if geoms_2 is None:
+                return model_id_1 in self._models_in_contact
+            model_id_2 = self._get_model_id(geoms_2)
+            if model_id_2 is not None:
+                return (
+                    model_id_1 * len(self._model_ids) + model_id_2 in self._model_pairs
+                )
+
+        key_1, mask_1 = self._get_mask(geoms_1)
+        key_2, mask_2 = (None, None) if geoms_2 is None else self._get_mask(geoms_2)
+        if (key_1, key_2) not in self._flags:
+            geom1, geom2 = self._contact_geoms[:, 0], self._contact_geoms[:, 1]
+            if mask_2 is None:
+                in_contact = np.any(mask_1[geom1] | mask_1[geom2])
+            else:
+                in_contact = np.any(
+                    (mask_1[geom1] & mask_2[geom2]) | (mask_1[geom2] & mask_2[geom1])
+                )
+            self._flags[(key_1, key_2)] = bool(in_contact)
+        return self._flags[(key_1, key_2)]
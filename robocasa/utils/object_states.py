@@ -0,0 +1,155 @@
+"""
+Batched object-state predicates for task success checks. Success checks evaluate predicates such as obj_inside_of
+and gripper_obj_far for several objects per step, each gathering object poses from the sim and transforming
+bounding box points one by one. ObjectStates gathers the poses of all objects at once and evaluates predicates for
+all objects with NumPy, caching results until the poses change.
+"""
+
+import numpy as np
+
+from robocasa.utils.object_utils import points_in_box, quat2mat_batch
+
+
+class ObjectStates:
+    """
+    Per-object state of the objects of a kitchen environment: positions, orientations, bounding box points,
+    containment in fixtures, distance to the gripper and uprightness, each as an array over all objects.
+
+    The poses of all objects and the gripper are gathered from the sim in one go on every query. Quantities
+    derived from them are computed for all objects at once and cached until the gathered poses change.
+
+    Args:
+        env (Kitchen): environment to track the objects of
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.obj_names = list(env.objects.keys())
+        self._obj_ids = {name: i for (i, name) in enumerate(self.obj_names)}
+        self._body_ids = np.array(
+            [env.obj_body_id[name] for name in self.obj_names], dtype=int
+        )
+        self._eef_site_id = env.robots[0].eef_site_id["right"]
+
+        # bounding box points of each object relative to its body frame
+        self._bbox_offsets = np.array(
+            [env.objects[name].get_bbox_points() for name in self.obj_names]
+        ).reshape(-1, 8, 3)
+
+        self._poses = None
+        self._cache = dict()
+
+    def __contains__(self, obj_name):
+        return obj_name in self._obj_ids
+
+    def index(self, obj_name):
+        """
+        Returns the index of an object in the arrays of this class
+        """
+        return self._obj_ids[obj_name]
+
+    def _update(self):
+        """
+        Gathers the current poses of the objects and the gripper, and clears the cache if they changed
+        """
+        data = self.env.sim.data
+        poses = (
+            data.body_xpos[self._body_ids],
+            data.body_xquat[self._body_ids],
+            data.site_xpos[self._eef_site_id],
+        )
+        if self._poses is not None and all(
+            np.array_equal(a, b) for (a, b) in zip(poses, self._poses)
+        ):
+            return
+        self._poses = tuple(np.array(a) for a in poses)
+        for a in self._poses:
+            a.flags.writeable = False
+        self._cache = dict()
+
+    def _get(self, key, fn):
+        self._update()
+        if key not in self._cache:
+            self._cache[key] = fn()
+        return self._cache[key]
+
+    @property
+    def positions(self):
+        """
+        np.array: (N, 3) positions of the objects
+        """
+        self._update()
+        return self._poses[0]
+
+    @property
+    def rot_mats(self):
+        """
+        np.array: (N, 3, 3) rotation matrices of the objects
+        """
+        return self._get("rot_mats", lambda: quat2mat_batch(self._poses[1]))
+
+    @property
+    def bbox_points(self):
+        """
+        np.array: (N, 8, 3) bounding box points of the objects (see MJCFObject.get_bbox_points)
+        """
+        return self._get(
+            "bbox_points",
+            lambda: np.einsum("nij,nkj->nki", self.rot_mats, self._bbox_offsets)
+            + self.positions[:, None],
+        )
+
+    @property
+    def gripper_dists(self):
+        """
+        np.array: (N,) distances between the right gripper site and the objects
+        """
+        return self._get(
+            "gripper_dists",
+            lambda: np.linalg.norm(self._poses[2] - self.positions, axis=-1),
+        )
+
+    def cos(self, ref=(0, 0, 1)):
+        """
+        Cosine of the angle between the z-axis of each object and a reference direction (see obj_cos)
+
+        Args:
+            ref (tuple): reference direction
+
+        Returns:
+            np.array: (N,) cosines
+        """
+
+        def compute():
+            z_axes = self.rot_mats[:, :, 2]
+            ref_dir = np.array(ref, dtype=float)
+            norms = np.linalg.norm(z_axes, axis=-1) * np.linalg.norm(ref_dir)
+            return np.matmul(z_axes, ref_dir) / np.maximum(norms, 1e-10)
+
+        return self._get(("cos", tuple(ref)), compute)
+
+    def inside_of(self, fixture, partial_check=False):
+        """
+        Whether each object is inside of the interior bounding box of a fixture (see obj_inside_of)
+
+        Args:
+            fixture (Fixture): fixture to check against
+
+            partial_check (bool): if True, only checks the object centers. Otherwise checks all bounding box
+                points, with a tolerance of 5cm
+
+        Returns:
+            np.array: (N,) boolean array
+        """
+
+        def compute():
+            p0, px, py, pz = fixture.get_int_sites(relative=False)
+            if partial_check:
+                points = self.positions[:, None]
+                th = 0.0
+            else:
+                points = self.bbox_points
+                th = 0.05
+            return points_in_box(points, p0, px, py, pz, th=th)
+
+        return self._get(("inside_of", fixture.name, partial_check), compute)
@@ -20,6 +20,14 @@ def obj_inside_of(env, obj_name, fixture_id, partial_check=False):
     assert isinstance(obj, MJCFObject)
     assert isinstance(fixture, Fixture)
 
+    states = getattr(env, "object_states", None)
+    if states is not None and obj_name in states:
+        return bool(
+            states.inside_of(fixture, partial_check=partial_check)[
+                states.index(obj_name)
+            ]
+        )
+
     # step 1: calculate fxiture points
     fixtr_p0, fixtr_px, fixtr_py, fixtr_pz = fixture.get_int_sites(relative=False)
     u = fixtr_px - fixtr_p0
@@ -229,6 +237,140 @@ def obj_in_region(
     return True
 
 
+def obj_has_bbox(obj):
+    """
+    check if placement checks for the object use its bounding box (rather than its horizontal radius)
+    """
+    from robocasa.models.fixtures import Fixture
+
+    return isinstance(obj, MJCFObject) or isinstance(obj, Fixture)
+
+
+def points_in_region(points, p0, px, py, tol=0.0):
+    """
+    batched version of obj_in_region for bounding box points, without a z check
+
+    Args:
+        points (np.array): (..., N, 3) array of points of each box
+
+        p0, px, py (np.array): points defining the region
+
+        tol (float): points within this distance (along the region axes, scaled by the region size) of the
+            region are also accepted
+
+    Returns:
+        np.array: (...) boolean array, True if all points of a box are in the region
+    """
+    u = px - p0
+    v = py - p0
+    proj_u = np.matmul(points, u)
+    proj_v = np.matmul(points, v)
+    check1 = (np.dot(u, p0) - tol <= proj_u) & (proj_u <= np.dot(u, px) + tol)
+    check2 = (np.dot(v, p0) - tol <= proj_v) & (proj_v <= np.dot(v, py) + tol)
+    return np.all(check1 & check2, axis=-1)
+
+
+def bboxes_intersect(points, other_points, tol=0.0):
+    """
+    batched version of objs_intersect for bounding box points, using the same separating axis test
+
+    Args:
+        points (np.array): (M, 8, 3) array of bounding box points
+
+        other_points (np.array): (K, 8, 3) array of bounding box points
+
+        tol (float): boxes whose projections overlap by less than this along any axis are not considered
+            intersecting
+
+    Returns:
+        np.array: (M, K) boolean array, True if box m intersects other box k
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normals = points[:, 1:4] - points[:, :1]
+        normals = normals / np.linalg.norm(normals, axis=-1, keepdims=True)
+        other_normals = other_points[:, 1:4] - other_points[:, :1]
+        other_normals = other_normals / np.linalg.norm(
+            other_normals, axis=-1, keepdims=True
+        )
+
+    # projections onto the face normals of the boxes in @points: (M, K, 3, 8) and (M, 1, 3, 8)
+    M, K = len(points), len(other_points)
+    projs = np.matmul(normals, np.swapaxes(points, 1, 2))[:, None]
+    other_projs = np.matmul(normals, other_points.reshape(-1, 3).T)
+    other_projs = np.swapaxes(other_projs.reshape(M, 3, K, 8), 1, 2)
+    gap = (other_projs.min(axis=-1) > projs.max(axis=-1) - tol) | (
+        projs.min(axis=-1) > other_projs.max(axis=-1) - tol
+    )
+    intersect = ~np.any(gap, axis=-1)
+
+    # projections onto the face normals of the boxes in @other_points: (M, K, 3, 8) and (1, K, 3, 8)
+    other_normals = other_normals.reshape(-1, 3)
+    projs = np.matmul(points, other_normals.T).reshape(M, 8, K, 3)
+    projs = projs.transpose(0, 2, 3, 1)
+    other_projs = np.matmul(
+        other_normals.reshape(K, 3, 3), np.swapaxes(other_points, 1, 2)
+    )[None]
+    gap = (other_projs.min(axis=-1) > projs.max(axis=-1) - tol) | (
+        projs.min(axis=-1) > other_projs.max(axis=-1) - tol
+    )
+    return intersect & ~np.any(gap, axis=-1)
+
+
+def points_in_box(points, p0, px, py, pz, th=0.0):
+    """
+    batched version of the containment check of obj_inside_of
+
+    Args:
+        points (np.array): (..., N, 3) array of points of each object
+
+        p0, px, py, pz (np.array): points defining the box
+
+        th (float): tolerance of the projections of the points onto the box axes
+
+    Returns:
+        np.array: (...) boolean array, True if all points of an object are in the box
+    """
+    inside = True
+    for p in [px, py, pz]:
+        axis = p - p0
+        proj = np.matmul(points, axis)
+        inside = (
+            inside & (np.dot(axis, p0) - th <= proj) & (proj <= np.dot(axis, p) + th)
+        )
+    return np.all(inside, axis=-1)
+
+
+def quat2mat_batch(quats):
+    """
+    Converts quaternions in (w,x,y,z) form to rotation matrices
+
+    Args:
+        quats (np.array): (N, 4) array of quaternions
+
+    Returns:
+        np.array: (N, 3, 3) array of rotation matrices
+    """
+    quats = quats / np.linalg.norm(quats, axis=-1, keepdims=True)
+    w, x, y, z = quats.T
+    return np.stack(
+        [
+            np.stack(
+                [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+                axis=-1,
+            ),
+            np.stack(
+                [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+                axis=-1,
+            ),
+            np.stack(
+                [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+                axis=-1,
+            ),
+        ],
+        axis=1,
+    )
+
+
 def fixture_pairwise_dist(f1, f2):
     """
     Gets the distance between two fixtures by finding the minimum distance between their exterior bounding box points
@@ -240,6 +382,23 @@ def fixture_pairwise_dist(f1, f2):
     return np.min(all_dists)
 
 
+def get_fixtures_bbox_points(fixtures):
+    """
+    Gets the exterior bounding box points of several fixtures at once, in the order of get_ext_sites
+
+    Args:
+        fixtures (list of Fixture): fixtures with exterior bounding box sites
+
+    Returns:
+        np.array: (N, 8, 3) array of bounding box points in the world frame
+    """
+    if len(fixtures) == 0:
+        return np.zeros((0, 8, 3))
+    return np.array(
+        [fxtr.get_ext_sites(all_points=True, relative=False) for fxtr in fixtures]
+    )
+
+
 def objs_intersect(
     obj,
     obj_pos,
@@ -350,6 +509,10 @@ def gripper_obj_far(env, obj_name="obj", th=0.25):
     """
     check if gripper is far from object based on distance defined by threshold
     """
+    states = getattr(env, "object_states", None)
+    if states is not None and obj_name in states:
+        return bool(states.gripper_dists[states.index(obj_name)] > th)
+
     obj_pos = env.sim.data.body_xpos[env.obj_body_id[obj_name]]
     gripper_site_pos = env.sim.data.site_xpos[env.robots[0].eef_site_id["right"]]
     gripper_obj_far = np.linalg.norm(gripper_site_pos - obj_pos) > th
@@ -360,6 +523,10 @@ def obj_cos(env, obj_name="obj", ref=(0, 0, 1)):
     def cos(u, v):
         return np.dot(u, v) / max(np.linalg.norm(u) * np.linalg.norm(v), 1e-10)
 
+    states = getattr(env, "object_states", None)
+    if states is not None and obj_name in states:
+        return states.cos(ref)[states.index(obj_name)]
+
     obj_id = env.obj_body_id[obj_name]
     obj_quat = T.convert_quat(np.array(env.sim.data.body_xquat[obj_id]), to="xyzw")
     obj_mat = T.quat2mat(obj_quat)
@@ -12,8 +12,20 @@ from robosuite.utils.transform_utils import (
     quat_multiply,
     rotate_2d_point,
 )
+from scipy.signal import fftconvolve
+
+import robocasa.macros as macros
+from robocasa.utils.object_utils import (
+    bboxes_intersect,
+    obj_has_bbox,
+    obj_in_region,
+    objs_intersect,
+    points_in_region,
+    quat2mat_batch,
+)
 
-from robocasa.utils.object_utils import obj_in_region, objs_intersect
+# tolerance of the batched placement checks. Candidates that pass them are re-checked exactly
+_BATCH_CHECK_TOL = 1e-5
 
 
 class ObjectPositionSampler:
@@ -172,6 +184,10 @@ class UniformRandomSampler(ObjectPositionSampler):
 
         z_offset (float): Add a small z-offset to placements. This is useful for fixed objects
             that do not move (i.e. no free joint) to place them above the table.
+
+        batch_size (int): number of candidate placements that are drawn and checked at once. Batched sampling
+            returns the same placements and leaves the rng in the same state as sampling one candidate at a time.
+            If None, defaults to macros.PLACEMENT_BATCH_SIZE. Values <= 1 disable batching
     """
 
     def __init__(
@@ -189,11 +205,15 @@ class UniformRandomSampler(ObjectPositionSampler):
         z_offset=0.0,
         rng=None,
         side="all",
+        batch_size=None,
     ):
         self.x_range = x_range
         self.y_range = y_range
         self.rotation = rotation
         self.rotation_axis = rotation_axis
+        self.batch_size = (
+            macros.PLACEMENT_BATCH_SIZE if batch_size is None else batch_size
+        )
 
         if side not in self.valid_sides:
             raise ValueError(
@@ -252,6 +272,21 @@ class UniformRandomSampler(ObjectPositionSampler):
         else:
             rot_angle = self.rotation
 
+        return self._angle_to_quat(rot_angle)
+
+    def _angle_to_quat(self, rot_angle):
+        """
+        Converts a rotation angle about the rotation axis to a quaternion
+
+        Args:
+            rot_angle (float): rotation angle
+
+        Returns:
+            np.array: object quaternion in (w,x,y,z) form
+
+        Raises:
+            ValueError: [Invalid rotation axis]
+        """
         # Return angle based on axis requested
         if self.rotation_axis == "x":
             return np.array([np.cos(rot_angle / 2), np.sin(rot_angle / 2), 0, 0])
@@ -322,95 +357,493 @@ class UniformRandomSampler(ObjectPositionSampler):
                 obj.name not in placed_objects
             ), "Object '{}' has already been sampled!".format(obj.name)
 
-            success = False
-
             # get reference rotation
             ref_quat = convert_quat(
                 mat2quat(euler2mat([0, 0, self.reference_rot])), to="wxyz"
             )
 
             ### get boundary points ###
-            region_points = np.array(
+            region_points = self._get_region_points(base_offset)
+
+            placement = self._sample_placement(
+                obj, placed_objects, base_offset, ref_quat, region_points, on_top
+            )
+            if placement is None:
+                raise RandomizationError("Cannot place all objects ):")
+            placed_objects[obj.name] = placement + (obj,)
+
+        return placed_objects
+
+    def _get_region_points(self, base_offset):
+        """
+        Returns the points p0, px, py defining the sampling region (see obj_in_region)
+        """
+        region_points = np.array(
+            [
+                [self.x_range[0], self.y_range[0], 0],
+                [self.x_range[1], self.y_range[0], 0],
+                [self.x_range[0], self.y_range[1], 0],
+            ]
+        )
+        for i in range(len(region_points)):
+            region_points[i][0:2] = rotate_2d_point(
+                region_points[i][0:2], rot=self.reference_rot
+            )
+        region_points += base_offset
+        return region_points
+
+    def _sample_placement(
+        self, obj, placed_objects, base_offset, ref_quat, region_points, on_top
+    ):
+        """
+        Samples a valid placement for a single object
+
+        Returns:
+            None or 2-tuple: position and quaternion (w,x,y,z) of the placement, or None if no valid placement
+                was found
+        """
+        if self._can_sample_batched(obj, placed_objects):
+            return self._sample_batched(
+                obj, placed_objects, base_offset, ref_quat, region_points, on_top
+            )
+
+        for i in range(5000):  # 5000 retries
+            # sample object coordinates
+            pos = self._get_placement_pos(
+                obj, self._sample_x(), self._sample_y(), base_offset, on_top
+            )
+            quat = self._get_placement_quat(obj, self._sample_quat(), ref_quat)
+            if self._is_valid_placement(obj, pos, quat, region_points, placed_objects):
+                # location is valid, put the object down
+                return pos, quat
+
+        return None
+
+    def _get_placement_pos(self, obj, relative_x, relative_y, base_offset, on_top):
+        """
+        Computes the position of an object from sampled relative coordinates (scalars or arrays)
+
+        Returns:
+            3-tuple: object position
+        """
+        # apply rotation
+        object_x, object_y = rotate_2d_point(
+            [relative_x, relative_y], rot=self.reference_rot
+        )
+
+        object_x = object_x + base_offset[0]
+        object_y = object_y + base_offset[1]
+        object_z = self.z_offset + base_offset[2]
+        if on_top:
+            object_z -= obj.bottom_offset[-1]
+        return (object_x, object_y, object_z)
+
+    def _get_placement_quat(self, obj, quat, ref_quat):
+        """
+        Computes the orientation of an object from a sampled rotation
+
+        Returns:
+            np.array: object quaternion in (w,x,y,z) form
+        """
+        # multiply this quat by the object's initial rotation if it has the attribute specified
+        if hasattr(obj, "init_quat"):
+            quat = quat_multiply(obj.init_quat, quat)
+        quat = convert_quat(
+            quat_multiply(
+                convert_quat(ref_quat, to="xyzw"),
+                convert_quat(quat, to="xyzw"),
+            ),
+            to="wxyz",
+        )
+        return quat
+
+    def _is_valid_placement(self, obj, pos, quat, region_points, placed_objects):
+        """
+        Checks if an object placement is in the sampling region and does not overlap with placed objects
+
+        Returns:
+            bool: True if the placement is valid
+        """
+        # ensure object placed fully in region
+        if self.ensure_object_boundary_in_range and not obj_in_region(
+            obj,
+            obj_pos=list(pos),
+            obj_quat=convert_quat(quat, to="xyzw"),
+            p0=region_points[0],
+            px=region_points[1],
+            py=region_points[2],
+        ):
+            return False
+
+        # objects cannot overlap
+        if self.ensure_valid_placement:
+            for (x, y, z), other_quat, other_obj in placed_objects.values():
+                if objs_intersect(
+                    obj=obj,
+                    obj_pos=list(pos),
+                    obj_quat=convert_quat(quat, to="xyzw"),
+                    other_obj=other_obj,
+                    other_obj_pos=[x, y, z],
+                    other_obj_quat=convert_quat(other_quat, to="xyzw"),
+                ):
+                    return False
+
+        return True
+
+    def _can_sample_batched(self, obj, placed_objects):
+        """
+        Batched sampling reproduces the rng draws of sequential sampling, which requires a
+        np.random.Generator and a fixed number of uniform draws per candidate. Placement checks
+        are batched for objects with bounding boxes.
+        """
+        if self.batch_size <= 1 or not isinstance(self.rng, np.random.Generator):
+            return False
+        if self.x_range[1] < self.x_range[0] or self.y_range[1] < self.y_range[0]:
+            return False
+        if isinstance(self.rotation, collections.abc.Iterable) and isinstance(
+            self.rotation[0], collections.abc.Iterable
+        ):
+            return False
+        if self.rotation_axis not in ["x", "y", "z"]:
+            return False
+        if not (self.ensure_object_boundary_in_range or self.ensure_valid_placement):
+            return False
+        return obj_has_bbox(obj) and all(
+            obj_has_bbox(other_obj) for (_, _, other_obj) in placed_objects.values()
+        )
+
+    def _sample_batched(
+        self, obj, placed_objects, base_offset, ref_quat, region_points, on_top
+    ):
+        """
+        Samples a placement by drawing batches of candidates and checking them with array operations. The first
+        candidate that passes the batched checks and the exact checks of sequential sampling is used, and the rng
+        is rewound to the state sequential sampling would have left it in.
+
+        Returns:
+            None or 2-tuple: position and quaternion (w,x,y,z) of the placement, or None if no valid placement
+                was found in 5000 candidates
+        """
+        if self.rotation is None:
+            rot_range = (0, 2 * np.pi)
+        elif isinstance(self.rotation, collections.abc.Iterable):
+            rot_range = (min(self.rotation), max(self.rotation))
+        else:
+            rot_range = None
+        # uniform draws per candidate: x, y and (optionally) the rotation angle
+        num_draws = 2 if rot_range is None else 3
+
+        # the candidate rotation is linear in the sampled quaternion (up to float32 rounding)
+        rot_basis = np.array(
+            [self._get_placement_quat(obj, e, ref_quat) for e in np.eye(4)]
+        )
+        axis_ind = ["x", "y", "z"].index(self.rotation_axis) + 1
+        local_points = np.array(
+            obj.get_bbox_points(trans=np.zeros(3), rot=np.array([0, 0, 0, 1]))
+        )
+        if self.ensure_valid_placement and len(placed_objects) > 0:
+            other_points = np.array(
                 [
-                    [self.x_range[0], self.y_range[0], 0],
-                    [self.x_range[1], self.y_range[0], 0],
-                    [self.x_range[0], self.y_range[1], 0],
+                    other_obj.get_bbox_points(
+                        trans=np.array(other_pos),
+                        rot=convert_quat(np.array(other_quat), to="xyzw"),
+                    )
+                    for (other_pos, other_quat, other_obj) in placed_objects.values()
                 ]
             )
-            for i in range(len(region_points)):
-                region_points[i][0:2] = rotate_2d_point(
-                    region_points[i][0:2], rot=self.reference_rot
-                )
-            region_points += base_offset
+        else:
+            other_points = None
+
+        # start with small batches, since most objects are placed within a few candidates
+        batch_size = min(16, self.batch_size)
+        num_tried = 0
+        while num_tried < 5000:
+            batch_size = min(batch_size, 5000 - num_tried)
+            rng_state = self.rng.bit_generator.state
+            draws = self.rng.random((batch_size, num_draws))
+
+            # same arithmetic as rng.uniform(low, high)
+            relative_x = (
+                self.x_range[0] + (self.x_range[1] - self.x_range[0]) * draws[:, 0]
+            )
+            relative_y = (
+                self.y_range[0] + (self.y_range[1] - self.y_range[0]) * draws[:, 1]
+            )
+            if rot_range is None:
+                rot_angles = np.full(batch_size, self.rotation)
+            else:
+                rot_angles = rot_range[0] + (rot_range[1] - rot_range[0]) * draws[:, 2]
 
-            for i in range(5000):  # 5000 retries
-                # sample object coordinates
-                relative_x = self._sample_x()
-                relative_y = self._sample_y()
+            pos = self._get_placement_pos(
+                obj, relative_x, relative_y, base_offset, on_top
+            )
+            pos = np.stack(np.broadcast_arrays(*pos), axis=-1)
+            quats = np.zeros((batch_size, 4))
+            quats[:, 0] = np.cos(rot_angles / 2)
+            quats[:, axis_ind] = np.sin(rot_angles / 2)
+            mats = quat2mat_batch(np.matmul(quats, rot_basis))
+            points = np.matmul(local_points, np.swapaxes(mats, 1, 2)) + pos[:, None]
+
+            # candidates that fail the checks with a tolerance are invalid, and candidates that pass them with a
+            # negative tolerance are valid. Only the remaining candidates need to be checked exactly
+            valid = self._check_batch(
+                points, region_points, other_points, _BATCH_CHECK_TOL
+            )
+            valid_inds = np.flatnonzero(valid)
+            surely_valid = self._check_batch(
+                points[valid_inds], region_points, other_points, -_BATCH_CHECK_TOL
+            )
 
-                # apply rotation
-                object_x, object_y = rotate_2d_point(
-                    [relative_x, relative_y], rot=self.reference_rot
+            for i, is_valid in zip(valid_inds, surely_valid):
+                pos = self._get_placement_pos(
+                    obj, relative_x[i], relative_y[i], base_offset, on_top
                 )
+                rot_angle = self.rotation if rot_range is None else rot_angles[i]
+                quat = self._get_placement_quat(
+                    obj, self._angle_to_quat(rot_angle), ref_quat
+                )
+                if is_valid or self._is_valid_placement(
+                    obj, pos, quat, region_points, placed_objects
+                ):
+                    # rewind the rng to right after this candidate
+                    self.rng.bit_generator.state = rng_state
+                    self.rng.random((i + 1) * num_draws)
+                    return pos, quat
+
+            num_tried += batch_size
+            batch_size = min(2 * batch_size, self.batch_size)
+
+        return None
+
+    def _check_batch(self, points, region_points, other_points, tol):
+        """
+        Batched placement checks of _is_valid_placement
+
+        Args:
+            points (np.array): (N, 8, 3) bounding box points of the candidates
+
+            region_points (np.array): points defining the sampling region
 
-                object_x = object_x + base_offset[0]
-                object_y = object_y + base_offset[1]
-                object_z = self.z_offset + base_offset[2]
-                if on_top:
-                    object_z -= obj.bottom_offset[-1]
-
-                # random rotation
-                quat = self._sample_quat()
-                # multiply this quat by the object's initial rotation if it has the attribute specified
-                if hasattr(obj, "init_quat"):
-                    quat = quat_multiply(obj.init_quat, quat)
-                quat = convert_quat(
-                    quat_multiply(
-                        convert_quat(ref_quat, to="xyzw"),
-                        convert_quat(quat, to="xyzw"),
-                    ),
-                    to="wxyz",
+            other_points (None or np.array): (K, 8, 3) bounding box points of the placed objects
+
+            tol (float): tolerance of the checks, see points_in_region and bboxes_intersect
+
+        Returns:
+            np.array: (N,) boolean array, True for valid candidates
+        """
+        valid = np.ones(len(points), dtype=bool)
+        if self.ensure_object_boundary_in_range:
+            valid &= points_in_region(points, *region_points, tol=tol)
+        if other_points is not None:
+            valid &= ~np.any(bboxes_intersect(points, other_points, tol=tol), axis=1)
+        return valid
+
+
+class OccupancyGridSampler(UniformRandomSampler):
+    """
+    Places objects in free space of the sampling region. The footprints of already placed objects (and fixtures)
+    that overlap the new object in z are rasterized into an occupancy grid over the region, and object positions
+    are only sampled from grid cells where the footprint of the new object fits. This keeps sampling fast in
+    crowded regions, and fails immediately when no such cell exists instead of retrying thousands of times.
+
+    Takes the same arguments as UniformRandomSampler, and additionally:
+
+    Args:
+        resolution (float): size of the grid cells (in meters)
+
+        num_rotation_tries (int): number of object rotations to sample before failing, if no valid
+            position exists for a sampled rotation
+    """
+
+    def __init__(self, *args, resolution=0.005, num_rotation_tries=10, **kwargs):
+        self.resolution = resolution
+        self.num_rotation_tries = num_rotation_tries
+        super().__init__(*args, **kwargs)
+
+    def _get_grid(self):
+        """
+        Returns the cell centers (in the frame of the sampling region) and cell half sizes of the occupancy grid
+        """
+        size = np.array(
+            [self.x_range[1] - self.x_range[0], self.y_range[1] - self.y_range[0]]
+        )
+        num_cells = np.maximum(np.ceil(size / self.resolution).astype(int), 1)
+        cell_size = size / num_cells
+        xs = self.x_range[0] + (np.arange(num_cells[0]) + 0.5) * cell_size[0]
+        ys = self.y_range[0] + (np.arange(num_cells[1]) + 0.5) * cell_size[1]
+        centers = np.stack(np.meshgrid(xs, ys, indexing="ij"), axis=-1)
+        return centers, cell_size / 2
+
+    def _to_region_frame(self, points, base_offset):
+        # world frame (x, y) -> sampling region frame
+        return rotate_2d_point(
+            (points[:, :2] - base_offset[:2]).T, rot=-self.reference_rot
+        ).T
+
+    @staticmethod
+    def _get_footprint_points(obj, pos, quat):
+        """
+        Returns the bounding box points of an object in the world frame, or the points of a box around its
+        horizontal radius for objects without bounding boxes
+        """
+        if obj_has_bbox(obj):
+            return np.array(
+                obj.get_bbox_points(
+                    trans=np.array(pos), rot=convert_quat(np.array(quat), to="xyzw")
                 )
+            )
+        r = obj.horizontal_radius
+        return np.array(
+            [
+                [pos[0] + dx, pos[1] + dy, pos[2] + dz]
+                for dx in [-r, r]
+                for dy in [-r, r]
+                for dz in [obj.bottom_offset[-1], obj.top_offset[-1]]
+            ]
+        )
 
-                location_valid = True
+    def _sample_placement(
+        self, obj, placed_objects, base_offset, ref_quat, region_points, on_top
+    ):
+        base_offset = np.array(base_offset)
+        centers, half_size = self._get_grid()
 
-                # ensure object placed fully in region
-                if self.ensure_object_boundary_in_range and not obj_in_region(
-                    obj,
-                    obj_pos=[object_x, object_y, object_z],
-                    obj_quat=convert_quat(quat, to="xyzw"),
-                    p0=region_points[0],
-                    px=region_points[1],
-                    py=region_points[2],
-                ):
-                    location_valid = False
-                    continue
-
-                # objects cannot overlap
-                if self.ensure_valid_placement:
-                    for (x, y, z), other_quat, other_obj in placed_objects.values():
-                        if objs_intersect(
-                            obj=obj,
-                            obj_pos=[object_x, object_y, object_z],
-                            obj_quat=convert_quat(quat, to="xyzw"),
-                            other_obj=other_obj,
-                            other_obj_pos=[x, y, z],
-                            other_obj_quat=convert_quat(other_quat, to="xyzw"),
-                        ):
-                            location_valid = False
-                            break
-
-                if location_valid:
-                    # location is valid, put the object down
-                    pos = (object_x, object_y, object_z)
-                    placed_objects[obj.name] = (pos, quat, obj)
-                    success = True
-                    break
-
-            if not success:
-                raise RandomizationError("Cannot place all objects ):")
+        # placements of the object are rigid transforms of its placement at the region center
+        center_pos = self._get_placement_pos(obj, 0.0, 0.0, base_offset, on_top)
+
+        rotation_fixed = self.rotation is not None and not isinstance(
+            self.rotation, collections.abc.Iterable
+        )
+        num_rotation_tries = 1 if rotation_fixed else self.num_rotation_tries
+        occupied, occupied_z_range = None, None
+        for _ in range(num_rotation_tries):
+            quat = self._get_placement_quat(obj, self._sample_quat(), ref_quat)
+            obj_points = self._get_footprint_points(obj, center_pos, quat)
+            obj_footprint = self._to_region_frame(obj_points, base_offset)
+            z_range = (obj_points[:, 2].min(), obj_points[:, 2].max())
+
+            # rasterize placed objects that overlap the object in z
+            if z_range != occupied_z_range:
+                occupied_z_range = z_range
+                occupied = np.zeros(centers.shape[:2], dtype=bool)
+                for other_pos, other_quat, other_obj in placed_objects.values():
+                    if not self.ensure_valid_placement:
+                        break
+                    other_points = self._get_footprint_points(
+                        other_obj, other_pos, other_quat
+                    )
+                    if (
+                        other_points[:, 2].min() > z_range[1]
+                        or other_points[:, 2].max() < z_range[0]
+                    ):
+                        continue
+                    _rasterize_hull(
+                        occupied,
+                        centers,
+                        half_size,
+                        self._to_region_frame(other_points, base_offset),
+                    )
+
+            # cells that the object overlaps when placed at the center of a given cell, relative to that cell
+            kernel_radius = np.ceil(
+                np.abs(obj_footprint).max(axis=0) / (2 * half_size) + 0.5
+            ).astype(int)
+            kernel_centers = np.stack(
+                np.meshgrid(
+                    *[
+                        np.arange(-r, r + 1) * 2 * h
+                        for (r, h) in zip(kernel_radius, half_size)
+                    ],
+                    indexing="ij",
+                ),
+                axis=-1,
+            )
+            kernel = _boxes_overlap_hull(kernel_centers, half_size, obj_footprint)
+
+            # cells outside of the region count as occupied if the object has to stay in the region
+            padded = np.pad(
+                occupied,
+                [(r, r) for r in kernel_radius],
+                constant_values=self.ensure_object_boundary_in_range,
+            )
+            blocked = fftconvolve(
+                padded.astype(float), kernel[::-1, ::-1].astype(float), mode="valid"
+            )
+            free_cells = np.argwhere(blocked < 0.5)
+            if len(free_cells) == 0:
+                continue
+
+            # the object fits at the center of free cells. Try a random position in the cell first
+            for _ in range(min(10, len(free_cells))):
+                cell_center = centers[
+                    tuple(free_cells[self.rng.integers(len(free_cells))])
+                ]
+                jitter = self.rng.uniform(low=-half_size, high=half_size)
+                for relative_x, relative_y in [cell_center + jitter, cell_center]:
+                    pos = self._get_placement_pos(
+                        obj, relative_x, relative_y, base_offset, on_top
+                    )
+                    if self._is_valid_placement(
+                        obj, pos, quat, region_points, placed_objects
+                    ):
+                        return pos, quat
+
+        return None
 
-        return placed_objects
+
+def _rasterize_hull(occupied, centers, half_size, points):
+    """
+    Marks the cells of a grid that overlap the convex hull of a set of 2d points as occupied (in place)
+
+    Args:
+        occupied (np.array): (X, Y) boolean occupancy grid
+
+        centers (np.array): (X, Y, 2) array of cell centers
+
+        half_size (np.array): (2,) half size of the cells
+
+        points (np.array): (N, 2) array of points
+    """
+    # only check the cells within the bounds of the points
+    cell_size = 2 * half_size
+    lo = np.floor((points.min(axis=0) - (centers[0, 0] - half_size)) / cell_size)
+    hi = np.ceil((points.max(axis=0) - (centers[0, 0] - half_size)) / cell_size)
+    lo = np.maximum(lo.astype(int), 0)
+    hi = np.minimum(hi.astype(int), occupied.shape)
+    if np.any(hi <= lo):
+        return
+    window = (slice(lo[0], hi[0]), slice(lo[1], hi[1]))
+    occupied[window] |= _boxes_overlap_hull(centers[window], half_size, points)
+
+
+def _boxes_overlap_hull(centers, half_size, points):
+    """
+    Checks which axis-aligned 2d boxes overlap the convex hull of a set of 2d points, with a separating axis test.
+    The normals of all point pairs are used as candidate axes, which include the normals of the hull edges.
+
+    Args:
+        centers (np.array): (..., 2) array of box centers
+
+        half_size (np.array): (2,) half size of the boxes
+
+        points (np.array): (N, 2) array of points
+
+    Returns:
+        np.array: (...) boolean array, True for boxes that overlap the hull
+    """
+    points = np.unique(points, axis=0)
+    edges = (points[:, None] - points[None]).reshape(-1, 2)
+    lengths = np.linalg.norm(edges, axis=-1)
+    axes = np.concatenate(
+        [np.eye(2), edges[lengths > 1e-9][:, ::-1] * np.array([1, -1])], axis=0
+    )
+    proj_centers = np.matmul(centers, axes.T)
+    proj_radius = np.matmul(np.abs(axes), half_size)
+    proj_points = np.matmul(points, axes.T)
+    overlap = (proj_centers + proj_radius >= proj_points.min(axis=0)) & (
+        proj_centers - proj_radius <= proj_points.max(axis=0)
+    )
+    return np.all(overlap, axis=-1)
 
 
 class SequentialCompositeSampler(ObjectPositionSampler):
@@ -620,3 +1053,10 @@ class MultiRegionSampler(ObjectPositionSampler):
         # randomly picks a sampler and calls its sample function
         sampler = self.rng.choice(self.samplers)
         return sampler.sample(fixtures=fixtures, reference=reference, on_top=on_top)
+
+
+# placement samplers that can be selected in placement configs (see Kitchen._get_placement_initializer)
+PLACEMENT_SAMPLERS = dict(
+    uniform=UniformRandomSampler,
+    occupancy_grid=OccupancyGridSampler,
+)
@@ -3,6 +3,7 @@ This file contains the robosuite environment wrapper that is used
 to provide a standardized environment API for training policies and interacting
 with metadata present in datasets.
 """
+import hashlib
 import json
 import numpy as np
 from copy import deepcopy
@@ -90,6 +91,10 @@ class EnvRobocasa:
         self.base_env = self.env  # for mimicgen
         self.env_lang = env_lang
 
+        # scene loaded by the last call to reset_to (see _get_scene_key)
+        self._scene_key = None
+        self._scene_sim = None
+
         if self._is_v1:
             # Make sure joint position observations and eef vel observations are active
             for ob_name in self.env.observation_names:
@@ -126,6 +131,7 @@ class EnvRobocasa:
         Returns:
             observation (dict): initial observation dictionary.
         """
+        self._scene_key = None
         if unset_ep_meta and hasattr(self.env, "unset_ep_meta"):
             # unset the ep meta to clear out any ep meta that was previously set
             self.env.unset_ep_meta()
@@ -177,29 +183,47 @@ class EnvRobocasa:
                 self.env.set_attrs_from_ep_meta(ep_meta)
             elif hasattr(self.env, "set_ep_meta"):  # newer versions
                 self.env.set_ep_meta(ep_meta)
-            # this reset is necessary.
-            # while the call to env.reset_from_xml_string does call reset,
-            # that is only a "soft" reset that doesn't actually reload the model.
-            self.reset(unset_ep_meta=False)
-            robosuite_version_id = int(robosuite.__version__.split(".")[1])
-            if robosuite_version_id <= 3:
-                from robosuite.utils.mjcf_utils import postprocess_model_xml
-
-                xml = postprocess_model_xml(state["model"])
+
+            scene_key = self._get_scene_key(state)
+            if (
+                scene_key is not None
+                and scene_key == self._scene_key
+                and self._scene_sim is self.env.sim
+            ):
+                # the scene of @state is already loaded, so the model is neither rebuilt nor recompiled.
+                # only the episode is reset, deterministically as in env.reset_from_xml_string
+                self.env.deterministic_reset = True
+                try:
+                    self.env.reset()
+                finally:
+                    self.env.deterministic_reset = False
             else:
-                # v1.4 and above use the class-based edit_model_xml function
-                xml = self.env.edit_model_xml(state["model"])
-
-            self.env.reset_from_xml_string(xml)
-            self.env.sim.reset()
-            if not self._is_v1:
-                # hide teleop visualization after restoring from model
-                self.env.sim.model.site_rgba[self.env.eef_site_id] = np.array(
-                    [0.0, 0.0, 0.0, 0.0]
-                )
-                self.env.sim.model.site_rgba[self.env.eef_cylinder_id] = np.array(
-                    [0.0, 0.0, 0.0, 0.0]
-                )
+                # this reset is necessary.
+                # while the call to env.reset_from_xml_string does call reset,
+                # that is only a "soft" reset that doesn't actually reload the model.
+                self.reset(unset_ep_meta=False)
+                robosuite_version_id = int(robosuite.__version__.split(".")[1])
+                if robosuite_version_id <= 3:
+                    from robosuite.utils.mjcf_utils import postprocess_model_xml
+
+                    xml = postprocess_model_xml(state["model"])
+                else:
+                    # v1.4 and above use the class-based edit_model_xml function
+                    xml = self.env.edit_model_xml(state["model"])
+
+                self.env.reset_from_xml_string(xml)
+                self.env.sim.reset()
+                if not self._is_v1:
+                    # hide teleop visualization after restoring from model
+                    self.env.sim.model.site_rgba[self.env.eef_site_id] = np.array(
+                        [0.0, 0.0, 0.0, 0.0]
+                    )
+                    self.env.sim.model.site_rgba[self.env.eef_cylinder_id] = np.array(
+                        [0.0, 0.0, 0.0, 0.0]
+                    )
+                # camera configs may have changed with the episode meta data, so the key is recomputed
+                self._scene_key = self._get_scene_key(state)
+                self._scene_sim = self.env.sim
         if "states" in state:
             self.env.sim.set_state_from_flattened(state["states"])
             self.env.sim.forward()
@@ -220,6 +244,25 @@ class EnvRobocasa:
             return self.get_observation()
         return None
 
+    def _get_scene_key(self, state):
+        """
+        Returns a key identifying the scene of @state, as a hash of its edited model xml and episode meta data.
+        reset_to only loads the flattened state if the scene of @state is the one that is already loaded.
+
+        Args:
+            state (dict): simulator state that contains the model xml
+
+        Returns:
+            str or None: hex digest, or None if scenes cannot be reused (e.g. if textures are sampled per episode)
+        """
+        robosuite_version_id = int(robosuite.__version__.split(".")[1])
+        if robosuite_version_id <= 3 or getattr(self.env, "generative_textures", None):
+            return None
+        h = hashlib.sha1()
+        h.update(self.env.edit_model_xml(state["model"]).encode("utf8"))
+        h.update(str(state.get("ep_meta", None)).encode("utf8"))
+        return h.hexdigest()
+
     def render(self, mode="human", height=None, width=None, camera_name=None):
         """
         Render from simulation to either an on-screen window or off-screen to RGB array.
@@ -0,0 +1,111 @@
+"""
+Scene banks hold pre-generated kitchen episodes (see scripts/generate_scene_bank.py). Kitchen environments can
+draw their episodes from a scene bank instead of sampling layouts, fixtures and object placements online, which
+makes resets deterministic and avoids placement retries.
+"""
+import json
+
+import h5py
+import numpy as np
+
+
+def get_json_attrs(attrs):
+    """
+    Returns @attrs as json values. Scene bank episodes restore the task attributes that were sampled along with
+    the objects from these values, so attributes that would not be restored as they were are rejected
+
+    Args:
+        attrs (dict): attributes to convert
+
+    Returns:
+        dict: json-serializable attributes
+
+    Raises:
+        ValueError: if any attribute does not survive a round trip through json (e.g. fixtures or arrays)
+    """
+    json_attrs = dict()
+    invalid = []
+    for (k, v) in attrs.items():
+        if isinstance(v, np.generic):
+            v = v.item()
+        try:
+            valid = json.loads(json.dumps(v)) == v
+        except (TypeError, ValueError):
+            valid = False
+        if valid:
+            json_attrs[k] = v
+        else:
+            invalid.append(k)
+    if len(invalid) > 0:
+        raise ValueError(
+            "Task attributes {} cannot be stored in a scene bank, since they are not json values".format(
+                sorted(invalid)
+            )
+        )
+    return json_attrs
+
+
+class SceneBank:
+    """
+    Collection of pre-generated episodes of a kitchen environment, loaded into memory. Each entry is a dict with
+
+        ep_meta (dict): episode meta data, including layout, style and object configurations
+        fixture_placements (dict): fixture name -> (pos, quat) placement of the fixtures that are placed by sampling
+        robot_base (dict): "pos" and "quat" attributes of the robot root body
+        task_attrs (dict): task attributes that were sampled along with the objects (see get_json_attrs)
+        states (np.array): flattened sim state of the episode after objects have settled
+
+    Args:
+        path (str): path to the scene bank hdf5 file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        with h5py.File(path, "r") as f:
+            self.env_name = f["data"].attrs["env_name"]
+            self.env_kwargs = json.loads(f["data"].attrs["env_kwargs"])
+            for i in range(f["data"].attrs["total"]):
+                grp = f["data/scene_{}".format(i)]
+                entry = {
+                    k: json.loads(grp.attrs[k])
+                    for k in [
+                        "ep_meta",
+                        "fixture_placements",
+                        "robot_base",
+                        "task_attrs",
+                    ]
+                }
+                entry["states"] = grp["states"][()]
+                self.entries.append(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, idx):
+        return self.entries[idx]
+
+    @staticmethod
+    def write(path, entries, env_name, env_kwargs=None):
+        """
+        Writes scene bank entries to an hdf5 file
+
+        Args:
+            path (str): path of the scene bank hdf5 file
+
+            entries (list): scene bank entries (see Kitchen.get_scene_bank_entry)
+
+            env_name (str): name of the environment the entries were generated with
+
+            env_kwargs (dict): json-serializable environment kwargs the entries were generated with
+        """
+        with h5py.File(path, "w") as f:
+            grp = f.create_group("data")
+            grp.attrs["env_name"] = env_name
+            grp.attrs["env_kwargs"] = json.dumps(env_kwargs or {})
+            grp.attrs["total"] = len(entries)
+            for (i, entry) in enumerate(entries):
+                ep_grp = grp.create_group("scene_{}".format(i))
+                for k in ["ep_meta", "fixture_placements", "robot_base", "task_attrs"]:
+                    ep_grp.attrs[k] = json.dumps(entry[k])
+                ep_grp.create_dataset("states", data=np.array(entry["states"]))
@@ -2,18 +2,39 @@ import inspect
 import os
 import random
 from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
 
+import mujoco
 import numpy as np
 from lxml import etree as ET
+from PIL import Image
 from robosuite.utils.mjcf_utils import find_elements
 
 import robocasa
+import robocasa.macros as macros
 
 TEXTURES_DIR = (
     Path(inspect.getfile(robocasa)).parent / "models" / "assets" / "generative_textures"
 )
 
+# names of the textures that generative textures are written to in the model xml
+CTOP_TEX_NAME = "counter_top_replacement_texture"
+CAB_TEX_NAME_2D = "cab_replacement_texture_2d"
+CAB_TEX_NAME_CUBE = "cab_replacement_texture_cube"
+FLOOR_TEX_NAME = "floor_replacement_texture"
+WALL_TEX_NAME = "wall_replacement_texture"
+
+# generative texture key (see get_random_textures) -> names of the textures it is written to
+GEN_TEXTURE_SLOTS = dict(
+    cab_tex=[CAB_TEX_NAME_2D, CAB_TEX_NAME_CUBE],
+    counter_tex=[CTOP_TEX_NAME],
+    floor_tex=[FLOOR_TEX_NAME],
+    wall_tex=[WALL_TEX_NAME],
+)
+
+_PIL_MODES = {1: "L", 3: "RGB", 4: "RGBA"}
+
 CABINET_TEX_NAMES = [
     "flat copy 26.png",
     "196415a6-3c0f-4a1f-a644-fc54a6801223.png",
@@ -438,22 +459,40 @@ def get_random_textures(rng, frac=1.0):
             Default: 1.0 (select from all textures)
 
     Returns:
-        textures (dict): Dictionary of texture paths
+        textures (dict): Dictionary of texture paths, relative to TEXTURES_DIR (see get_texture_path)
     """
 
     end_ind = int(frac * 100)
     ind = rng.integers(0, end_ind)
 
     textures = dict(
-        cab_tex=os.path.join(TEXTURES_DIR, "cabinet", CABINET_TEX_NAMES[ind]),
-        counter_tex=os.path.join(TEXTURES_DIR, "counter", COUNTER_TOP_TEX_NAMES[ind]),
-        floor_tex=os.path.join(TEXTURES_DIR, "floor", FLOOR_TEX_NAMES[ind]),
-        wall_tex=os.path.join(TEXTURES_DIR, "wall", WALL_TEX_NAMES[ind]),
+        cab_tex=os.path.join("cabinet", CABINET_TEX_NAMES[ind]),
+        counter_tex=os.path.join("counter", COUNTER_TOP_TEX_NAMES[ind]),
+        floor_tex=os.path.join("floor", FLOOR_TEX_NAMES[ind]),
+        wall_tex=os.path.join("wall", WALL_TEX_NAMES[ind]),
     )
 
     return textures
 
 
+def get_texture_path(texture):
+    """
+    Gets the path of a generative texture image. Absolute paths into a generative_textures directory (as
+    stored in the episode metadata of older datasets) are pointed to the local TEXTURES_DIR
+
+    Args:
+        texture (str): texture path relative to TEXTURES_DIR (see get_random_textures), or absolute path
+
+    Returns:
+        str: absolute path of the texture image
+    """
+    parts = Path(texture).parts
+    if "generative_textures" in parts:
+        # keep everything after the last occurrence of the textures directory
+        parts = parts[len(parts) - parts[::-1].index("generative_textures") :]
+    return str(TEXTURES_DIR.joinpath(*parts))
+
+
 def replace_counter_top_texture(
     rng, initial_state: str, new_counter_top_texture_file: str = None
 ):
@@ -474,11 +513,21 @@ def replace_counter_top_texture(
 
     if new_counter_top_texture_file is None:
         new_counter_top_texture_file = get_random_textures(rng)["counter_tex"]
-    else:
-        new_counter_top_texture_file = os.path.join(
-            TEXTURES_DIR, new_counter_top_texture_file
-        )
+    new_counter_top_texture_file = get_texture_path(new_counter_top_texture_file)
+    set_counter_top_texture(asset, new_counter_top_texture_file)
+
+    return ET.tostring(root).decode("utf-8")
+
+
+def set_counter_top_texture(asset, new_counter_top_texture_file):
+    """
+    Replaces the counter top textures in the asset element of a parsed model xml (in place)
+
+    Args:
+        asset (Element): asset element of the model xml
 
+        new_counter_top_texture_file (str): path of the new counter top texture
+    """
     # step 1: find the name of texture that will be replaced
     counter_tex_name = None
     for mat in asset.findall("material"):
@@ -489,7 +538,6 @@ def replace_counter_top_texture(
     assert counter_tex_name is not None
 
     # step 2: find and replace texture element
-    CTOP_TEX_NAME = "counter_top_replacement_texture"
     for tex in asset.findall("texture"):
         name = tex.get("name")
         if name == counter_tex_name:
@@ -502,8 +550,6 @@ def replace_counter_top_texture(
         if "counter_top" in name:
             mat.set("texture", CTOP_TEX_NAME)
 
-    return ET.tostring(root).decode("utf-8")
-
 
 def replace_cab_textures(rng, initial_state: str, new_cab_texture_file: str = None):
     """
@@ -523,33 +569,42 @@ def replace_cab_textures(rng, initial_state: str, new_cab_texture_file: str = No
 
     if new_cab_texture_file is None:
         new_cab_texture_file = get_random_textures(rng)["cab_tex"]
-    else:
-        new_cab_texture_file = os.path.join(TEXTURES_DIR, new_cab_texture_file)
+    new_cab_texture_file = get_texture_path(new_cab_texture_file)
+    set_cab_textures(asset, new_cab_texture_file)
+
+    return ET.tostring(root).decode("utf-8")
+
 
-    CAB_TEX_NAME_2D = "cab_replacement_texture_2d"
+def set_cab_textures(asset, new_cab_texture_file):
+    """
+    Replaces the cabinet and counter base textures in the asset element of a parsed model xml (in place)
+
+    Args:
+        asset (Element): asset element of the model xml
+
+        new_cab_texture_file (str): path of the new cabinet texture
+    """
     tex_2d = find_elements(
         asset, tags="texture", attribs={"name": CAB_TEX_NAME_2D}, return_first=True
     )
     if tex_2d is not None:
         tex_2d.set("file", str(new_cab_texture_file))
     else:
-        tex_2d = ET.Element(
-            "texture", type="2d", name=CAB_TEX_NAME_2D, file=str(new_cab_texture_file)
+        tex_2d = asset.makeelement(
+            "texture",
+            dict(type="2d", name=CAB_TEX_NAME_2D, file=str(new_cab_texture_file)),
         )
         asset.append(tex_2d)
 
-    CAB_TEX_NAME_CUBE = "cab_replacement_texture_cube"
     tex_cube = find_elements(
         asset, tags="texture", attribs={"name": CAB_TEX_NAME_CUBE}, return_first=True
     )
     if tex_cube is not None:
         tex_cube.set("file", str(new_cab_texture_file))
     else:
-        tex_cube = ET.Element(
+        tex_cube = asset.makeelement(
             "texture",
-            type="cube",
-            name=CAB_TEX_NAME_CUBE,
-            file=str(new_cab_texture_file),
+            dict(type="cube", name=CAB_TEX_NAME_CUBE, file=str(new_cab_texture_file)),
         )
         asset.append(tex_cube)
 
@@ -575,8 +630,6 @@ def replace_cab_textures(rng, initial_state: str, new_cab_texture_file: str = No
             else:
                 mat.set("texture", CAB_TEX_NAME_CUBE)
 
-    return ET.tostring(root).decode("utf-8")
-
 
 def replace_floor_texture(rng, initial_state: str, new_floor_texture_file: str = None):
     """
@@ -596,9 +649,21 @@ def replace_floor_texture(rng, initial_state: str, new_floor_texture_file: str =
 
     if new_floor_texture_file is None:
         new_floor_texture_file = get_random_textures(rng)["floor_tex"]
-    else:
-        new_floor_texture_file = os.path.join(TEXTURES_DIR, new_floor_texture_file)
+    new_floor_texture_file = get_texture_path(new_floor_texture_file)
+    set_floor_texture(asset, new_floor_texture_file)
+
+    return ET.tostring(root).decode("utf-8")
+
 
+def set_floor_texture(asset, new_floor_texture_file):
+    """
+    Replaces the floor textures in the asset element of a parsed model xml (in place)
+
+    Args:
+        asset (Element): asset element of the model xml
+
+        new_floor_texture_file (str): path of the new floor texture
+    """
     # step 1: find the name of texture that will be replaced
     floor_tex_name = None
     for mat in asset.findall("material"):
@@ -609,7 +674,6 @@ def replace_floor_texture(rng, initial_state: str, new_floor_texture_file: str =
     assert floor_tex_name is not None
 
     # step 2: find and replace texture element
-    FLOOR_TEX_NAME = "floor_replacement_texture"
     for tex in asset.findall("texture"):
         name = tex.get("name")
         if name == floor_tex_name:
@@ -624,8 +688,6 @@ def replace_floor_texture(rng, initial_state: str, new_floor_texture_file: str =
             mat.set("texture", FLOOR_TEX_NAME)
             mat.set("texrepeat", "2 2")
 
-    return ET.tostring(root).decode("utf-8")
-
 
 def replace_wall_texture(rng, initial_state: str, new_wall_texture_file: str = None):
     """
@@ -645,9 +707,21 @@ def replace_wall_texture(rng, initial_state: str, new_wall_texture_file: str = N
 
     if new_wall_texture_file is None:
         new_wall_texture_file = get_random_textures(rng)["wall_tex"]
-    else:
-        new_wall_texture_file = os.path.join(TEXTURES_DIR, new_wall_texture_file)
+    new_wall_texture_file = get_texture_path(new_wall_texture_file)
+    set_wall_texture(asset, new_wall_texture_file)
+
+    return ET.tostring(root).decode("utf-8")
 
+
+def set_wall_texture(asset, new_wall_texture_file):
+    """
+    Replaces the wall textures in the asset element of a parsed model xml (in place)
+
+    Args:
+        asset (Element): asset element of the model xml
+
+        new_wall_texture_file (str): path of the new wall texture
+    """
     # step 1: find the name of texture that will be replaced
     wall_tex_name = None
     for mat in asset.findall("material"):
@@ -658,7 +732,6 @@ def replace_wall_texture(rng, initial_state: str, new_wall_texture_file: str = N
     assert wall_tex_name is not None
 
     # step 2: add new texture element
-    WALL_TEX_NAME = "wall_replacement_texture"
     for tex in asset.findall("texture"):
         name = tex.get("name")
         if name == wall_tex_name:
@@ -673,4 +746,112 @@ def replace_wall_texture(rng, initial_state: str, new_wall_texture_file: str = N
             mat.set("texture", WALL_TEX_NAME)
             mat.set("texrepeat", "3 3")
 
-    return ET.tostring(root).decode("utf-8")
+
+@lru_cache(maxsize=macros.GEN_TEXTURE_CACHE_SIZE)
+def load_texture_data(path, width, height, nchannel):
+    """
+    Decodes a texture image into the layout of a compiled MuJoCo texture (see mjModel.tex_data).
+    Images are resized to the texture size with nearest neighbor sampling. Decoded textures are memoized.
+
+    Args:
+        path (str): path of the texture image
+
+        width (int): texture width
+
+        height (int): texture height. Cube textures with a height of 6 * @width hold one face per
+            @width x @width block, and the image is used for all faces
+
+        nchannel (int): number of texture channels
+
+    Returns:
+        np.array: flattened uint8 texture data
+    """
+    img = Image.open(path).convert(_PIL_MODES[nchannel])
+    face_height = width if height == 6 * width else height
+    data = np.asarray(img.resize((width, face_height), Image.NEAREST), dtype=np.uint8)
+    data = np.tile(data.reshape(-1), height // face_height)
+    data.flags.writeable = False
+    return data
+
+
+class TextureSwapper:
+    """
+    Swaps the generative textures of a compiled model in place, by overwriting the texture data of the
+    replacement textures (see GEN_TEXTURE_SLOTS). This avoids editing the model xml and recompiling the model.
+    Replacement textures only exist in models that were compiled with generative textures.
+
+    Args:
+        model (mujoco.MjModel): compiled model
+
+        textures (dict): generative textures the model was compiled with, if known. Textures are given
+            relative to TEXTURES_DIR (see get_random_textures), and resolved with get_texture_path when they
+            are loaded
+    """
+
+    def __init__(self, model, textures=None):
+        self.model = model
+        self.slots = dict()
+        for (tex_key, tex_names) in GEN_TEXTURE_SLOTS.items():
+            tex_ids = [
+                mujoco.mj_name2id(model, mujoco.mjtObj.mjOBJ_TEXTURE, name)
+                for name in tex_names
+            ]
+            self.slots[tex_key] = [tex_id for tex_id in tex_ids if tex_id >= 0]
+        self.textures = dict(textures or {})
+
+    def _load(self, tex_id, path):
+        return load_texture_data(
+            get_texture_path(path),
+            int(self.model.tex_width[tex_id]),
+            int(self.model.tex_height[tex_id]),
+            int(self.model.tex_nchannel[tex_id]),
+        )
+
+    def preload(self, texture_sets):
+        """
+        Decodes textures ahead of time, so that swapping to them only copies memory
+
+        Args:
+            texture_sets (list of dict): generative textures (see get_random_textures)
+        """
+        for textures in texture_sets:
+            for (tex_key, path) in textures.items():
+                for tex_id in self.slots.get(tex_key, []):
+                    self._load(tex_id, path)
+
+    def swap(self, textures):
+        """
+        Writes generative textures to the model. Textures that are already set are skipped.
+
+        Args:
+            textures (dict): generative textures (see get_random_textures)
+
+        Returns:
+            list: ids of the textures that changed and need to be re-uploaded to renderers (see upload)
+        """
+        changed = []
+        for (tex_key, path) in textures.items():
+            tex_ids = self.slots.get(tex_key, [])
+            if len(tex_ids) == 0 or self.textures.get(tex_key) == path:
+                continue
+            for tex_id in tex_ids:
+                data = self._load(tex_id, path)
+                adr = self.model.tex_adr[tex_id]
+                self.model.tex_data[adr : adr + data.size] = data
+                changed.append(tex_id)
+            self.textures[tex_key] = path
+        return changed
+
+    def upload(self, tex_ids, render_contexts):
+        """
+        Re-uploads textures to renderers
+
+        Args:
+            tex_ids (list): ids of the textures to upload
+
+            render_contexts (list of MjRenderContext): render contexts to upload the textures to
+        """
+        for render_context in render_contexts:
+            render_context.gl_ctx.make_current()
+            for tex_id in tex_ids:
+                mujoco.mjr_uploadTexture(self.model, render_context.con, tex_id)
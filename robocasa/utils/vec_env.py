@@ -0,0 +1,595 @@
+"""
+Vectorized environments that run one environment per worker process. Observations are written by the workers into
+shared memory buffers laid out per observation key, so that camera images do not need to be pickled and sent
+through pipes on every step. Only actions, rewards, done flags, infos and other small messages cross the pipes.
+"""
+
+import multiprocessing
+import threading
+import time
+import traceback
+from multiprocessing import resource_tracker
+from multiprocessing.connection import wait
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+# byte alignment of the observation arrays inside a shared memory buffer
+_SHM_ALIGNMENT = 64
+
+
+def get_obs_layout(obs):
+    """
+    Computes the layout of an observation dict inside a flat buffer
+
+    Args:
+        obs (dict): observation dict, mapping keys to arrays
+
+    Returns:
+        2-tuple:
+            - (list) (key, shape, dtype string, offset) of each observation
+            - (int) total size of the buffer in bytes
+    """
+    layout = []
+    size = 0
+    for key, value in obs.items():
+        value = np.asarray(value)
+        layout.append((key, value.shape, value.dtype.str, size))
+        size += -(-value.nbytes // _SHM_ALIGNMENT) * _SHM_ALIGNMENT
+    return layout, max(size, 1)
+
+
+def get_obs_views(buf, layout):
+    """
+    Gets an array view for each observation of a layout (see get_obs_layout) in a buffer
+
+    Args:
+        buf (memoryview): buffer holding the observations
+
+        layout (list): layout of the observations
+
+    Returns:
+        dict: maps each observation key to an array backed by @buf
+    """
+    return {
+        key: np.ndarray(shape, dtype=np.dtype(dtype), buffer=buf, offset=offset)
+        for (key, shape, dtype, offset) in layout
+    }
+
+
+class _ObsBuffer:
+    """
+    Shared memory buffer holding the observations of one worker
+    """
+
+    def __init__(self, layout, size, name=None):
+        self.layout = layout
+        # buffers are created and unlinked by the ShmemVectorEnv. Workers share its resource tracker (see
+        # ShmemVectorEnv.__init__), so attaching does not need to be undone, and the tracker still unlinks the
+        # buffers if the ShmemVectorEnv process crashes
+        self.shm = SharedMemory(name=name, create=name is None, size=size)
+        self.views = get_obs_views(self.shm.buf, layout)
+
+    def matches(self, obs):
+        """
+        Whether an observation dict has the keys, shapes and dtypes of the layout of this buffer
+        """
+        if len(obs) != len(self.views):
+            return False
+        for key, value in obs.items():
+            view = self.views.get(key, None)
+            value = np.asarray(value)
+            if view is None or view.shape != value.shape or view.dtype != value.dtype:
+                return False
+        return True
+
+    def write(self, obs):
+        for key, value in obs.items():
+            self.views[key][...] = value
+
+    def read(self, copy=True):
+        if copy:
+            return {key: np.array(view) for (key, view) in self.views.items()}
+        return dict(self.views)
+
+    def close(self, unlink=False):
+        # views need to be released before the shared memory can be closed
+        self.views = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class _WorkerEnvs:
+    """
+    Environments of a worker process: the active environment, and optionally a standby environment that is reset
+    in a background thread while the active environment is stepped. When an episode of the active environment is
+    done, the environments are swapped, so that the next episode starts without waiting for a reset.
+
+    The background thread does not own the rendering context of the worker, so standby environments cannot use
+    an offscreen renderer or camera observations. Explicit resets of the active environment wait for the
+    background reset, so that the two environments never build scenes at the same time.
+    """
+
+    def __init__(self, env_fn, standby=False):
+        self.env = env_fn()
+        self.standby_env = None
+        self._standby_thread = None
+        self._standby_result = None
+        if standby:
+            self.standby_env = env_fn()
+            for env in [self.env, self.standby_env]:
+                if getattr(env, "has_offscreen_renderer", False) or getattr(
+                    env, "use_camera_obs", False
+                ):
+                    raise ValueError(
+                        "Standby environments cannot render, since they are reset in a background thread"
+                    )
+            _reseed_standby_env(self.standby_env)
+            self._start_standby_reset()
+
+    def _reset_standby(self):
+        t_start = time.time()
+        try:
+            self._standby_result = (self.standby_env.reset(), time.time() - t_start)
+        except Exception:
+            self._standby_result = (None, traceback.format_exc())
+
+    def _start_standby_reset(self):
+        self._standby_thread = threading.Thread(target=self._reset_standby, daemon=True)
+        self._standby_thread.start()
+
+    def reset(self, times, **kwargs):
+        """
+        Resets the active environment, after waiting for the reset of the standby environment to finish. Scene
+        building uses process-wide caches (e.g. the fixture and object template caches), which are not
+        thread-safe, so the two resets must not overlap
+
+        Returns:
+            dict: first observation of the active environment
+        """
+        t_start = time.time()
+        if self._standby_thread is not None:
+            self._standby_thread.join()
+            times["reset_wait"] = time.time() - t_start
+        t_start = time.time()
+        obs = self.env.reset(**kwargs)
+        times["reset"] = time.time() - t_start
+        return obs
+
+    def swap(self, times):
+        """
+        Swaps in the standby environment, after waiting for its reset to finish, and starts resetting the
+        previously active environment in the background
+
+        Returns:
+            dict: first observation of the new active environment
+        """
+        t_start = time.time()
+        self._standby_thread.join()
+        times["reset_wait"] = time.time() - t_start
+        obs, reset_time = self._standby_result
+        if obs is None:
+            raise RuntimeError("Reset of standby environment failed:\n" + reset_time)
+        times["reset"] = reset_time
+        self.env, self.standby_env = self.standby_env, self.env
+        self._start_standby_reset()
+        return obs
+
+    def close(self):
+        if self._standby_thread is not None:
+            self._standby_thread.join()
+            self.standby_env.close()
+        self.env.close()
+
+
+def _reseed_standby_env(env):
+    """
+    Reseeds a standby environment, which was created by the same env_fn as the active environment of its worker,
+    so that seeded environments do not replay the episodes of the active environment. The random generator is
+    reseeded in place, since samplers of the environment may hold references to it
+    """
+    seed = getattr(env, "seed", None)
+    rng = getattr(env, "rng", None)
+    if isinstance(seed, (int, np.integer)) and isinstance(rng, np.random.Generator):
+        rng.bit_generator.state = np.random.default_rng([seed, 1]).bit_generator.state
+
+
+def _worker(remote, parent_remote, env_fn, auto_reset, standby):
+    """
+    Main loop of a worker process. Runs commands sent by the ShmemVectorEnv through @remote.
+    Observations are written into the shared memory buffer of the worker if they match its layout, and are sent
+    through the pipe otherwise. Replies to step and reset commands include the time spent in env.step / env.reset.
+    """
+    parent_remote.close()
+    obs_buffer = None
+
+    def send_obs(obs):
+        if obs_buffer is not None and obs_buffer.matches(obs):
+            obs_buffer.write(obs)
+            return None
+        return obs
+
+    envs = None
+    init_error = None
+    try:
+        try:
+            envs = _WorkerEnvs(env_fn, standby=standby)
+        except Exception:
+            # reported in reply to the commands of the worker, since ShmemVectorEnv does not wait for its workers
+            init_error = traceback.format_exc()
+        while True:
+            cmd, data = remote.recv()
+            if init_error is not None and cmd != "close":
+                remote.send(("error", init_error))
+                continue
+            try:
+                if cmd == "step":
+                    times = dict()
+                    t_start = time.time()
+                    obs, reward, done, info = envs.env.step(data)
+                    times["step"] = time.time() - t_start
+                    if done and auto_reset:
+                        info["final_observation"] = obs
+                        if envs.standby_env is not None:
+                            obs = envs.swap(times)
+                        else:
+                            obs = envs.reset(times)
+                    remote.send(("ok", (send_obs(obs), reward, done, info, times)))
+                elif cmd == "reset":
+                    times = dict()
+                    obs = envs.reset(times, **data)
+                    remote.send(("ok", (send_obs(obs), times)))
+                elif cmd == "set_buffer":
+                    if obs_buffer is not None:
+                        obs_buffer.close()
+                    obs_buffer = _ObsBuffer(*data)
+                    remote.send(("ok", None))
+                elif cmd == "get_attr":
+                    remote.send(("ok", getattr(envs.env, data)))
+                elif cmd == "call":
+                    name, args, kwargs = data
+                    remote.send(("ok", getattr(envs.env, name)(*args, **kwargs)))
+                elif cmd == "close":
+                    remote.send(("ok", None))
+                    break
+                else:
+                    raise ValueError("Unknown command: {}".format(cmd))
+            except Exception:
+                remote.send(("error", traceback.format_exc()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if obs_buffer is not None:
+            obs_buffer.close()
+        if envs is not None:
+            envs.close()
+        remote.close()
+
+
+class ShmemVectorEnv:
+    """
+    Vectorized environment that runs each environment in its own worker process. Each worker writes its
+    observations into a shared memory buffer that is laid out per observation key, based on the first observation
+    of the worker. Observations that do not match this layout (e.g. after the objects of a kitchen task changed)
+    are sent through the pipe of the worker instead.
+
+    Workers can run different tasks, in which case their observations can have different keys and shapes.
+
+    Workers can be stepped and reset asynchronously (see step_async, step_wait, reset_async and reset_wait), so
+    that the results of workers can be consumed as they become ready (see get_ready). The time each worker spent
+    in its last env.step and env.reset is kept in step_times and reset_times.
+
+    Args:
+        env_fns (list of callable): functions that create the environment of each worker
+
+        auto_reset (bool): if True, workers reset their environment when an episode is done. The last
+            observation of the episode is then returned in the "final_observation" entry of the info dict
+
+        standby (bool): if True, each worker keeps a second environment that is reset in a background thread
+            while the first one is stepped, and swaps it in when an episode is done, so that automatic resets
+            do not block the caller. The standby environment is created by calling the env_fn of the worker a
+            second time, and its random generator is reseeded so that it does not replay the episodes of the
+            active environment. Calls to get_env_attr and call only apply to the active environment. Since the
+            standby environment is reset in a background thread, the environments cannot use an offscreen
+            renderer or camera observations, and reset does not take keyword arguments. Only used with
+            auto_reset
+
+        context (str): multiprocessing start method of the workers (see multiprocessing.get_context). Uses the
+            default start method if None
+    """
+
+    def __init__(self, env_fns, auto_reset=True, standby=False, context=None):
+        self.num_envs = len(env_fns)
+        self.auto_reset = auto_reset
+        self.standby = standby and auto_reset
+
+        ctx = multiprocessing.get_context(context)
+        # start the resource tracker before the workers, so that forked workers share it as well instead of
+        # starting their own tracker, which would unlink the observation buffers when the worker exits
+        resource_tracker.ensure_running()
+        self._remotes = []
+        self._processes = []
+        for env_fn in env_fns:
+            remote, worker_remote = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(worker_remote, remote, env_fn, auto_reset, self.standby),
+                daemon=True,
+            )
+            process.start()
+            worker_remote.close()
+            self._remotes.append(remote)
+            self._processes.append(process)
+
+        self._obs_buffers = [None] * self.num_envs
+
+        # worker id -> command that the worker is running, for workers whose results have not been received yet
+        self._pending = dict()
+
+        # time spent in the last env.step and env.reset of each worker, and time that the last automatic reset of
+        # each worker waited for its standby environment
+        self.step_times = np.full(self.num_envs, np.nan)
+        self.reset_times = np.full(self.num_envs, np.nan)
+        self.reset_wait_times = np.full(self.num_envs, np.nan)
+
+        self.closed = False
+
+    def __len__(self):
+        return self.num_envs
+
+    def _get_ids(self, id=None):
+        if id is None:
+            return list(range(self.num_envs))
+        if np.isscalar(id):
+            return [id]
+        return list(id)
+
+    def _send(self, ids, cmd, data):
+        """
+        Sends a command to the given workers without waiting for their results
+        """
+        for i in ids:
+            if i in self._pending:
+                raise RuntimeError(
+                    "Worker {} is still running {}".format(i, self._pending[i])
+                )
+        for i, d in zip(ids, data):
+            self._remotes[i].send((cmd, d))
+            self._pending[i] = cmd
+
+    def _recv(self, ids, cmd=None):
+        """
+        Waits for the results of the given workers. Raises an error if any of them failed, after all results have
+        been received
+        """
+        for i in ids:
+            if self._pending.get(i, None) != cmd:
+                raise RuntimeError(
+                    "Worker {} is not running {} but {}".format(
+                        i, cmd, self._pending.get(i, None)
+                    )
+                )
+        results = [self._remotes[i].recv() for i in ids]
+        for i in ids:
+            del self._pending[i]
+        for i, (status, data) in zip(ids, results):
+            if status == "error":
+                raise RuntimeError("Error in worker {}:\n{}".format(i, data))
+        return [data for (_, data) in results]
+
+    def _request(self, ids, cmd, data):
+        """
+        Sends the same command to the given workers and waits for their results
+        """
+        self._send(ids, cmd, [data] * len(ids))
+        return self._recv(ids, cmd)
+
+    def _get_obs(self, i, obs, copy=True):
+        """
+        Gets the observations of worker @i, which were either written into its buffer (obs is None) or sent
+        through the pipe. The first observations sent through the pipe determine the layout of the buffer.
+        """
+        if obs is not None:
+            if self._obs_buffers[i] is None:
+                layout, size = get_obs_layout(obs)
+                self._obs_buffers[i] = _ObsBuffer(layout, size)
+                self._request(
+                    [i], "set_buffer", (layout, size, self._obs_buffers[i].shm.name)
+                )
+            return obs
+        return self._obs_buffers[i].read(copy=copy)
+
+    def _update_times(self, i, times):
+        for key, values in [
+            ("step", self.step_times),
+            ("reset", self.reset_times),
+            ("reset_wait", self.reset_wait_times),
+        ]:
+            if key in times:
+                values[i] = times[key]
+
+    def get_ready(self, timeout=None):
+        """
+        Gets the workers whose results are ready to be received
+
+        Args:
+            timeout (None or float): maximum time to wait for at least one pending worker to be ready, in seconds.
+                Waits until a worker is ready if None
+
+        Returns:
+            list of int: ids of the ready workers
+        """
+        ids = sorted(self._pending.keys())
+        ready = wait([self._remotes[i] for i in ids], timeout=timeout)
+        return [i for i in ids if self._remotes[i] in ready]
+
+    def reset_async(self, id=None, **kwargs):
+        """
+        Starts resetting the environments of the given workers, without waiting for the resets to finish
+
+        Args:
+            id (None or int or list of int): workers to reset. Resets all workers if None
+
+            kwargs (dict): keyword arguments passed to the reset of each environment
+        """
+        if self.standby and kwargs:
+            raise ValueError(
+                "Reset arguments would not apply to the standby environments, which are reset in the background"
+            )
+        ids = self._get_ids(id)
+        self._send(ids, "reset", [kwargs] * len(ids))
+
+    def reset_wait(self, id=None):
+        """
+        Waits for the resets of the given workers to finish (see reset_async)
+
+        Args:
+            id (None or int or list of int): workers to wait for. Waits for all resetting workers if None
+
+        Returns:
+            list of dict: observations of each worker
+        """
+        if id is None:
+            ids = sorted(i for (i, cmd) in self._pending.items() if cmd == "reset")
+        else:
+            ids = self._get_ids(id)
+        results = self._recv(ids, "reset")
+        obs = []
+        for i, (env_obs, times) in zip(ids, results):
+            self._update_times(i, times)
+            obs.append(self._get_obs(i, env_obs))
+        return obs
+
+    def reset(self, id=None, **kwargs):
+        """
+        Resets the environments of the given workers
+
+        Args:
+            id (None or int or list of int): workers to reset. Resets all workers if None
+
+            kwargs (dict): keyword arguments passed to the reset of each environment
+
+        Returns:
+            list of dict: observations of each reset worker
+        """
+        ids = self._get_ids(id)
+        self.reset_async(id=ids, **kwargs)
+        return self.reset_wait(id=ids)
+
+    def step_async(self, action, id=None):
+        """
+        Starts stepping the environments of the given workers, without waiting for the steps to finish
+
+        Args:
+            action (np.array or list): action of each of the given workers
+
+            id (None or int or list of int): workers to step. Steps all workers if None
+        """
+        ids = self._get_ids(id)
+        assert len(action) == len(ids)
+        self._send(ids, "step", list(action))
+
+    def step_wait(self, id=None):
+        """
+        Waits for the steps of the given workers to finish (see step_async)
+
+        Args:
+            id (None or int or list of int): workers to wait for. Waits for all stepping workers if None
+
+        Returns:
+            4-tuple:
+                - (list of dict) observations of each worker
+                - (np.array) rewards
+                - (np.array) done flags
+                - (list of dict) infos
+        """
+        if id is None:
+            ids = sorted(i for (i, cmd) in self._pending.items() if cmd == "step")
+        else:
+            ids = self._get_ids(id)
+        results = self._recv(ids, "step")
+        for i, res in zip(ids, results):
+            self._update_times(i, res[4])
+        obs = [self._get_obs(i, res[0]) for (i, res) in zip(ids, results)]
+        rewards = np.array([res[1] for res in results])
+        dones = np.array([res[2] for res in results], dtype=bool)
+        infos = [res[3] for res in results]
+        return obs, rewards, dones, infos
+
+    def step(self, action, id=None):
+        """
+        Steps the environments of the given workers
+
+        Args:
+            action (np.array or list): action of each of the given workers
+
+            id (None or int or list of int): workers to step. Steps all workers if None
+
+        Returns:
+            4-tuple:
+                - (list of dict) observations of each worker
+                - (np.array) rewards
+                - (np.array) done flags
+                - (list of dict) infos
+        """
+        ids = self._get_ids(id)
+        self.step_async(action, id=ids)
+        return self.step_wait(id=ids)
+
+    def get_env_attr(self, key, id=None):
+        """
+        Gets an attribute of the environments of the given workers
+
+        Args:
+            key (str): name of the attribute
+
+            id (None or int or list of int): workers to get the attribute of. Uses all workers if None
+
+        Returns:
+            list: attribute of each worker's environment
+        """
+        return self._request(self._get_ids(id), "get_attr", key)
+
+    def call(self, name, *args, id=None, **kwargs):
+        """
+        Calls a method of the environments of the given workers
+
+        Args:
+            name (str): name of the method
+
+            id (None or int or list of int): workers to call the method of. Uses all workers if None
+
+        Returns:
+            list: return value of each call
+        """
+        return self._request(self._get_ids(id), "call", (name, args, kwargs))
+
+    def close(self):
+        """
+        Closes the environments, shuts down the workers and frees the shared memory buffers
+        """
+        if self.closed:
+            return
+        self.closed = True
+        for i, (remote, process) in enumerate(zip(self._remotes, self._processes)):
+            try:
+                if i in self._pending:
+                    # discard the result of the running command
+                    remote.recv()
+                remote.send(("close", None))
+                remote.recv()
+            except (BrokenPipeError, EOFError):
+                pass
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            remote.close()
+        self._pending = dict()
+        for obs_buffer in self._obs_buffers:
+            if obs_buffer is not None:
+                obs_buffer.close(unlink=True)
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
@@ -0,0 +1,161 @@
+"""
+Composable post-processing of model xmls. A pipeline parses the xml once, runs all element-level rewrites in a
+single traversal of the tree, runs tree-level rewrites on the same tree, and serializes the result once.
+Results are memoized, since the same model xml is post-processed many times (e.g. when replaying datasets).
+"""
+import hashlib
+import os
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+import robosuite
+
+import robocasa
+
+
+class XMLPipeline:
+    """
+    Pipeline of rewrites applied to model xml strings.
+
+    Element passes are called as fn(elem, ctx) for every element with one of their tags inside of their section
+    (a top-level element of the model such as "asset" or "worldbody"), in document order. On each element, passes
+    run in the order they were added. Tree passes are called as fn(root, ctx) after the traversal, in the order
+    they were added. ctx is a dict that is created for each run and can be used to share state between passes.
+
+    Args:
+        cache_size (int): number of processed xmls to memoize. 0 disables memoization
+    """
+
+    def __init__(self, cache_size=0):
+        self.cache_size = cache_size
+        self._element_passes = dict()
+        self._tree_passes = []
+        self._cache = OrderedDict()
+
+    def add_element_pass(self, fn, section, tags):
+        """
+        Adds an element-level rewrite
+
+        Args:
+            fn (function): rewrite, called as fn(elem, ctx)
+
+            section (str): top-level element of the model to apply the rewrite in
+
+            tags (list of str): tags of the elements to apply the rewrite to
+        """
+        section_passes = self._element_passes.setdefault(section, dict())
+        for tag in tags:
+            section_passes.setdefault(tag, []).append(fn)
+        self.clear_cache()
+
+    def add_tree_pass(self, fn):
+        """
+        Adds a tree-level rewrite
+
+        Args:
+            fn (function): rewrite, called as fn(root, ctx)
+        """
+        self._tree_passes.append(fn)
+        self.clear_cache()
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def run(self, xml_str, key=None):
+        """
+        Post-processes a model xml
+
+        Args:
+            xml_str (str): model xml
+
+            key (str): identifies any state other than @xml_str that the rewrites depend on. Results are
+                memoized by a hash of @xml_str and @key
+
+        Returns:
+            str: processed model xml
+        """
+        h = hashlib.sha1(xml_str.encode("utf8"))
+        if key is not None:
+            h.update(key.encode("utf8"))
+        cache_key = h.hexdigest()
+        if cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            return self._cache[cache_key]
+
+        root = ET.fromstring(xml_str)
+        ctx = dict()
+        for section in root:
+            section_passes = self._element_passes.get(section.tag, None)
+            if section_passes is None:
+                continue
+            for elem in section.iter():
+                for fn in section_passes.get(elem.tag, ()):
+                    fn(elem, ctx)
+        for fn in self._tree_passes:
+            fn(root, ctx)
+        result = ET.tostring(root).decode("utf8")
+
+        if self.cache_size > 0:
+            self._cache[cache_key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+
+def _replace_path_prefix(path_split, prefix_split, package):
+    # replaces everything up to (and including) the last occurrence of @package in the path
+    ind = max([loc for loc, val in enumerate(path_split) if val == package])
+    return "/".join(prefix_split + path_split[ind + 1 :])
+
+
+_ROBOSUITE_PATH_SPLIT = os.path.split(robosuite.__file__)[0].split("/")
+_ROBOCASA_PATH_SPLIT = os.path.split(robocasa.__file__)[0].split("/")
+
+
+def fix_asset_path(elem, ctx=None):
+    """
+    Element pass that points mesh and texture files to the local robosuite and robocasa installations
+    (see MujocoEnv.edit_model_xml and Kitchen.edit_model_xml)
+
+    Args:
+        elem (ET.Element): mesh or texture element
+    """
+    path = elem.get("file")
+    if path is None:
+        return
+
+    # robosuite assets
+    path_split = path.split("/")
+    if "robosuite" in path_split:
+        path = _replace_path_prefix(path_split, _ROBOSUITE_PATH_SPLIT, "robosuite")
+        elem.set("file", path)
+
+    # robocasa assets
+    if (
+        ("models/assets/fixtures" in path)
+        or ("models/assets/textures" in path)
+        or ("models/assets/objects/objaverse" in path)
+    ):
+        if "/robosuite/" in path:
+            package = "robosuite"
+        elif "/robocasa/" in path:
+            package = "robocasa"
+        else:
+            raise ValueError
+        elem.set(
+            "file", _replace_path_prefix(path.split("/"), _ROBOCASA_PATH_SPLIT, package)
+        )
+
+
+def rename_legacy_base(elem, ctx=None):
+    """
+    Element pass that renames base0_ -> mobilebase0_ in element names and actuator joints
+    (this is needed for old PandaOmron demos)
+
+    Args:
+        elem (ET.Element): element to rename
+    """
+    for attrib in ["name", "joint"]:
+        value = elem.get(attrib)
+        if value is not None and value.startswith("base0_"):
+            elem.set(attrib, "mobilebase0_" + value[6:])
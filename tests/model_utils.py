@@ -0,0 +1,54 @@
+"""
+Models and helpers shared by the tests. Importing this module also imports the scene models, which need to be
+imported before the fixture models, so test modules import it before any fixtures.
+"""
+import os
+import xml.etree.ElementTree as ET
+
+import robocasa.models.scenes
+
+# box object, with the sites that object models are expected to have
+BOX_OBJECT_XML = """
+<mujoco model="box">
+  <worldbody>
+    <body>
+      <body name="object">
+        <geom type="box" size="0.04 0.02 0.05" group="0"/>
+      </body>
+      <site name="bottom_site" pos="0 0 -0.05" size="0.002"/>
+      <site name="top_site" pos="0 0 0.05" size="0.002"/>
+      <site name="horizontal_radius_site" pos="0.04 0.02 0" size="0.002"/>
+    </body>
+  </worldbody>
+</mujoco>
+"""
+
+
+def write_box_object(dir_path):
+    """
+    Writes the box object model to @dir_path and returns its path
+    """
+    mjcf_path = os.path.join(dir_path, "model.xml")
+    with open(mjcf_path, "w") as f:
+        f.write(BOX_OBJECT_XML)
+    return mjcf_path
+
+
+def replace_missing_assets(xml):
+    """
+    Replaces meshes with small boxes and removes files that are not available (e.g. textures), so that fixtures
+    and kitchens can be compiled without their assets
+    """
+    root = ET.fromstring(xml)
+    for parent in root.iter():
+        for child in list(parent):
+            file = child.get("file")
+            if child.tag == "mesh" or (file is not None and not os.path.exists(file)):
+                parent.remove(child)
+    for geom in root.iter("geom"):
+        if geom.attrib.pop("mesh", None) is not None:
+            geom.set("type", "box")
+            geom.set("size", "0.01 0.01 0.01")
+    for material in root.iter("material"):
+        material.attrib.pop("texture", None)
+    return ET.tostring(root, encoding="unicode")
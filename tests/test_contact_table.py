@@ -0,0 +1,70 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import robosuite.utils.sim_utils as SU
+from robosuite.models.objects import BoxObject
+from robosuite.models.world import MujocoWorldBase
+from robosuite.utils.binding_utils import MjSim
+
+from robocasa.utils.contact_utils import ContactTable
+
+
+class TestContactTable(unittest.TestCase):
+    def setUp(self):
+        world = MujocoWorldBase()
+        world.worldbody.append(
+            ET.Element("geom", name="floor", type="plane", size="2 2 0.1")
+        )
+        self.boxes = []
+        for i in range(4):
+            box = BoxObject(name="box{}".format(i), size=[0.05, 0.05, 0.05])
+            box_body = box.get_obj()
+            box_body.set("pos", "{} 0 {}".format(0.02 * i, 0.05 + 0.11 * i))
+            world.worldbody.append(box_body)
+            world.merge_assets(box)
+            self.boxes.append(box)
+        self.sim = MjSim.from_xml_string(world.get_xml())
+
+    def test_matches_check_contact(self):
+        # the last box is not mapped to a model id
+        table = ContactTable(self.sim, models=self.boxes[:3])
+        queries = [(box, None) for box in self.boxes]
+        queries += [(box, other) for box in self.boxes for other in self.boxes]
+        queries += [(box, "floor") for box in self.boxes]
+        queries += [(self.boxes[0].contact_geoms + ["floor"], self.boxes[1])]
+
+        num_contacts = 0
+        for _ in range(200):
+            self.sim.step()
+            num_contacts += self.sim.data.ncon > 0
+            for geoms_1, geoms_2 in queries:
+                self.assertEqual(
+                    table.check_contact(geoms_1, geoms_2),
+                    SU.check_contact(self.sim, geoms_1, geoms_2),
+                )
+        self.assertGreater(num_contacts, 0)
+
+    def test_same_number_of_contacts(self):
+        table = ContactTable(self.sim, models=self.boxes)
+        for _ in range(200):
+            self.sim.step()
+        ncon = self.sim.data.ncon
+        self.assertTrue(table.check_contact(self.boxes[0], "floor"))
+        self.assertFalse(table.check_contact(self.boxes[3], "floor"))
+
+        # swap the lowest and the highest box, so that other geoms are in contact with the floor
+        qpos = self.sim.data.qpos
+        qpos[0:7], qpos[21:28] = np.array(qpos[21:28]), np.array(qpos[0:7])
+        self.sim.forward()
+        self.assertEqual(self.sim.data.ncon, ncon)
+        for box in [self.boxes[0], self.boxes[3]]:
+            self.assertEqual(
+                table.check_contact(box, "floor"),
+                SU.check_contact(self.sim, box, "floor"),
+            )
+        self.assertTrue(table.check_contact(self.boxes[3], "floor"))
+
+
+if __name__ == "__main__":
+    unittest.main()
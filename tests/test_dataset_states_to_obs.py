@@ -0,0 +1,389 @@
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import h5py
+import numpy as np
+
+import robocasa.scripts.dataset_states_to_obs as DS
+
+
+def write_source_dataset(path, num_demos=3):
+    """
+    Writes a dataset with the states, actions and models of @num_demos demos
+    """
+    with h5py.File(path, "w") as f:
+        for i in range(num_demos):
+            ep_grp = f.create_group("data/demo_{}".format(i))
+            ep_grp.create_dataset("states", data=np.full((4 + i, 6), i, dtype=float))
+            ep_grp.create_dataset("actions", data=np.zeros((4 + i, 3)))
+            ep_grp.attrs["model_file"] = "<mujoco model='demo_{}'/>".format(i)
+            ep_grp.attrs["ep_meta"] = json.dumps(dict(layout_id=i))
+
+
+def make_traj(f, ep):
+    """
+    Makes a trajectory as returned by extract_trajectory for a demo of the source dataset
+    """
+    ep_grp = f["data/{}".format(ep)]
+    states = ep_grp["states"][()]
+    traj_len = len(states)
+    return dict(
+        obs=dict(
+            image=np.full((traj_len, 8, 8, 3), int(states[0, 0]), dtype=np.uint8),
+            state=states[:, :2],
+        ),
+        next_obs=dict(),
+        rewards=np.zeros(traj_len),
+        dones=np.zeros(traj_len, dtype=int),
+        actions=ep_grp["actions"][()],
+        states=states,
+        initial_state_dict=dict(
+            states=states[0],
+            model=ep_grp.attrs["model_file"],
+            ep_meta=ep_grp.attrs["ep_meta"],
+        ),
+        datagen_info=dict(),
+    )
+
+
+class TestShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dataset = os.path.join(self.tmp_dir.name, "demos.hdf5")
+        write_source_dataset(self.dataset)
+        self.args = argparse.Namespace(
+            dataset=self.dataset, no_compress=False, include_next_obs=False
+        )
+        self.output_path = os.path.join(self.tmp_dir.name, "demos_im128.hdf5")
+        self.shard_dir = DS.get_shard_dir(self.output_path)
+        self.shard_paths = DS.get_shard_paths(self.output_path, 2)
+        os.makedirs(self.shard_dir)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_demos(self, shard_idx, demos):
+        with h5py.File(self.dataset, "r") as f:
+            with h5py.File(self.shard_paths[shard_idx], "a") as f_shard:
+                for ep in demos:
+                    DS.write_traj_to_shard(self.args, f, f_shard, ep, make_traj(f, ep))
+
+    def load_manifest(self):
+        with h5py.File(self.dataset, "r") as f:
+            return DS.load_manifest(self.shard_dir, f)
+
+    def test_write_traj_to_shard(self):
+        self.write_demos(0, ["demo_0", "demo_1"])
+        # demos are rewritten when they are extracted again
+        self.write_demos(0, ["demo_0"])
+        with h5py.File(self.dataset, "r") as f:
+            with h5py.File(self.shard_paths[0], "r") as f_shard:
+                self.assertEqual(list(f_shard["data"].keys()), ["demo_0", "demo_1"])
+                for ep in ["demo_0", "demo_1"]:
+                    traj = make_traj(f, ep)
+                    ep_grp = f_shard["data/{}".format(ep)]
+                    self.assertEqual(ep_grp.attrs["num_samples"], len(traj["states"]))
+                    self.assertEqual(ep_grp["obs/image"].compression, "gzip")
+                    for k in traj["obs"]:
+                        self.assertTrue(
+                            np.array_equal(ep_grp["obs/{}".format(k)], traj["obs"][k])
+                        )
+                    self.assertTrue(np.array_equal(ep_grp["states"], traj["states"]))
+        with open(self.shard_paths[0][:-5] + ".jsonl", "r") as manifest:
+            entries = [json.loads(line) for line in manifest]
+        self.assertEqual(
+            [entry["demo"] for entry in entries], ["demo_0", "demo_1", "demo_0"]
+        )
+
+    def test_merge_shards(self):
+        self.write_demos(0, ["demo_0", "demo_2"])
+        self.write_demos(1, ["demo_1"])
+        demos = ["demo_0", "demo_1", "demo_2"]
+        with mock.patch.object(DS, "finalize_output") as finalize_output:
+            self.assertTrue(
+                DS.merge_shards(self.args, self.shard_dir, self.output_path, demos)
+            )
+        # merged in a temporary file that replaces the output once it is finalized
+        (_, merged_path, total_samples), _ = finalize_output.call_args
+        self.assertEqual(os.path.dirname(merged_path), self.shard_dir)
+        self.assertEqual(total_samples, 4 + 5 + 6)
+
+        with h5py.File(self.dataset, "r") as f:
+            with h5py.File(self.output_path, "r") as f_out:
+                self.assertEqual(sorted(f_out["data"].keys()), demos)
+                for ep in demos:
+                    traj = make_traj(f, ep)
+                    ep_grp = f_out["data/{}".format(ep)]
+                    self.assertEqual(ep_grp["obs/image"].compression, "gzip")
+                    self.assertTrue(
+                        np.array_equal(ep_grp["obs/image"], traj["obs"]["image"])
+                    )
+                    self.assertEqual(
+                        ep_grp.attrs["model_file"],
+                        f["data/{}".format(ep)].attrs["model_file"],
+                    )
+
+    def test_demo_checksum(self):
+        with h5py.File(self.dataset, "r") as f:
+            checksum = DS.get_demo_checksum(f, "demo_0")
+            self.assertEqual(DS.get_demo_checksum(f, "demo_0"), checksum)
+            self.assertNotEqual(DS.get_demo_checksum(f, "demo_1"), checksum)
+        with h5py.File(self.dataset, "a") as f:
+            f["data/demo_0/states"][0, 0] = 1.0
+            self.assertNotEqual(DS.get_demo_checksum(f, "demo_0"), checksum)
+
+    def test_load_manifest(self):
+        self.write_demos(0, ["demo_0", "demo_1"])
+        self.write_demos(1, ["demo_2"])
+        self.assertEqual(
+            self.load_manifest(),
+            {
+                "demo_0": self.shard_paths[0],
+                "demo_1": self.shard_paths[0],
+                "demo_2": self.shard_paths[1],
+            },
+        )
+
+        # last line cut off by a killed worker
+        with open(self.shard_paths[0][:-5] + ".jsonl", "a") as manifest:
+            manifest.write('{"demo": "demo_')
+        self.assertEqual(len(self.load_manifest()), 3)
+
+        # demo changed since it was extracted
+        with h5py.File(self.dataset, "a") as f:
+            f["data/demo_1/states"][0, 0] = -1.0
+        self.assertNotIn("demo_1", self.load_manifest())
+
+        # shard of a worker that was killed while writing
+        with open(self.shard_paths[1], "wb") as f_shard:
+            f_shard.write(b"not an hdf5 file")
+        self.assertEqual(list(self.load_manifest().keys()), ["demo_0"])
+        self.assertFalse(os.path.exists(self.shard_paths[1]))
+        self.assertFalse(os.path.exists(self.shard_paths[1][:-5] + ".jsonl"))
+
+    def test_merge_missing_demos(self):
+        self.write_demos(0, ["demo_0", "demo_1"])
+        demos = ["demo_0", "demo_1", "demo_2"]
+        with mock.patch.object(DS, "finalize_output") as finalize_output:
+            self.assertFalse(
+                DS.merge_shards(self.args, self.shard_dir, self.output_path, demos)
+            )
+            finalize_output.assert_not_called()
+        self.assertFalse(os.path.exists(self.output_path))
+        self.assertEqual(len(self.load_manifest()), 2)
+
+        # only the requested demos are copied
+        with mock.patch.object(DS, "finalize_output"):
+            self.assertTrue(
+                DS.merge_shards(self.args, self.shard_dir, self.output_path, demos[:1])
+            )
+        with h5py.File(self.output_path, "r") as f_out:
+            self.assertEqual(list(f_out["data"].keys()), ["demo_0"])
+
+
+class ReusedObsEnv:
+    """
+    Environment that writes the observations of every state into the same arrays
+    """
+
+    def __init__(self):
+        self.env = self
+        self.obs = dict(image=np.zeros((8, 8, 3), dtype=np.uint8), state=np.zeros(2))
+
+    def get_ep_meta(self):
+        return dict(layout_id=0)
+
+    def reset_to(self, state):
+        self.obs["image"][:] = int(state["states"][0])
+        self.obs["state"][:] = state["states"][:2]
+        return self.obs
+
+    def get_reward(self):
+        return float(self.obs["state"][0])
+
+    def is_success(self):
+        return dict(task=self.obs["state"][0] > 1)
+
+    def serialize(self):
+        return dict(env_name="ReusedObsEnv")
+
+
+class TestExtractTrajectory(unittest.TestCase):
+    def test_reused_obs(self):
+        states = np.arange(12, dtype=float).reshape(4, 3)
+        traj = DS.extract_trajectory(
+            env=ReusedObsEnv(),
+            initial_state=dict(states=states[0], model=""),
+            states=states,
+            actions=np.zeros((4, 2)),
+            done_mode=0,
+        )
+        self.assertEqual(traj["obs"]["image"].shape, (4, 8, 8, 3))
+        self.assertEqual(traj["obs"]["image"].dtype, np.uint8)
+        self.assertTrue(np.array_equal(traj["obs"]["image"][:, 0, 0, 0], [0, 3, 6, 9]))
+        self.assertTrue(np.array_equal(traj["obs"]["state"], states[:, :2]))
+        self.assertTrue(np.array_equal(traj["rewards"], [0, 3, 6, 9]))
+        self.assertTrue(np.array_equal(traj["dones"], [0, 1, 1, 1]))
+
+
+def send_demos(dataset, mul_queue, writer_done, process_num, demos, killed=False):
+    """
+    Worker that sends the trajectories of @demos to the writer, and exits without its sentinel if @killed
+    """
+    with h5py.File(dataset, "r") as f:
+        for ep in demos:
+            item = [ep, make_traj(f, ep), process_num]
+            DS.put_to_writer(mul_queue, item, writer_done, timeout=0.1)
+    if killed:
+        mul_queue.close()
+        mul_queue.join_thread()
+        os._exit(1)
+    DS.put_to_writer(mul_queue, None, writer_done, timeout=0.1)
+
+
+class TestWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dataset = os.path.join(self.tmp_dir.name, "demos.hdf5")
+        write_source_dataset(self.dataset)
+        self.args = argparse.Namespace(
+            dataset=self.dataset, no_compress=False, include_next_obs=False
+        )
+        self.output_path = os.path.join(self.tmp_dir.name, "demos_im128.hdf5")
+        self.mul_queue = multiprocessing.Queue(maxsize=1)
+        self.writer_done = multiprocessing.Event()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, worker_demos, killed):
+        workers = [
+            multiprocessing.Process(
+                target=send_demos,
+                args=(self.dataset, self.mul_queue, self.writer_done, i, demos, killed),
+            )
+            for (i, demos) in enumerate(worker_demos)
+        ]
+        for worker in workers:
+            worker.start()
+        total_samples = multiprocessing.Value("i", 0)
+        try:
+            with mock.patch.object(DS, "finalize_output") as finalize_output:
+                finished = DS.write_traj_to_file(
+                    self.args,
+                    self.output_path,
+                    total_samples,
+                    workers,
+                    self.mul_queue,
+                    self.writer_done,
+                    timeout=0.2,
+                )
+        finally:
+            # workers stop waiting for room in the queue once the writer has stopped
+            for worker in workers:
+                worker.join()
+        self.assertTrue(self.writer_done.is_set())
+        self.assertEqual(finalize_output.called, finished)
+        return finished, total_samples.value
+
+    def test_write(self):
+        finished, total_samples = self.write([["demo_0", "demo_2"], ["demo_1"]], False)
+        self.assertTrue(finished)
+        self.assertEqual(total_samples, 4 + 5 + 6)
+        with h5py.File(self.output_path, "r") as f_out:
+            self.assertEqual(len(f_out["data"]), 3)
+
+    def test_killed_worker(self):
+        finished, total_samples = self.write([["demo_0"], ["demo_1"]], True)
+        self.assertFalse(finished)
+        self.assertEqual(total_samples, 4 + 5)
+
+    def test_writer_failed(self):
+        with mock.patch.object(DS, "write_traj_to_group", side_effect=OSError):
+            with self.assertRaises(Exception):
+                self.write([["demo_0", "demo_2"], ["demo_1"]], False)
+
+    def test_writer_stopped(self):
+        self.mul_queue.put("item")
+        # the writer stops while the worker waits for room in the queue
+        threading.Timer(0.3, self.writer_done.set).start()
+        self.assertFalse(
+            DS.put_to_writer(self.mul_queue, "item", self.writer_done, timeout=0.1)
+        )
+        self.assertEqual(self.mul_queue.get(timeout=1), "item")
+
+
+class TestMultiprocessing(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dataset = os.path.join(self.tmp_dir.name, "demos.hdf5")
+        write_source_dataset(self.dataset)
+        self.args = argparse.Namespace(
+            dataset=self.dataset,
+            output_name="demos_im128.hdf5",
+            filter_key=None,
+            n=None,
+            shaped=False,
+            camera_names=["robot0_agentview_center"],
+            camera_height=128,
+            camera_width=128,
+            done_mode=0,
+            copy_rewards=False,
+            copy_dones=False,
+            no_compress=False,
+            include_next_obs=False,
+            num_procs=2,
+            resume=False,
+            overwrite=False,
+            single_writer=False,
+            queue_size=None,
+            add_datagen_info=False,
+            generative_textures=False,
+            randomize_cameras=False,
+            model_cache=False,
+        )
+        self.output_path = os.path.join(self.tmp_dir.name, "demos_im128.hdf5")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_workers(self, single_writer):
+        self.args.single_writer = single_writer
+        # workers are forked, so that they create the fake environment as well
+        context = multiprocessing.get_context("fork")
+        with mock.patch.object(DS, "multiprocessing", context), mock.patch.object(
+            DS.DatasetUtils,
+            "get_env_metadata_from_dataset",
+            return_value=dict(env_name="ReusedObsEnv", env_kwargs=dict()),
+        ), mock.patch.object(
+            DS.EnvUtils,
+            "create_env_for_data_processing",
+            side_effect=lambda **kwargs: ReusedObsEnv(),
+        ), mock.patch.object(
+            DS, "finalize_output"
+        ) as finalize_output:
+            DS.dataset_states_to_obs_multiprocessing(self.args)
+        self.assertTrue(finalize_output.called)
+
+    def test_all_demos_extracted(self):
+        for single_writer in [False, True]:
+            self.run_workers(single_writer)
+            with h5py.File(self.output_path, "r") as f_out:
+                self.assertEqual(
+                    sorted(f_out["data"].keys()), ["demo_0", "demo_1", "demo_2"]
+                )
+                self.assertTrue(
+                    np.array_equal(f_out["data/demo_2/obs/image"][:, 0, 0, 0], [2] * 6)
+                )
+            self.assertFalse(os.path.exists(DS.get_shard_dir(self.output_path)))
+            os.remove(self.output_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
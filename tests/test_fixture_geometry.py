@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+from robosuite.utils.mjcf_utils import string_to_array
+
+import model_utils  # imports the scene models before the fixture models
+from robocasa.models.fixtures.cabinets import Drawer, HingeCabinet
+from robocasa.utils.object_utils import get_fixtures_bbox_points
+
+
+class TestFixtureGeometry(unittest.TestCase):
+    def test_cache_invalidation(self):
+        fxtr = HingeCabinet(name="cab", size=[0.6, 0.5, 0.7])
+        fxtr.set_pos([1.0, 2.0, 0.5])
+        fxtr.set_euler([0, 0, np.pi / 2])
+        points = fxtr.get_ext_sites(all_points=True, relative=False)
+        self.assertTrue(np.allclose(fxtr.pos, [1.0, 2.0, 0.5]))
+        self.assertTrue(np.allclose(points[0], fxtr.pos + [0.25, -0.3, -0.35]))
+
+        # returned values are copies of the cached geometry
+        fxtr.pos[0] = 10.0
+        points[0][0] = 10.0
+        self.assertEqual(fxtr.pos[0], 1.0)
+        self.assertTrue(
+            np.array_equal(
+                fxtr.get_ext_sites(all_points=True, relative=False)[1], points[1]
+            )
+        )
+
+        fxtr.set_pos([0.0, 0.0, 0.5])
+        fxtr.set_euler([0, 0, 0])
+        self.assertTrue(np.allclose(fxtr.get_bbox_points()[0], [-0.3, -0.25, 0.15]))
+
+        p0 = fxtr.get_int_sites()[0]
+        fxtr.set_bounds_sites({"int_p0": p0 + 0.01})
+        self.assertTrue(np.allclose(fxtr.get_int_sites()[0], p0 + 0.01))
+        self.assertTrue(
+            np.array_equal(
+                fxtr.get_int_sites()[0],
+                string_to_array(fxtr._bounds_sites["int_p0"].get("pos")),
+            )
+        )
+
+    def test_batched_bbox_points(self):
+        fixtures = [
+            HingeCabinet(name="cab", size=[0.6, 0.5, 0.7], pos=[1.0, 0.0, 0.5]),
+            Drawer(name="drawer", size=[0.5, 0.5, 0.2], pos=[0.0, 1.0, 0.1]),
+        ]
+        points = get_fixtures_bbox_points(fixtures)
+        self.assertEqual(points.shape, (2, 8, 3))
+        for fxtr, fxtr_points in zip(fixtures, points):
+            self.assertTrue(
+                np.array_equal(
+                    fxtr_points, fxtr.get_ext_sites(all_points=True, relative=False)
+                )
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
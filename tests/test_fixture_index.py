@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+import model_utils  # imports the scene models before the fixture models
+import robocasa.utils.object_utils as OU
+from robocasa.models.fixtures import Drawer, FixtureType, HingeCabinet
+from robocasa.models.fixtures.fixture_index import FixtureIndex
+
+
+class TestFixtureIndex(unittest.TestCase):
+    def setUp(self):
+        self.fixtures = {
+            "cab_1": HingeCabinet(name="cab_1", size=[0.6, 0.5, 0.7], pos=[0, 0, 0.5]),
+            "drawer": Drawer(name="drawer", size=[0.5, 0.5, 0.2], pos=[1.0, 0, 0.1]),
+            "cab_2": HingeCabinet(name="cab_2", size=[0.6, 0.5, 0.7], pos=[0, 2, 0.5]),
+        }
+        self.fixtures["cab_2"].set_euler([0, 0, np.pi / 2])
+        self.index = FixtureIndex(self.fixtures)
+
+    def test_types(self):
+        self.assertEqual(
+            self.index.get_fixtures_of_type(FixtureType.DRAWER), ["drawer"]
+        )
+        self.assertEqual(
+            self.index.get_fixtures_of_class((HingeCabinet,)), ["cab_1", "cab_2"]
+        )
+
+    def test_queries(self):
+        fixtures = list(self.fixtures.values())
+        for point in [[0.1, 0.2, 0], [1.2, 0.1, 3], [0.2, 2.25, 0], [5, 5, 0]]:
+            expected = [OU.point_in_fixture(point, f, only_2d=True) for f in fixtures]
+            self.assertEqual(
+                self.index.points_in_fixture(point, fixtures).tolist(), expected
+            )
+
+        for ref in fixtures:
+            expected = [OU.fixture_pairwise_dist(ref, f) for f in fixtures]
+            self.assertTrue(np.allclose(self.index.get_dists(ref, fixtures), expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+
+import mujoco
+import numpy as np
+
+from robocasa.utils.cache_utils import (
+    CompiledModelCache,
+    LRUCache,
+    freeze,
+    get_model_xml_hash,
+)
+
+MODEL_XML = """
+<mujoco>
+  <worldbody>
+    <body name="box" pos="0 0 {height}">
+      <freejoint/>
+      <geom type="box" size="0.1 0.1 0.1"/>
+    </body>
+  </worldbody>
+</mujoco>
+"""
+
+
+class TestModelCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = CompiledModelCache(cache_dir=self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_hit_and_miss(self):
+        xml = MODEL_XML.format(height=1.0)
+        model = self.cache.load_or_compile(xml)
+        self.assertEqual(self.cache.num_misses, 1)
+
+        cached_model = self.cache.load_or_compile(xml)
+        self.assertEqual(self.cache.num_hits, 1)
+        self.assertEqual(cached_model.nq, model.nq)
+        self.assertTrue(np.allclose(cached_model.qpos0, model.qpos0))
+
+        self.cache.load_or_compile(MODEL_XML.format(height=2.0))
+        self.assertEqual(self.cache.num_misses, 2)
+
+    def test_corrupt_entry(self):
+        xml = MODEL_XML.format(height=1.0)
+        key = get_model_xml_hash(xml)
+        with open(os.path.join(self.tmp_dir.name, "{}.mjb".format(key)), "wb") as f:
+            f.write(b"not a model")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.load_or_compile(xml)
+        self.assertIsNotNone(self.cache.get(key))
+
+    def test_memory_models(self):
+        cache = CompiledModelCache(cache_dir=self.tmp_dir.name, max_memory_models=1)
+        xml = MODEL_XML.format(height=1.0)
+        model = cache.load_or_compile(xml)
+        model.body_pos[1] = 5.0
+        for fname in os.listdir(self.tmp_dir.name):
+            os.remove(os.path.join(self.tmp_dir.name, fname))
+
+        # served from memory, unaffected by changes to previously returned models
+        cached_model = cache.load_or_compile(xml)
+        self.assertEqual(cache.num_hits, 1)
+        self.assertTrue(np.allclose(cached_model.body_pos[1], [0, 0, 1]))
+
+        cache.load_or_compile(MODEL_XML.format(height=2.0))
+        cache.load_or_compile(xml)
+        self.assertEqual(cache.num_misses, 3)
+
+    def test_eviction(self):
+        model = mujoco.MjModel.from_xml_string(MODEL_XML.format(height=1.0))
+        model_size = mujoco.mj_sizeModel(model)
+        cache = CompiledModelCache(
+            cache_dir=self.tmp_dir.name, max_size_mb=2.5 * model_size / (1024 * 1024)
+        )
+        for i in range(3):
+            cache.put("model_{}".format(i), model)
+            path = os.path.join(self.tmp_dir.name, "model_{}.mjb".format(i))
+            os.utime(path, (i, i))
+        cache.evict()
+        self.assertIsNone(cache.get("model_0"))
+        self.assertIsNotNone(cache.get("model_1"))
+        self.assertIsNotNone(cache.get("model_2"))
+
+
+class TestMemoryCaches(unittest.TestCase):
+    def test_lru_cache(self):
+        cache = LRUCache(max_size=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        self.assertEqual(cache.get("a"), 1)
+        cache["c"] = 3
+        # "b" is the least recently used entry
+        self.assertEqual(list(cache.keys()), ["a", "c"])
+        self.assertIsNone(cache.get("b"))
+
+    def test_freeze(self):
+        config = dict(size=np.array([[1.0, 2.0]]), rgba=[np.float32(0.5)], pos=(0, 1))
+        key = freeze(config)
+        hash(key)
+        self.assertEqual(
+            key, (("pos", (0, 1)), ("rgba", (0.5,)), ("size", ((1.0, 2.0),)))
+        )
+        self.assertEqual(freeze(dict(reversed(list(config.items())))), key)
+
+
+if __name__ == "__main__":
+    unittest.main()
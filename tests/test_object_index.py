@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from robocasa.models.objects.object_index import (
+    ObjectAssetIndex,
+    ObjectFolderManifest,
+)
+
+OBJECT_XML = """
+<mujoco>
+  <worldbody>
+    <body>
+      <site name="bottom_site" pos="0 0 -{half_height}"/>
+      <site name="top_site" pos="0 0 {half_height}"/>
+      <site name="horizontal_radius_site" pos="{radius} {radius} 0"/>
+    </body>
+  </worldbody>
+</mujoco>
+"""
+
+
+class TestObjectIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.base_path = os.path.join(self.tmp_dir.name, "objects")
+        self.index_path = os.path.join(self.tmp_dir.name, "index.json")
+        self.paths = [
+            self.write_object("apple", 0, radius=0.03, half_height=0.04),
+            self.write_object("apple", 1, radius=0.2, half_height=0.04),
+        ]
+        self.obj_categories = dict(
+            apple=dict(objaverse=SimpleNamespace(mjcf_paths=list(self.paths)))
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_object(self, cat, i, radius, half_height):
+        folder = os.path.join(self.base_path, "objaverse", cat, "{}_{}".format(cat, i))
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, "model.xml")
+        with open(path, "w") as f:
+            f.write(OBJECT_XML.format(radius=radius, half_height=half_height))
+        return path
+
+    def create_index(self):
+        return ObjectAssetIndex(
+            self.obj_categories, self.base_path, index_path=self.index_path
+        )
+
+    def test_metadata(self):
+        index = self.create_index()
+        meta = index.get(self.paths[0])
+        self.assertEqual(meta["cat"], "apple")
+        self.assertEqual(meta["reg"], "objaverse")
+        self.assertEqual(meta["split"], "A")
+        self.assertEqual(index.get(self.paths[1])["split"], "B")
+        self.assertTrue(
+            np.allclose(index.get_sizes(self.paths[:1]), [[0.06, 0.06, 0.08]])
+        )
+
+        mask = index.get_size_mask(self.paths, max_size=(0.1, None, None))
+        self.assertEqual(mask.tolist(), [True, False])
+        mask = index.get_size_mask(self.paths, max_size=(0.1, None, None), scale=0.1)
+        self.assertEqual(mask.tolist(), [True, True])
+
+    def test_persist_and_rebuild(self):
+        self.create_index()
+        self.assertTrue(os.path.exists(self.index_path))
+        self.assertEqual(len(self.create_index().objects), 2)
+
+        # changed assets are picked up on load
+        self.write_object("apple", 0, radius=0.5, half_height=0.04)
+        os.utime(self.paths[0], ns=(0, 0))
+        self.paths.append(self.write_object("apple", 2, radius=0.03, half_height=0.04))
+        self.obj_categories["apple"]["objaverse"].mjcf_paths = list(self.paths)
+        index = self.create_index()
+        self.assertEqual(len(index.objects), 3)
+        self.assertTrue(
+            np.allclose(index.get_sizes(self.paths[:1]), [[1.0, 1.0, 0.08]])
+        )
+
+    def test_folder_manifest(self):
+        manifest_path = os.path.join(self.tmp_dir.name, "manifest.json")
+        manifest = ObjectFolderManifest(self.base_path, manifest_path=manifest_path)
+        self.assertEqual(manifest.get_models("objaverse/apple"), self.paths)
+        self.assertEqual(manifest.get_models("objaverse/banana"), [])
+
+        # persisted listings are reused until the folder changes
+        manifest = ObjectFolderManifest(self.base_path, manifest_path=manifest_path)
+        self.assertIn("objaverse/apple", manifest.folders)
+        new_path = self.write_object("apple", 2, radius=0.03, half_height=0.04)
+        os.utime(os.path.dirname(os.path.dirname(new_path)), ns=(0, 0))
+        self.assertEqual(
+            manifest.get_models("objaverse/apple"), self.paths + [new_path]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+
+import numpy as np
+from robosuite.models.world import MujocoWorldBase
+from robosuite.utils.binding_utils import MjSim
+
+from model_utils import write_box_object
+from robocasa.environments.kitchen.single_stage.kitchen_pnp import PnPCounterToCab
+from robocasa.models.fixtures import HingeCabinet
+from robocasa.models.objects.objects import MJCFObject
+
+
+class PooledPnPCounterToCab(PnPCounterToCab):
+    """
+    Pick and place task whose objects are built from a box model instead of the object registries
+    """
+
+    OBJECT_TASK_ATTRS = ["box_sizes"]
+
+    def _get_obj_cfgs(self):
+        # sampled in place, so each object set needs its own copy
+        self.box_sizes[:] = self.rng.uniform(size=2)
+        return [
+            dict(name="obj", placement=dict()),
+            dict(name="distr", placement=dict()),
+        ]
+
+    def _create_obj(self, cfg):
+        obj = MJCFObject(
+            name=cfg["name"] + self._object_name_suffix, mjcf_path=self.mjcf_path
+        )
+        return obj, dict()
+
+
+class TestObjectPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        mjcf_path = write_box_object(self.tmp_dir.name)
+
+        world = MujocoWorldBase()
+        world.worldbody.append(
+            ET.Element("site", name="gripper", pos="1 1 1", size="0.01")
+        )
+
+        def merge_objects(objects):
+            for obj in objects:
+                world.worldbody.append(obj.get_obj())
+                world.merge_assets(obj)
+
+        # environment state that _load_model would set up before creating the object pool
+        env = PooledPnPCounterToCab.__new__(PooledPnPCounterToCab)
+        env.mjcf_path = mjcf_path
+        env.model = SimpleNamespace(merge_objects=merge_objects)
+        env._ep_meta = {}
+        env.object_pool_size = 3
+        env._object_name_suffix = ""
+        env._object_states = None
+        env.fixtures = {}
+        env.rng = np.random.default_rng(0)
+        env.box_sizes = np.zeros(2)
+        env.cab = HingeCabinet(name="cab", size=[0.6, 0.5, 0.7], pos=[0, 0, 0.5])
+        env._create_object_pool()
+
+        env.sim = MjSim.from_xml_string(world.get_xml())
+        env.robots = [
+            SimpleNamespace(
+                eef_site_id={"right": env.sim.model.site_name2id("gripper")}
+            )
+        ]
+        self.env = env
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_check_success(self):
+        env = self.env
+        for set_idx in [1, 2, 0]:
+            env._activate_object_set(set_idx)
+            env._object_states = None
+            env._setup_object_references()
+
+            obj = env.objects["obj"]
+            self.assertEqual(env.obj_body_id[obj.name], env.obj_body_id["obj"])
+            self.assertEqual(
+                env.sim.model.body_id2name(env.obj_body_id["obj"]), obj.root_body
+            )
+            for (pos, success) in [([0, 0, 0.5], True), ([2, 0, 0.5], False)]:
+                env.sim.data.set_joint_qpos(obj.joints[0], np.array(pos + [1, 0, 0, 0]))
+                env.sim.forward()
+                self.assertEqual(env._check_success(), success)
+
+    def test_task_attrs(self):
+        env = self.env
+        box_sizes = []
+        for set_idx in range(3):
+            env._activate_object_set(set_idx)
+            box_sizes.append(env.box_sizes.copy())
+            # changed during the episode
+            env.box_sizes[:] = 0
+        self.assertEqual(len({tuple(sizes) for sizes in box_sizes}), 3)
+        for set_idx in [1, 2, 0]:
+            env._activate_object_set(set_idx)
+            self.assertTrue(np.array_equal(env.box_sizes, box_sizes[set_idx]))
+
+
+if __name__ == "__main__":
+    unittest.main()
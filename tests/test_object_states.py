@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+
+from robosuite.models.world import MujocoWorldBase
+from robosuite.utils.binding_utils import MjSim
+
+from model_utils import write_box_object
+import robocasa.utils.object_utils as OU
+from robocasa.models.fixtures import HingeCabinet
+from robocasa.models.objects.objects import MJCFObject
+from robocasa.utils.object_states import ObjectStates
+
+
+class TestObjectStates(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        mjcf_path = write_box_object(self.tmp_dir.name)
+
+        world = MujocoWorldBase()
+        world.worldbody.append(
+            ET.Element("site", name="gripper", pos="0.1 0 0.6", size="0.01")
+        )
+        objects = {}
+        for i in range(6):
+            obj = MJCFObject(name="obj{}".format(i), mjcf_path=mjcf_path)
+            obj_body = obj.get_obj()
+            obj_body.set("pos", "{} {} {}".format(0.12 * i - 0.3, 0.03 * i, 0.3))
+            world.worldbody.append(obj_body)
+            world.merge_assets(obj)
+            objects[obj.name] = obj
+        sim = MjSim.from_xml_string(world.get_xml())
+
+        cab = HingeCabinet(name="cab", size=[0.6, 0.5, 0.7], pos=[0, 0, 0.5])
+        self.env = SimpleNamespace(
+            sim=sim,
+            objects=objects,
+            obj_body_id={
+                name: sim.model.body_name2id(obj.root_body)
+                for (name, obj) in objects.items()
+            },
+            robots=[
+                SimpleNamespace(
+                    eef_site_id={"right": sim.model.site_name2id("gripper")}
+                )
+            ],
+            get_fixture=lambda fixture_id: cab,
+        )
+        self.states = ObjectStates(self.env)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_matches_object_utils(self):
+        batched_env = SimpleNamespace(object_states=self.states, **vars(self.env))
+        outcomes = set()
+        for _ in range(100):
+            self.env.sim.step()
+            outcomes.update(self.states.inside_of(self.env.get_fixture("cab")).tolist())
+            for obj_name in self.env.objects:
+                for partial_check in [False, True]:
+                    self.assertEqual(
+                        OU.obj_inside_of(batched_env, obj_name, "cab", partial_check),
+                        OU.obj_inside_of(self.env, obj_name, "cab", partial_check),
+                    )
+                self.assertEqual(
+                    OU.gripper_obj_far(batched_env, obj_name, th=0.3),
+                    OU.gripper_obj_far(self.env, obj_name, th=0.3),
+                )
+                self.assertAlmostEqual(
+                    OU.obj_cos(batched_env, obj_name, ref=(1, 0, 1)),
+                    OU.obj_cos(self.env, obj_name, ref=(1, 0, 1)),
+                    places=6,
+                )
+        self.assertEqual(outcomes, {True, False})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from robocasa.models.objects.objects import MJCFObject
+
+OBJECT_XML = """
+<mujoco model="box">
+  <asset>
+    <mesh file="visual/model_0.obj" name="model_0"/>
+  </asset>
+  <worldbody>
+    <body>
+      <body name="object">
+        <geom type="mesh" mesh="model_0" group="1" contype="0" conaffinity="0"/>
+        <geom type="box" size="0.05 0.05 0.05" group="0"/>
+      </body>
+      <site name="bottom_site" pos="0 0 -0.05" size="0.002"/>
+      <site name="top_site" pos="0 0 0.05" size="0.002"/>
+      <site name="horizontal_radius_site" pos="0.05 0.05 0" size="0.002"/>
+    </body>
+  </worldbody>
+</mujoco>
+"""
+
+
+class TestObjectTemplates(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mjcf_path = os.path.join(self.tmp_dir.name, "model.xml")
+        with open(self.mjcf_path, "w") as f:
+            f.write(OBJECT_XML)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_copies_are_independent(self):
+        obj_a = MJCFObject(name="obj", mjcf_path=self.mjcf_path, scale=[1.0, 1.0, 2.0])
+        obj_b = MJCFObject(
+            name="distr", mjcf_path=self.mjcf_path, scale=[1.0, 1.0, 2.0]
+        )
+
+        self.assertEqual(obj_a.root_body, "obj_main")
+        self.assertEqual(obj_b.root_body, "distr_main")
+        self.assertAlmostEqual(obj_a.top_offset[2], 0.1)
+        self.assertAlmostEqual(obj_b.top_offset[2], 0.1)
+
+        # no element of one object is shared with the other
+        elems_a = set(map(id, obj_a.root.iter()))
+        self.assertTrue(all(id(e) not in elems_a for e in obj_b.root.iter()))
+        self.assertNotIn(b"obj_", ET.tostring(obj_b.root))
+
+        # asset paths are resolved relative to the asset folder
+        mesh = obj_b.asset.find("mesh")
+        self.assertEqual(
+            mesh.get("file"),
+            os.path.join(os.path.abspath(self.tmp_dir.name), "visual/model_0.obj"),
+        )
+
+    def test_no_temp_files(self):
+        MJCFObject(name="obj", mjcf_path=self.mjcf_path, density=10)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["model.xml"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import tempfile
+import unittest
+
+import numpy as np
+from robosuite.utils.errors import RandomizationError
+
+from model_utils import write_box_object
+from robocasa.models.objects.objects import MJCFObject
+from robocasa.utils.object_utils import obj_in_region, objs_intersect
+from robocasa.utils.placement_samplers import (
+    OccupancyGridSampler,
+    UniformRandomSampler,
+)
+
+
+class TestUniformRandomSampler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        mjcf_path = write_box_object(self.tmp_dir.name)
+        self.objs = [
+            MJCFObject(name="obj{}".format(i), mjcf_path=mjcf_path) for i in range(12)
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _sample(self, batch_size, rotation, seed):
+        rng = np.random.default_rng(seed)
+        placed_objects = {}
+        for obj in self.objs:
+            sampler = UniformRandomSampler(
+                name="sampler",
+                mujoco_objects=obj,
+                x_range=(-0.25, 0.25),
+                y_range=(-0.2, 0.2),
+                rotation=rotation,
+                reference_pos=(1.0, 2.0, 0.9),
+                reference_rot=0.5,
+                rng=rng,
+                batch_size=batch_size,
+            )
+            placed_objects = sampler.sample(placed_objects=placed_objects)
+        return placed_objects, rng.random()
+
+    def test_batched_matches_sequential(self):
+        for rotation in [None, (-0.5, 0.5), np.pi / 2]:
+            for seed in range(2):
+                placements, next_draw = self._sample(1, rotation, seed)
+                batched_placements, batched_next_draw = self._sample(64, rotation, seed)
+                self.assertEqual(next_draw, batched_next_draw)
+                for name, (pos, quat, _) in placements.items():
+                    batched_pos, batched_quat, _ = batched_placements[name]
+                    self.assertTrue(np.array_equal(pos, batched_pos))
+                    self.assertTrue(np.array_equal(quat, batched_quat))
+
+
+class TestOccupancyGridSampler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mjcf_path = write_box_object(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _make_sampler(self, obj, size, rng):
+        return OccupancyGridSampler(
+            name="sampler",
+            mujoco_objects=obj,
+            x_range=(-size / 2, size / 2),
+            y_range=(-size / 2, size / 2),
+            rotation=None,
+            reference_pos=(1.0, 2.0, 0.9),
+            reference_rot=0.5,
+            rng=rng,
+        )
+
+    def test_placements_are_valid(self):
+        rng = np.random.default_rng(0)
+        placed_objects = {}
+        for i in range(15):
+            obj = MJCFObject(name="obj{}".format(i), mjcf_path=self.mjcf_path)
+            sampler = self._make_sampler(obj, 0.4, rng)
+            placed_objects = sampler.sample(placed_objects=placed_objects)
+
+        p0, px, py = sampler._get_region_points(np.array([1.0, 2.0, 0.9]))
+        placements = list(placed_objects.values())
+        for i, (pos, quat, obj) in enumerate(placements):
+            quat = np.array(quat)[[1, 2, 3, 0]]
+            self.assertTrue(obj_in_region(obj, pos, quat, p0, px, py))
+            for other_pos, other_quat, other_obj in placements[:i]:
+                self.assertFalse(
+                    objs_intersect(
+                        obj,
+                        pos,
+                        quat,
+                        other_obj,
+                        other_pos,
+                        np.array(other_quat)[[1, 2, 3, 0]],
+                    )
+                )
+
+    def test_infeasible(self):
+        obj = MJCFObject(name="obj", mjcf_path=self.mjcf_path)
+        sampler = self._make_sampler(obj, 0.03, np.random.default_rng(0))
+        with self.assertRaises(RandomizationError):
+            sampler.sample()
+
+
+if __name__ == "__main__":
+    unittest.main()
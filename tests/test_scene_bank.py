@@ -0,0 +1,186 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from robosuite.controllers import load_composite_controller_config
+
+from model_utils import replace_missing_assets, write_box_object
+from robocasa.environments.kitchen.kitchen import Kitchen
+from robocasa.environments.kitchen.single_stage.kitchen_pnp import PnPCounterToCab
+from robocasa.models.objects.objects import MJCFObject
+from robocasa.utils.scene_bank import SceneBank, get_json_attrs
+
+
+def get_robot_pos(env):
+    robot_model = env.robots[0].robot_model
+    return np.array(
+        env.sim.data.body_xpos[env.sim.model.body_name2id(robot_model.root_body)]
+    )
+
+
+class BoxPnPCounterToCab(PnPCounterToCab):
+    """
+    Pick and place task with a box object, which samples task attributes along with its object
+    """
+
+    OBJECT_TASK_ATTRS = ["num_boxes", "box_sizes"]
+
+    def __init__(self, mjcf_path, *args, **kwargs):
+        self.mjcf_path = mjcf_path
+        super().__init__(*args, **kwargs)
+
+    def _get_obj_cfgs(self):
+        self.num_boxes = self.rng.choice([1, 2, 3])
+        self.box_sizes = self.rng.uniform(size=2).tolist()
+        return [
+            dict(
+                name="obj",
+                placement=dict(
+                    fixture=self.counter,
+                    sample_region_kwargs=dict(ref=self.cab),
+                    size=(0.6, 0.3),
+                    pos=(0, -1.0),
+                ),
+            )
+        ]
+
+    def _create_obj(self, cfg):
+        obj = MJCFObject(
+            name=cfg["name"] + self._object_name_suffix, mjcf_path=self.mjcf_path
+        )
+        return obj, dict(mjcf_path=self.mjcf_path, cat="box")
+
+    def edit_model_xml(self, xml_str):
+        return replace_missing_assets(super().edit_model_xml(xml_str))
+
+
+class TestSceneBank(unittest.TestCase):
+    def test_write_and_load(self):
+        entries = [
+            dict(
+                ep_meta=dict(layout_id=i, style_id=0, object_cfgs=[]),
+                fixture_placements=dict(coffee_machine=([i, 0, 0.9], [1, 0, 0, 0])),
+                robot_base=dict(pos="0 0 0", quat=None),
+                task_attrs=get_json_attrs(
+                    dict(num_food=np.int64(i), food_names=["apple"] * i, rng=None)
+                ),
+                states=np.arange(5 + i, dtype=float),
+            )
+            for i in range(3)
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "bank.hdf5")
+            SceneBank.write(path, entries, env_name="Kitchen", env_kwargs=dict(seed=0))
+            bank = SceneBank(path)
+
+        self.assertEqual(len(bank), 3)
+        self.assertEqual(bank.env_name, "Kitchen")
+        self.assertEqual(bank.env_kwargs, dict(seed=0))
+        for (i, entry) in enumerate(bank.entries):
+            self.assertEqual(entry["ep_meta"]["layout_id"], i)
+            self.assertEqual(
+                entry["task_attrs"],
+                dict(num_food=i, food_names=["apple"] * i, rng=None),
+            )
+            self.assertIsNone(entry["robot_base"]["quat"])
+            self.assertEqual(
+                entry["fixture_placements"]["coffee_machine"],
+                [[i, 0, 0.9], [1, 0, 0, 0]],
+            )
+            self.assertTrue(np.array_equal(entry["states"], entries[i]["states"]))
+
+    def test_invalid_task_attrs(self):
+        for value in [np.zeros(2), (1, 2), {1: "a"}, object()]:
+            with self.assertRaises(ValueError):
+                get_json_attrs(dict(num_food=1, value=value))
+
+    def test_reset_from_scene_bank(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mjcf_path = write_box_object(tmp_dir)
+            env_kwargs = dict(
+                mjcf_path=mjcf_path,
+                robots="PandaOmron",
+                controller_configs=load_composite_controller_config(
+                    controller=None, robot="PandaOmron"
+                ),
+                has_renderer=False,
+                has_offscreen_renderer=False,
+                use_camera_obs=False,
+                layout_ids=0,
+                style_ids=0,
+            )
+
+            env = BoxPnPCounterToCab(seed=0, **env_kwargs)
+            entries = []
+            episodes = []
+            for _ in range(2):
+                env.reset()
+                entries.append(env.get_scene_bank_entry())
+                episodes.append(
+                    dict(
+                        # stored as json in the scene bank
+                        ep_meta=json.loads(json.dumps(env.get_ep_meta())),
+                        task_attrs=(env.num_boxes, env.box_sizes),
+                        obj_pos=np.array(
+                            env.sim.data.body_xpos[env.obj_body_id["obj"]]
+                        ),
+                        robot_pos=get_robot_pos(env),
+                    )
+                )
+            env.close()
+            self.assertNotEqual(episodes[0]["task_attrs"], episodes[1]["task_attrs"])
+            path = os.path.join(tmp_dir, "bank.hdf5")
+            SceneBank.write(
+                path,
+                entries,
+                env_name="BoxPnPCounterToCab",
+                env_kwargs=dict(robots="PandaOmron"),
+            )
+
+            bank_env = BoxPnPCounterToCab(seed=1, scene_bank=path, **env_kwargs)
+            compute_pose = bank_env.compute_robot_base_placement_pose
+            for _ in range(2):
+                # the robot placement of the episode is restored, not computed again
+                with mock.patch.object(
+                    bank_env,
+                    "compute_robot_base_placement_pose",
+                    side_effect=lambda **kwargs: (
+                        compute_pose(**kwargs)[0] + [0.5, 0, 0],
+                        compute_pose(**kwargs)[1],
+                    ),
+                ):
+                    bank_env.reset()
+                episode = episodes[bank_env._scene_bank_idx - 1]
+                self.assertEqual(
+                    json.loads(json.dumps(bank_env.get_ep_meta())), episode["ep_meta"]
+                )
+                self.assertEqual(
+                    (bank_env.num_boxes, bank_env.box_sizes), episode["task_attrs"]
+                )
+                obj_pos = bank_env.sim.data.body_xpos[bank_env.obj_body_id["obj"]]
+                self.assertTrue(np.allclose(obj_pos, episode["obj_pos"]))
+                self.assertTrue(
+                    np.allclose(get_robot_pos(bank_env), episode["robot_pos"])
+                )
+
+            # mismatched scene banks are rejected before the scene is rebuilt
+            for (env_name, robots) in [
+                ("PnPCounterToSink", "PandaOmron"),
+                ("BoxPnPCounterToCab", "PandaMobile"),
+            ]:
+                SceneBank.write(
+                    path, entries, env_name=env_name, env_kwargs=dict(robots=robots)
+                )
+                bank_env.scene_bank = SceneBank(path)
+                with mock.patch.object(Kitchen, "_load_model") as load_model:
+                    with self.assertRaises(ValueError):
+                        bank_env.reset()
+                self.assertFalse(load_model.called)
+            bank_env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import json
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from robosuite.environments.manipulation.manipulation_env import ManipulationEnv
+
+import model_utils  # imports the scene models before the fixture models
+from robocasa.environments.kitchen.kitchen import Kitchen
+from robocasa.models.fixtures import Microwave
+from robocasa.utils.robomimic.robomimic_env_wrapper import EnvRobocasa
+
+
+class SceneEnv:
+    """
+    Environment that counts how often its scene is loaded from an xml and how often it is reset in place
+    """
+
+    generative_textures = None
+
+    def __init__(self):
+        self.sim = SimpleNamespace(
+            reset=lambda: None,
+            set_state_from_flattened=lambda state: None,
+            forward=lambda: None,
+        )
+        self.deterministic_reset = False
+        self.num_loads = 0
+        self.num_soft_resets = 0
+        self._ep_meta = {}
+
+    def set_ep_meta(self, ep_meta):
+        self._ep_meta = ep_meta
+
+    def unset_ep_meta(self):
+        self._ep_meta = {}
+
+    def edit_model_xml(self, xml):
+        return xml
+
+    def reset(self):
+        if self.deterministic_reset:
+            self.num_soft_resets += 1
+        return {}
+
+    def reset_from_xml_string(self, xml):
+        self.num_loads += 1
+        # a new sim is created for every loaded scene
+        self.sim = SimpleNamespace(**vars(self.sim))
+
+
+def make_state(model, layout_id):
+    return dict(
+        model=model, ep_meta=json.dumps(dict(layout_id=layout_id)), states=np.zeros(2)
+    )
+
+
+class TestSceneReuse(unittest.TestCase):
+    def setUp(self):
+        wrapper = EnvRobocasa.__new__(EnvRobocasa)
+        wrapper.env = SceneEnv()
+        wrapper.env_lang = None
+        wrapper._is_v1 = True
+        wrapper._scene_key = None
+        wrapper._scene_sim = None
+        wrapper.get_observation = lambda di=None: dict()
+        self.wrapper = wrapper
+
+    def test_scene_key(self):
+        key = self.wrapper._get_scene_key(make_state("<mujoco/>", 0))
+        self.assertEqual(self.wrapper._get_scene_key(make_state("<mujoco/>", 0)), key)
+        self.assertNotEqual(
+            self.wrapper._get_scene_key(make_state("<mujoco/>", 1)), key
+        )
+        self.assertNotEqual(
+            self.wrapper._get_scene_key(make_state("<mujoco model='a'/>", 0)), key
+        )
+
+        # textures sampled per episode are not part of the model xml
+        self.wrapper.env.generative_textures = "100p"
+        self.assertIsNone(self.wrapper._get_scene_key(make_state("<mujoco/>", 0)))
+
+    def test_reset_to(self):
+        env = self.wrapper.env
+        self.wrapper.reset_to(make_state("<mujoco/>", 0))
+        self.wrapper.reset_to(make_state("<mujoco/>", 0))
+        self.assertEqual((env.num_loads, env.num_soft_resets), (1, 1))
+        self.assertFalse(env.deterministic_reset)
+
+        self.wrapper.reset_to(make_state("<mujoco/>", 1))
+        self.assertEqual((env.num_loads, env.num_soft_resets), (2, 1))
+
+        # the scene is loaded again after the environment has been reset
+        self.wrapper.reset()
+        self.wrapper.reset_to(make_state("<mujoco/>", 1))
+        self.assertEqual((env.num_loads, env.num_soft_resets), (3, 1))
+
+    def test_fixture_internal_state(self):
+        microwave = Microwave(xml="fixtures/microwaves/standard", name="microwave")
+        env = Kitchen.__new__(Kitchen)
+        env.fixtures = dict(microwave=microwave)
+        env._init_fixture_states = {"microwave": microwave.get_internal_state()}
+        env.deterministic_reset = True
+        env.placement_initializer = None
+        env.texture_randomization = None
+        env._scene_bank_entry = None
+
+        # turned on during the last episode of the reused scene
+        microwave._turned_on = True
+        with mock.patch.object(ManipulationEnv, "_reset_internal"):
+            with mock.patch.object(Kitchen, "_settle_objects"):
+                env._reset_internal()
+        self.assertFalse(microwave.get_state()["turned_on"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+import numpy as np
+from robosuite.models.world import MujocoWorldBase
+from robosuite.utils.binding_utils import MjSim
+
+from model_utils import replace_missing_assets
+from robocasa.models.fixtures import Sink, Stove
+from robocasa.models.fixtures.site_toggles import SiteToggles
+
+
+class TestSiteToggles(unittest.TestCase):
+    def setUp(self):
+        self.fixtures = {
+            "stove": Stove(xml="fixtures/stoves/basic_sleek_induc", name="stove"),
+            "sink": Sink(xml="fixtures/sinks/2_bins_stainless", name="sink"),
+        }
+        world = MujocoWorldBase()
+        # free joint in front of the fixture joints, so that joint ids and qpos addresses differ
+        body = ET.Element("body", name="box")
+        body.append(ET.Element("freejoint"))
+        body.append(ET.Element("geom", type="box", size="0.1 0.1 0.1"))
+        world.worldbody.append(body)
+        for fxtr in self.fixtures.values():
+            world.worldbody.append(fxtr.get_obj())
+            world.merge_assets(fxtr)
+        self.sim = MjSim.from_xml_string(replace_missing_assets(world.get_xml()))
+        for fxtr in self.fixtures.values():
+            fxtr.setup_references(self.sim)
+        self.env = type("Env", (), {"sim": self.sim})()
+
+    def test_matches_update_state(self):
+        toggles = SiteToggles(self.sim, self.fixtures)
+        self.assertEqual(toggles.fixture_names, {"stove", "sink"})
+
+        rng = np.random.default_rng(0)
+        angles = [0.0, 0.35, 0.40, np.pi, 2 * np.pi - 0.35, -0.5, 7.0]
+        for _ in range(50):
+            qpos = self.sim.data.qpos
+            qpos[7:] = rng.choice(angles, size=len(qpos) - 7)
+            qpos[7:] += rng.choice([0.0, 1e-3], size=len(qpos) - 7)
+            for fxtr in self.fixtures.values():
+                fxtr.update_state(self.env)
+            expected = np.array(self.sim.model.site_rgba[:, 3])
+
+            self.sim.model.site_rgba[:, 3] = -1.0
+            toggles.update()
+            toggled = self.sim.model.site_rgba[:, 3] != -1.0
+            self.assertEqual(np.sum(toggled), 6)
+            self.assertTrue(
+                np.array_equal(self.sim.model.site_rgba[toggled, 3], expected[toggled])
+            )
+            self.sim.model.site_rgba[~toggled, 3] = expected[~toggled]
+
+        knobs_state = self.fixtures["stove"].get_knobs_state(self.env)
+        self.assertEqual(len(knobs_state), 5)
+        self.assertEqual(
+            self.fixtures["sink"].get_handle_state(self.env)["handle_joint"],
+            self.sim.data.get_joint_qpos("sink_handle_joint") % (2 * np.pi),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
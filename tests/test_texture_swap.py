@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+import mujoco
+import numpy as np
+from PIL import Image
+
+from robocasa.utils.texture_swap import (
+    TEXTURES_DIR,
+    TextureSwapper,
+    get_random_textures,
+    get_texture_path,
+)
+
+MODEL_XML = """
+<mujoco>
+  <asset>
+    <texture name="floor_replacement_texture" type="2d" file="{floor}"/>
+    <texture name="cab_replacement_texture_cube" type="cube" file="{cab}"/>
+    <material name="floor" texture="floor_replacement_texture"/>
+    <material name="cab" texture="cab_replacement_texture_cube"/>
+  </asset>
+  <worldbody>
+    <geom type="plane" size="1 1 1" material="floor"/>
+    <geom type="box" size="1 1 1" material="cab"/>
+  </worldbody>
+</mujoco>
+"""
+
+BUILTIN_MODEL_XML = """
+<mujoco>
+  <asset>
+    <texture name="floor_replacement_texture" type="2d" builtin="flat" width="8" height="8"/>
+  </asset>
+</mujoco>
+"""
+
+
+class TestTextureSwapper(unittest.TestCase):
+    def test_swap(self):
+        rng = np.random.default_rng(0)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = dict()
+            for (name, shape) in [
+                ("floor", (8, 12, 3)),
+                ("cab", (8, 8, 3)),
+                ("new_floor", (16, 24, 3)),
+                ("new_cab", (4, 4, 4)),
+            ]:
+                paths[name] = os.path.join(tmp_dir, name + ".png")
+                img = rng.integers(0, 256, size=shape, dtype=np.uint8)
+                Image.fromarray(img).save(paths[name])
+
+            model = mujoco.MjModel.from_xml_string(
+                MODEL_XML.format(floor=paths["floor"], cab=paths["cab"])
+            )
+            swapper = TextureSwapper(
+                model, textures=dict(floor_tex=paths["floor"], cab_tex=paths["cab"])
+            )
+            self.assertEqual(swapper.slots["counter_tex"], [])
+
+            # unchanged textures are skipped
+            self.assertEqual(swapper.swap(dict(floor_tex=paths["floor"])), [])
+
+            tex_data = model.tex_data.copy()
+            tex_ids = swapper.swap(
+                dict(floor_tex=paths["new_floor"], cab_tex=paths["new_cab"])
+            )
+            self.assertEqual(sorted(tex_ids), [0, 1])
+
+            # the floor texture is resized to the compiled texture size
+            new_floor = np.asarray(Image.open(paths["new_floor"]))[1::2, 1::2]
+            floor = model.tex_data[: model.tex_adr[1]].reshape(8, 12, 3)
+            self.assertTrue(np.array_equal(floor, new_floor))
+            # alpha is dropped for rgb textures
+            new_cab = np.asarray(Image.open(paths["new_cab"]))[:, :, :3]
+            cab = model.tex_data[model.tex_adr[1] :].reshape(8, 8, 3)
+            self.assertTrue(np.array_equal(cab[::2, ::2], new_cab))
+            self.assertEqual(model.tex_data.shape, tex_data.shape)
+
+    def test_texture_paths(self):
+        textures = get_random_textures(np.random.default_rng(0))
+        for texture in textures.values():
+            self.assertFalse(os.path.isabs(texture))
+        self.assertEqual(
+            get_texture_path(textures["floor_tex"]),
+            os.path.join(TEXTURES_DIR, textures["floor_tex"]),
+        )
+        # absolute paths of older datasets, recorded on another machine
+        self.assertEqual(
+            get_texture_path("/data/robocasa/assets/generative_textures/wall/a.png"),
+            os.path.join(TEXTURES_DIR, "wall", "a.png"),
+        )
+        self.assertEqual(get_texture_path("/data/floor.png"), "/data/floor.png")
+
+        # textures are compared by name, before their paths are resolved
+        model = mujoco.MjModel.from_xml_string(BUILTIN_MODEL_XML)
+        swapper = TextureSwapper(model, textures=textures)
+        self.assertEqual(swapper.swap(textures), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
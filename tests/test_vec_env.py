@@ -0,0 +1,266 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+import numpy as np
+import robosuite
+
+from robocasa.utils.vec_env import ShmemVectorEnv, _WorkerEnvs
+
+
+class DummyEnv:
+    """
+    Environment with image and state observations, whose episodes end after @horizon steps
+    """
+
+    def __init__(self, seed, horizon=5, image_size=32, reset_delay=0.0):
+        self.seed = seed
+        self.horizon = horizon
+        self.image_size = image_size
+        self.reset_delay = reset_delay
+        self.action_spec = (-np.ones(3), np.ones(3))
+        self.num_resets = 0
+        self.rng = np.random.default_rng(seed)
+        self.noise = 0.0
+
+    def _get_observations(self):
+        image = np.full((self.image_size, self.image_size, 3), self.t, dtype=np.uint8)
+        image[0, 0] = self.seed
+        obs = {
+            "image": image,
+            "state": np.array(
+                [self.seed, self.t, self.num_resets, self.noise], dtype=float
+            ),
+        }
+        if self.num_resets == 3:
+            # observation keys can change across episodes, e.g. when the objects of a task change
+            obs["extra"] = np.zeros(2)
+        return obs
+
+    def reset(self):
+        time.sleep(self.reset_delay)
+        self.t = 0
+        self.num_resets += 1
+        self.noise = self.rng.random()
+        return self._get_observations()
+
+    def step(self, action):
+        self.t += 1
+        reward = float(np.sum(action))
+        done = self.t >= self.horizon
+        return self._get_observations(), reward, done, {"t": self.t}
+
+    def close(self):
+        pass
+
+
+# creates and closes a vectorized env in a separate process, whose stderr shows resource tracker errors
+SHM_SCRIPT = """
+import functools
+import sys
+
+import numpy as np
+
+sys.path.insert(0, {tests_dir!r})
+from test_vec_env import DummyEnv
+from robocasa.utils.vec_env import ShmemVectorEnv
+
+if __name__ == "__main__":
+    vec_env = ShmemVectorEnv([functools.partial(DummyEnv, i) for i in range(2)], context={context!r})
+    vec_env.reset()
+    vec_env.step(np.zeros((2, 3)))
+    print(" ".join(obs_buffer.shm.name for obs_buffer in vec_env._obs_buffers))
+    vec_env.close()
+"""
+
+
+def make_rendering_env():
+    env = DummyEnv(0)
+    env.use_camera_obs = True
+    return env
+
+
+class TestShmemVectorEnv(unittest.TestCase):
+    def test_matches_local_envs(self):
+        env_fns = [
+            lambda seed=seed: DummyEnv(
+                seed, horizon=4 + seed, image_size=32 * (seed + 1)
+            )
+            for seed in range(3)
+        ]
+        vec_env = ShmemVectorEnv(env_fns, auto_reset=True)
+        local_envs = [env_fn() for env_fn in env_fns]
+        try:
+            self.assertEqual(len(vec_env), 3)
+            self.assertEqual(vec_env.get_env_attr("seed"), [0, 1, 2])
+            self.assertEqual(vec_env.get_env_attr("seed", id=1), [1])
+
+            def check_obs(obs, expected):
+                self.assertEqual(len(obs), len(expected))
+                for o, e in zip(obs, expected):
+                    self.assertEqual(set(o.keys()), set(e.keys()))
+                    for key in e:
+                        self.assertTrue(np.array_equal(o[key], e[key]))
+                        self.assertEqual(o[key].dtype, e[key].dtype)
+
+            check_obs(vec_env.reset(), [env.reset() for env in local_envs])
+            num_dones = 0
+            for step in range(20):
+                actions = np.full((3, 3), step / 10.0)
+                obs, rewards, dones, infos = vec_env.step(actions)
+                expected_obs = []
+                for i, env in enumerate(local_envs):
+                    env_obs, reward, done, info = env.step(actions[i])
+                    self.assertEqual(rewards[i], reward)
+                    self.assertEqual(dones[i], done)
+                    self.assertEqual(infos[i]["t"], info["t"])
+                    if done:
+                        check_obs([infos[i]["final_observation"]], [env_obs])
+                        env_obs = env.reset()
+                    expected_obs.append(env_obs)
+                check_obs(obs, expected_obs)
+                num_dones += np.sum(dones)
+
+                # some of the workers are stepped on their own
+                obs, _, _, _ = vec_env.step(actions[:1], id=[2])
+                env_obs, _, done, _ = local_envs[2].step(actions[0])
+                if done:
+                    env_obs = local_envs[2].reset()
+                check_obs(obs, [env_obs])
+            self.assertGreater(num_dones, 3)
+        finally:
+            vec_env.close()
+
+    def test_async(self):
+        env_fns = [lambda seed=seed: DummyEnv(seed, horizon=3) for seed in range(3)]
+        vec_env = ShmemVectorEnv(env_fns)
+        try:
+            vec_env.reset_async()
+            obs = vec_env.reset_wait(id=[2, 0])
+            self.assertEqual([o["state"][0] for o in obs], [2, 0])
+            self.assertEqual(len(vec_env.reset_wait()), 1)
+
+            vec_env.step_async(np.zeros((2, 3)), id=[0, 1])
+            with self.assertRaises(RuntimeError):
+                vec_env.step_async(np.zeros((1, 3)), id=[0])
+            ready = []
+            while len(ready) < 2:
+                ids = vec_env.get_ready()
+                vec_env.step_wait(id=ids)
+                ready += ids
+            self.assertEqual(sorted(ready), [0, 1])
+            self.assertTrue(np.all(vec_env.step_times[:2] >= 0))
+            self.assertTrue(np.isnan(vec_env.step_times[2]))
+        finally:
+            vec_env.close()
+
+    def test_standby(self):
+        env_fns = [
+            lambda seed=seed: DummyEnv(seed, horizon=3, reset_delay=0.05)
+            for seed in range(2)
+        ]
+        vec_env = ShmemVectorEnv(env_fns, standby=True)
+        try:
+            noise = [[obs["state"][3]] for obs in vec_env.reset()]
+            num_dones = 0
+            for step in range(1, 13):
+                obs, _, dones, infos = vec_env.step(np.zeros((2, 3)))
+                for i in range(2):
+                    self.assertEqual(dones[i], step % 3 == 0)
+                    self.assertEqual(obs[i]["state"][1], step % 3)
+                    if dones[i]:
+                        noise[i].append(obs[i]["state"][3])
+                        self.assertEqual(infos[i]["final_observation"]["state"][1], 3)
+                num_dones += np.sum(dones)
+            self.assertEqual(num_dones, 8)
+            self.assertTrue(np.all(vec_env.reset_times >= 0.05))
+            self.assertTrue(np.all(vec_env.reset_wait_times >= 0))
+
+            # the standby environments do not replay the episodes of the active environments
+            self.assertEqual(len(set(noise[0])), 5)
+            self.assertEqual(len(set(noise[1])), 5)
+
+            with self.assertRaises(ValueError):
+                vec_env.reset(id=0, seed=1)
+        finally:
+            vec_env.close()
+
+    def test_standby_explicit_reset(self):
+        resets = []
+
+        class LoggedEnv(DummyEnv):
+            def reset(self):
+                resets.append(("start", self))
+                obs = super().reset()
+                resets.append(("end", self))
+                return obs
+
+        envs = _WorkerEnvs(lambda: LoggedEnv(0, reset_delay=0.1), standby=True)
+        try:
+            times = dict()
+            envs.reset(times)
+            # the explicit reset started after the background reset of the standby environment had finished
+            self.assertEqual(
+                resets,
+                [
+                    ("start", envs.standby_env),
+                    ("end", envs.standby_env),
+                    ("start", envs.env),
+                    ("end", envs.env),
+                ],
+            )
+            self.assertGreater(times["reset_wait"], 0)
+        finally:
+            envs.close()
+
+    def test_shared_memory(self):
+        for context in ["fork", "forkserver", "spawn"]:
+            script = SHM_SCRIPT.format(
+                tests_dir=os.path.dirname(os.path.abspath(__file__)), context=context
+            )
+            result = subprocess.run(
+                [sys.executable, "-c", script], capture_output=True, text=True
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertNotIn("resource_tracker", result.stderr)
+            for name in result.stdout.split()[-2:]:
+                self.assertFalse(os.path.exists(os.path.join("/dev/shm", name)))
+
+    def test_standby_rendering_env(self):
+        vec_env = ShmemVectorEnv([make_rendering_env], standby=True)
+        try:
+            with self.assertRaisesRegex(RuntimeError, "cannot render"):
+                vec_env.reset()
+        finally:
+            vec_env.close()
+
+    def test_standby_robosuite_env(self):
+        def env_fn():
+            return robosuite.make(
+                "Lift",
+                robots="Panda",
+                has_renderer=False,
+                has_offscreen_renderer=False,
+                use_camera_obs=False,
+                horizon=3,
+            )
+
+        vec_env = ShmemVectorEnv([env_fn], standby=True)
+        try:
+            cube_pos = [vec_env.reset()[0]["cube_pos"]]
+            for step in range(1, 7):
+                obs, _, dones, infos = vec_env.step(np.zeros((1, 7)))
+                self.assertEqual(dones[0], step % 3 == 0)
+                if dones[0]:
+                    cube_pos.append(obs[0]["cube_pos"])
+            self.assertEqual(len(cube_pos), 3)
+            self.assertFalse(np.allclose(cube_pos[0], cube_pos[1]))
+            self.assertFalse(np.allclose(cube_pos[1], cube_pos[2]))
+        finally:
+            vec_env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import robosuite
+from robosuite.controllers import load_composite_controller_config
+from robosuite.environments.base import MujocoEnv
+from robosuite.utils.mjcf_utils import array_to_string, find_elements
+
+import robocasa
+from robocasa.environments.kitchen.kitchen import Kitchen
+from robocasa.utils.xml_pipeline import (
+    XMLPipeline,
+    fix_asset_path,
+    rename_legacy_base,
+)
+from model_utils import write_box_object
+from test_scene_bank import BoxPnPCounterToCab
+
+MODEL_XML = """
+<mujoco>
+  <worldbody>
+    <body name="base0_support">
+      <joint name="base0_joint"/>
+    </body>
+  </worldbody>
+  <actuator>
+    <velocity name="base0_vel" joint="base0_joint"/>
+  </actuator>
+</mujoco>
+"""
+
+ROBOSUITE_PATH = os.path.split(robosuite.__file__)[0]
+ROBOCASA_PATH = os.path.split(robocasa.__file__)[0]
+
+
+def legacy_edit_model_xml(env, xml_str):
+    """
+    Kitchen.edit_model_xml before it was built on XMLPipeline, without generative textures
+    """
+    root = ET.fromstring(MujocoEnv.edit_model_xml(env, xml_str))
+    worldbody = root.find("worldbody")
+    actuator = root.find("actuator")
+    asset = root.find("asset")
+
+    robocasa_path_split = ROBOCASA_PATH.split("/")
+    for elem in asset.findall("mesh") + asset.findall("texture"):
+        old_path = elem.get("file")
+        if old_path is None:
+            continue
+        old_path_split = old_path.split("/")
+        if (
+            ("models/assets/fixtures" in old_path)
+            or ("models/assets/textures" in old_path)
+            or ("models/assets/objects/objaverse" in old_path)
+        ):
+            package = "robosuite" if "/robosuite/" in old_path else "robocasa"
+            ind = max([loc for loc, val in enumerate(old_path_split) if val == package])
+            elem.set("file", "/".join(robocasa_path_split + old_path_split[ind + 1 :]))
+
+    for cam_name, cam_config in env._cam_configs.items():
+        parent_body = cam_config.get("parent_body", None)
+        cam_root = worldbody
+        if parent_body is not None:
+            cam_root = find_elements(
+                root=worldbody, tags="body", attribs={"name": parent_body}
+            )
+            if cam_root is None:
+                continue
+        cam = find_elements(root=cam_root, tags="camera", attribs={"name": cam_name})
+        if cam is None:
+            cam = ET.Element("camera")
+            cam.set("mode", "fixed")
+            cam.set("name", cam_name)
+            cam_root.append(cam)
+        cam.set("pos", array_to_string(cam_config["pos"]))
+        cam.set("quat", array_to_string(cam_config["quat"]))
+        for (k, v) in cam_config.get("camera_attribs", {}).items():
+            cam.set(k, v)
+
+    for (section, tags, attribs) in [
+        (worldbody, ["geom", "site", "body", "joint"], ["name"]),
+        (actuator, ["velocity", "position", "motor", "general"], ["name", "joint"]),
+    ]:
+        for elem in find_elements(root=section, tags=tags, return_first=False):
+            for attrib in attribs:
+                value = elem.get(attrib)
+                if value is not None and value.startswith("base0_"):
+                    elem.set(attrib, "mobilebase0_" + value[6:])
+    return ET.tostring(root).decode("utf8")
+
+
+class TestXMLPipeline(unittest.TestCase):
+    def test_passes(self):
+        calls = []
+        pipeline = XMLPipeline(cache_size=1)
+        pipeline.add_element_pass(
+            lambda elem, ctx: ctx.setdefault("bodies", []).append(elem.get("name")),
+            section="worldbody",
+            tags=["body"],
+        )
+        pipeline.add_element_pass(
+            rename_legacy_base, section="worldbody", tags=["body", "joint"]
+        )
+        pipeline.add_element_pass(
+            rename_legacy_base, section="actuator", tags=["velocity"]
+        )
+        pipeline.add_tree_pass(lambda root, ctx: calls.append(ctx["bodies"]))
+
+        root = ET.fromstring(pipeline.run(MODEL_XML))
+        self.assertEqual(calls, [["base0_support"]])
+        self.assertIsNotNone(root.find("worldbody/body[@name='mobilebase0_support']"))
+        self.assertIsNotNone(
+            root.find("worldbody/body/joint[@name='mobilebase0_joint']")
+        )
+        velocity = root.find("actuator/velocity")
+        self.assertEqual(velocity.get("name"), "mobilebase0_vel")
+        self.assertEqual(velocity.get("joint"), "mobilebase0_joint")
+
+        # memoized by input and key
+        pipeline.run(MODEL_XML)
+        self.assertEqual(len(calls), 1)
+        pipeline.run(MODEL_XML, key="other")
+        self.assertEqual(len(calls), 2)
+
+    def test_fix_asset_path(self):
+        for (path, fixed_path) in [
+            (
+                "/data/robosuite/robosuite/models/assets/robots/panda/link0.stl",
+                ROBOSUITE_PATH + "/models/assets/robots/panda/link0.stl",
+            ),
+            (
+                "/data/robocasa/robocasa/models/assets/fixtures/sinks/model.obj",
+                ROBOCASA_PATH + "/models/assets/fixtures/sinks/model.obj",
+            ),
+            # robocasa assets that were recorded as robosuite assets
+            (
+                "/data/robosuite/models/assets/textures/wood.png",
+                ROBOCASA_PATH + "/models/assets/textures/wood.png",
+            ),
+            ("meshes/model.obj", "meshes/model.obj"),
+        ]:
+            elem = ET.Element("mesh", file=path)
+            fix_asset_path(elem)
+            self.assertEqual(elem.get("file"), fixed_path)
+
+        elem = ET.Element("texture", builtin="flat")
+        fix_asset_path(elem)
+        self.assertIsNone(elem.get("file"))
+        with self.assertRaises(ValueError):
+            fix_asset_path(
+                ET.Element("mesh", file="/data/models/assets/fixtures/a.obj")
+            )
+
+    def test_kitchen_edit_model_xml(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mjcf_path = write_box_object(tmp_dir)
+            env = BoxPnPCounterToCab(
+                mjcf_path=mjcf_path,
+                robots="PandaOmron",
+                controller_configs=load_composite_controller_config(
+                    controller=None, robot="PandaOmron"
+                ),
+                has_renderer=False,
+                has_offscreen_renderer=False,
+                use_camera_obs=False,
+                layout_ids=0,
+                style_ids=0,
+                seed=0,
+            )
+            model_xml = env.model.get_xml()
+            env.close()
+
+        # model xmls recorded on another machine, with the legacy base names of old demos
+        xml_strs = [
+            model_xml,
+            model_xml.replace(ROBOSUITE_PATH, "/data/robosuite/robosuite")
+            .replace(ROBOCASA_PATH, "/data/robocasa/robocasa")
+            .replace("mobilebase0_", "base0_"),
+        ]
+        self.assertIn("base0_", xml_strs[1])
+        for xml_str in xml_strs:
+            self.assertEqual(
+                Kitchen.edit_model_xml(env, xml_str),
+                legacy_edit_model_xml(env, xml_str),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()